@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+# Expressions per second of --batch with each --jobs count, against starting
+# sccalc.py for every expression
+#   python3 benchmarks/bench_batch.py [EXPRESSION_COUNT] [JOB_COUNTS]
+
+import io
+import os
+import sys
+import time
+import random
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import sccalc
+
+SCCALC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sccalc.py")
+PROCESS_PER_EXPRESSION_COUNT = 20
+
+def generate_expressions(count: int) -> list[str]:
+    random.seed(0)
+    return [f"{i} * {random.randint(1, 99)} + sqrt({i}) / {random.randint(0, 5)}" for i in range(count)]
+
+def main() -> None:
+    expression_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    job_counts = [int(count) for count in sys.argv[2].split(",")] if len(sys.argv) > 2 else [1, 2, 4, os.cpu_count() or 1]
+    sccalc.set_trace_level(sccalc.TRACE_LEVEL_OFF)
+    sccalc.g_optimize_expressions = False # As set by --batch
+    expressions = generate_expressions(expression_count)
+    input_text = "".join([f"{expression}\n" for expression in expressions])
+
+    start = time.perf_counter()
+    for expression in expressions[:PROCESS_PER_EXPRESSION_COUNT]:
+        # Only the expression can be given, so the debugging output is discarded too
+        subprocess.run([sys.executable, SCCALC_PATH, expression], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    process_rate = PROCESS_PER_EXPRESSION_COUNT / (time.perf_counter() - start)
+    print(f"{'process per expression':<24}{process_rate:>12.0f}/s")
+
+    for job_count in job_counts:
+        if job_count > 1:
+            # Start the worker processes outside the timing
+            sccalc.get_parallel_executor(job_count).submit(int).result()
+        sccalc.g_expression_cache.clear()
+        output_file = io.StringIO()
+        start = time.perf_counter()
+        sccalc.run_batch(io.StringIO(input_text), output_file, job_count)
+        rate = expression_count / (time.perf_counter() - start)
+        print(f"{f'--batch --jobs={job_count}':<24}{rate:>12.0f}/s")
+    print(f"({expression_count} expressions, {os.cpu_count()} cores)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+# Compares the float round trip math functions against the decimal-native
+# kernels at several precisions, in both speed and digits of accuracy
+#   python3 benchmarks/bench_decimal_math.py [ITERATIONS] [PRECISIONS]
+
+import os
+import sys
+import time
+import decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import sccalc
+
+MATH_EXPRESSIONS = [
+    "sqrt(x) + sin(x) * log10(x)",
+    "atan(x) - cos(x / 3) ^ 2",
+    "0.1 + 0.2 * x",
+]
+REFERENCE_PRECISION = 120
+
+def time_expressions(iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for expression in MATH_EXPRESSIONS:
+            value, errors = sccalc.eval_expression(expression)
+            if len(errors) > 0:
+                raise RuntimeError(errors)
+    return time.perf_counter() - start
+
+def get_values() -> list:
+    return [sccalc.eval_expression(expression)[0] for expression in MATH_EXPRESSIONS]
+
+def count_matching_digits(value, reference: decimal.Decimal) -> int:
+    '''
+    Returns the number of significant digits of value that agree with reference
+    '''
+    with decimal.localcontext() as context:
+        context.prec = REFERENCE_PRECISION
+        error = abs(decimal.Decimal(value) - reference)
+        if error == 0:
+            return REFERENCE_PRECISION
+        return max(0, reference.adjusted() - error.adjusted())
+
+def set_mode(numeric_mode: str, precision: int) -> None:
+    sccalc.set_numeric_mode(numeric_mode)
+    sccalc.set_default_decimal_context(precision, sccalc.DEFAULT_DECIMAL_ROUNDING)
+    sccalc.set_decimal_context(precision, sccalc.DEFAULT_DECIMAL_ROUNDING)
+    sccalc.variables["x"] = sccalc.parse_number_literal("7.3")
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    precisions = [int(precision) for precision in sys.argv[2].split(",")] if len(sys.argv) > 2 else [28, 50, 100]
+    sccalc.set_trace_level(sccalc.TRACE_LEVEL_OFF)
+
+    set_mode(sccalc.NUMERIC_MODE_DECIMAL_NATIVE, REFERENCE_PRECISION)
+    references = get_values()
+
+    modes = [(sccalc.NUMERIC_MODE_DECIMAL, sccalc.DEFAULT_DECIMAL_PRECISION)]
+    modes += [(sccalc.NUMERIC_MODE_DECIMAL_NATIVE, precision) for precision in precisions]
+    baseline_time = None
+    print(f"{'mode':<24}{'time':>10}{'speed':>8}  digits per expression")
+    for numeric_mode, precision in modes:
+        set_mode(numeric_mode, precision)
+        elapsed = time_expressions(iterations)
+        baseline_time = elapsed if baseline_time == None else baseline_time
+        digits = [count_matching_digits(value, reference) for value, reference in zip(get_values(), references)]
+        print(f"{numeric_mode + ' ' + str(precision):<24}{elapsed:>9.3f}s{baseline_time/elapsed:>7.2f}x  " + " ".join([f"{digit:>4}" for digit in digits]))
+    print(f"({iterations * len(MATH_EXPRESSIONS)} expression evaluations, speed against the float round trip)")
+
+if __name__ == "__main__":
+    main()
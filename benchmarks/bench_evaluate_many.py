@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+# Rows per second of one formula evaluated against rows of variable values,
+# by assigning the variables and calling eval_expression() for each row
+# against evaluate_many() with each job count
+#   python3 benchmarks/bench_evaluate_many.py [ROW_COUNT] [JOB_COUNTS]
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import sccalc
+
+FORMULA = "price * (1 + rate) ^ years - fee * (years > 1)"
+
+def generate_rows(count: int) -> list[dict]:
+    random.seed(0)
+    return [{"price": random.randint(1, 10000) / 100, "rate": random.randint(0, 200) / 1000, "years": random.randint(1, 30), "fee": random.randint(0, 500) / 100} for _ in range(count)]
+
+def eval_each_row(rows: list[dict]) -> list:
+    values = []
+    for row in rows:
+        for name, value in row.items():
+            sccalc.variables[name] = sccalc.to_number(value)
+        values.append(sccalc.eval_expression(FORMULA)[0])
+    return values
+
+def main() -> None:
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    job_counts = [int(count) for count in sys.argv[2].split(",")] if len(sys.argv) > 2 else [1, 2, 4, os.cpu_count() or 1]
+    sccalc.set_trace_level(sccalc.TRACE_LEVEL_OFF)
+    rows = generate_rows(row_count)
+    print(f"{'mode':<16}{'eval_expression':>18}" + "".join([f"{f'--jobs={count}':>14}" for count in job_counts]))
+    for numeric_mode in [sccalc.NUMERIC_MODE_DECIMAL, sccalc.NUMERIC_MODE_FLOAT]:
+        sccalc.set_numeric_mode(numeric_mode)
+        start = time.perf_counter()
+        expected_values = eval_each_row(rows)
+        row = f"{numeric_mode:<16}{row_count / (time.perf_counter() - start):>16.0f}/s"
+        for job_count in job_counts:
+            if job_count > 1:
+                # Start the worker processes outside the timing
+                sccalc.get_parallel_executor(job_count).submit(int).result()
+            start = time.perf_counter()
+            values = sccalc.evaluate_many(FORMULA, rows, job_count)[0]
+            row += f"{row_count / (time.perf_counter() - start):>12.0f}/s"
+            assert values == expected_values
+        print(row)
+    print(f"({row_count} rows, {os.cpu_count()} cores)")
+
+if __name__ == "__main__":
+    main()
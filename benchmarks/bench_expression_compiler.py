@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+# Compares the post fix interpreter against the expression compiler, in each
+# numeric mode
+#   python3 benchmarks/bench_expression_compiler.py [ITERATIONS]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import sccalc
+
+ARITHMETIC_EXPRESSIONS = [
+    "(a*b + c/d - e) * (a - b) ^ 2",
+    "a*a + b*b - 2*a*b*cos(c)",
+    "r = (a + b + c + d + e) / 5",
+    "-a + b*-c - (d % 3) + sqrt(e)",
+]
+
+def time_expressions(iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for expression in ARITHMETIC_EXPRESSIONS:
+            value, errors = sccalc.eval_expression(expression)
+            if len(errors) > 0:
+                raise RuntimeError(errors)
+    return time.perf_counter() - start
+
+def time_map(element_count: int) -> float:
+    sccalc.iterator_arrays["it"] = [sccalc.to_number(i) for i in range(element_count)]
+    start = time.perf_counter()
+    sccalc.run_interpreter(["!map it \"it*it + 2*it - it/3 + 1\""])
+    return time.perf_counter() - start
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    sccalc.set_trace_level(sccalc.TRACE_LEVEL_OFF)
+
+    results = {}
+    for numeric_mode in [sccalc.NUMERIC_MODE_DECIMAL, sccalc.NUMERIC_MODE_FLOAT]:
+        sccalc.set_numeric_mode(numeric_mode)
+        for name, value in [("a", 3), ("b", 4.5), ("c", 0.25), ("d", 7), ("e", 11)]:
+            sccalc.variables[name] = sccalc.to_number(value)
+        for compiled in [False, True]:
+            sccalc.g_compile_expressions = compiled
+            results[(numeric_mode, compiled)] = (time_expressions(iterations), time_map(iterations))
+
+    evaluation_count = iterations * len(ARITHMETIC_EXPRESSIONS)
+    baseline = results[(sccalc.NUMERIC_MODE_DECIMAL, False)]
+    print(f"{'':<24}{'expressions':>14}{'!map body':>14}")
+    for (numeric_mode, compiled), timings in results.items():
+        name = f"{numeric_mode} {'compiled' if compiled else 'interpreted'}"
+        print(f"{name:<24}" + "".join([f"{timing:>8.3f}s {baseline[index]/timing:>4.1f}x" for index, timing in enumerate(timings)]))
+    print(f"({evaluation_count} expression evaluations, {iterations} element !map, speedups against decimal interpreted)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+# Time and peak memory of !read and !write, against reading the whole file
+# and splitting it, or joining every value and writing them at once, as
+# they used to, and of the binary iterator file format
+#   python3 benchmarks/bench_iterator_io.py [ELEMENT_COUNT]
+
+import os
+import sys
+import time
+import random
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import sccalc
+
+def read_whole_file(file_path: str) -> list:
+    with open(file_path) as file_handle:
+        contents = file_handle.read()
+    return [sccalc.parse_number_literal(data) for data in contents.split(",")]
+
+def write_whole_file(file_path: str, iterator) -> None:
+    with open(file_path, "w") as file_handle:
+        file_handle.write(",".join([f"{value}" for value in iterator]))
+
+def measure(function) -> (float, int):
+    '''
+    Returns the time in seconds function took, and the peak bytes it
+    allocated, measured in a second run as tracing slows it down
+    '''
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function()
+    peak_size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return (elapsed, peak_size)
+
+def main() -> None:
+    element_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    sccalc.set_trace_level(sccalc.TRACE_LEVEL_OFF)
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "iterator.txt")
+        with open(file_path, "w") as file_handle:
+            file_handle.write(",".join([repr(random.uniform(-1000, 1000)) for _ in range(element_count)]))
+        file_size = os.path.getsize(file_path)
+        print(f"{'':<18}{'time':>10}{'peak memory':>14}{'x file size':>13}")
+        output_path = os.path.join(directory, "output.txt")
+        binary_path = os.path.join(directory, "iterator.bin")
+        sccalc.run_interpreter([f"!read {file_path} it status"])
+        for name, function in [("read whole file", lambda: read_whole_file(file_path)),
+                ("!read", lambda: sccalc.run_interpreter([f"!read {file_path} it status"])),
+                ("write joined", lambda: write_whole_file(output_path, sccalc.iterator_arrays["it"])),
+                ("!write", lambda: sccalc.run_interpreter([f"!write {output_path} it status"])),
+                ("!write -newline", lambda: sccalc.run_interpreter([f"!write {output_path} it status -newline"])),
+                ("!write -fixed 6", lambda: sccalc.run_interpreter([f"!write {output_path} it status -fixed 6"])),
+                ("!write -binary", lambda: sccalc.run_interpreter([f"!write {binary_path} it status -binary"])),
+                ("!read -binary", lambda: sccalc.run_interpreter([f"!read {binary_path} binary status -binary"])),
+                ("... then !sum", lambda: sccalc.run_interpreter([f"!read {binary_path} binary status -binary", "!sum binary total"]))]:
+            elapsed, peak_size = measure(function)
+            print(f"{name:<18}{elapsed:>9.3f}s{peak_size/(1<<20):>12.1f}MB{peak_size/file_size:>12.2f}x")
+        print(f"({element_count} values, {file_size/(1<<20):.1f}MB file)")
+
+if __name__ == "__main__":
+    main()
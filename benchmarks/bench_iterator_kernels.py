@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+
+# Compares evaluating !map and !filter for one iterator value at a time
+# against the vectorized iterator kernels, in each numeric mode, with and
+# without NumPy for the float mode
+#   python3 benchmarks/bench_iterator_kernels.py [ELEMENT_COUNT]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import sccalc
+
+COMMANDS = [
+    "!map x \"sqrt(x*x + 1)\"",
+    "!filter x \"x % 3 == 0 && x > 100 || x < 10\"",
+    "!filter x x > 500",
+]
+
+def time_command(command: str, element_count: int) -> float:
+    sccalc.iterator_arrays["x"] = sccalc.IteratorArray([sccalc.to_number(i) for i in range(element_count)])
+    start = time.perf_counter()
+    sccalc.run_interpreter([command])
+    return time.perf_counter() - start
+
+def main() -> None:
+    element_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    sccalc.set_trace_level(sccalc.TRACE_LEVEL_OFF)
+    numpy = sccalc.get_numpy()
+    numpy_installed = numpy != None
+    cases = [(sccalc.NUMERIC_MODE_DECIMAL, False), (sccalc.NUMERIC_MODE_FLOAT, False)]
+    if numpy_installed:
+        cases.append((sccalc.NUMERIC_MODE_FLOAT, True))
+    for command in COMMANDS:
+        print(command)
+        print(f"  {'mode':<22}{'scalar':>10}{'kernel':>10}{'speedup':>9}")
+        for numeric_mode, use_numpy in cases:
+            sccalc.set_numeric_mode(numeric_mode)
+            sccalc.numpy_module = numpy if use_numpy else None
+            sccalc.g_vectorize_iterators = False
+            scalar_time = time_command(command, element_count)
+            sccalc.g_vectorize_iterators = True
+            kernel_time = time_command(command, element_count)
+            name = f"{numeric_mode}{' numpy' if use_numpy else ''}"
+            print(f"  {name:<22}{scalar_time:>9.3f}s{kernel_time:>9.3f}s{scalar_time/kernel_time:>8.1f}x")
+    print(f"({element_count} elements{'' if numpy_installed else ', NumPy is not installed'})")
+
+if __name__ == "__main__":
+    main()
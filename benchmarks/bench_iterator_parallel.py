@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+# Time of !map and !filter evaluated in this process against -parallel with
+# each number of worker processes, in each numeric mode. The first parallel
+# command of a worker count also starts its processes, which is not timed.
+#   python3 benchmarks/bench_iterator_parallel.py [ELEMENT_COUNT] [WORKER_COUNTS]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import sccalc
+
+COMMANDS = [
+    "!map x \"sqrt(x*x + 1) / 3\"",
+    "!filter x \"x % 3 == 0 && x > 100 || x < 10\"",
+]
+
+def time_command(command: str, element_count: int) -> float:
+    sccalc.iterator_arrays["x"] = sccalc.IteratorArray([sccalc.to_number(i) for i in range(element_count)])
+    start = time.perf_counter()
+    sccalc.run_interpreter([command])
+    return time.perf_counter() - start
+
+def main() -> None:
+    element_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    worker_counts = [int(count) for count in sys.argv[2].split(",")] if len(sys.argv) > 2 else [2, 4, os.cpu_count() or 1]
+    sccalc.set_trace_level(sccalc.TRACE_LEVEL_OFF)
+    for command in COMMANDS:
+        print(command)
+        print(f"  {'mode':<16}{'serial':>10}" + "".join([f"{f'-parallel {count}':>14}" for count in worker_counts]))
+        for numeric_mode in [sccalc.NUMERIC_MODE_DECIMAL, sccalc.NUMERIC_MODE_FLOAT]:
+            sccalc.set_numeric_mode(numeric_mode)
+            time_command(command, 1000) # Compiles the kernel, outside the timing
+            serial_time = time_command(command, element_count)
+            row = f"  {numeric_mode:<16}{serial_time*1000:>8.0f}ms"
+            for worker_count in worker_counts:
+                sccalc.get_parallel_executor(worker_count).submit(int).result()
+                parallel_time = time_command(f"{command} -parallel {worker_count}", element_count)
+                row += f"{parallel_time*1000:>9.0f}ms {serial_time/parallel_time:>3.1f}x"
+            print(row)
+    print(f"({element_count} elements, {os.cpu_count()} cores)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+# Peak memory and time of a !map, !filter, !map chain ended by !sum, applied
+# by each command as it runs against recorded and fused by --lazy-iterators,
+# from an iterator memory mapped from a binary iterator file
+#   python3 benchmarks/bench_iterator_pipeline.py [ELEMENT_COUNT]
+
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import sccalc
+
+SCRIPT_LINES = [
+    "!map x \"x*x - 3*x\"",
+    "!filter x \"x % 7 != 0\"",
+    "!map x \"sqrt(x + 10)\"",
+    "!sum x total",
+]
+
+def run_chain(file_path: str, lazy: bool, trace_memory: bool) -> (float, int, object):
+    '''
+    Returns the seconds taken, the peak bytes allocated (when trace_memory,
+    as tracing slows allocations) and the sum
+    '''
+    sccalc.g_lazy_iterators = lazy
+    sccalc.iterator_arrays["x"] = sccalc.load_iterator_file(file_path)[0]
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    sccalc.run_interpreter(SCRIPT_LINES)
+    elapsed = time.perf_counter() - start
+    peak_size = 0
+    if trace_memory:
+        peak_size = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    del sccalc.iterator_arrays["x"]
+    return elapsed, peak_size, sccalc.variables["total"]
+
+def main() -> None:
+    element_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    sccalc.set_trace_level(sccalc.TRACE_LEVEL_OFF)
+    numpy_installed = sccalc.get_numpy() != None
+    print(f"{'mode':<16}{'eager':>11}{'lazy':>11}{'eager peak':>13}{'lazy peak':>13}")
+    with tempfile.TemporaryDirectory() as data_dir:
+        for numeric_mode in [sccalc.NUMERIC_MODE_DECIMAL, sccalc.NUMERIC_MODE_FLOAT]:
+            sccalc.set_numeric_mode(numeric_mode)
+            file_path = os.path.join(data_dir, f"{numeric_mode}.scit")
+            sccalc.write_iterator_file(file_path, sccalc.IteratorArray([sccalc.to_number(i) for i in range(element_count)]))
+            eager_time, _, eager_total = run_chain(file_path, False, False)
+            lazy_time, _, lazy_total = run_chain(file_path, True, False)
+            eager_peak = run_chain(file_path, False, True)[1]
+            lazy_peak = run_chain(file_path, True, True)[1]
+            assert eager_total == lazy_total, (eager_total, lazy_total)
+            print(f"{numeric_mode:<16}{eager_time*1000:>9.1f}ms{lazy_time*1000:>9.1f}ms"
+                    f"{eager_peak/2**20:>11.1f}MB{lazy_peak/2**20:>11.1f}MB")
+    print(f"({element_count} elements, {element_count*8/2**20:.1f}MB file, NumPy {'installed' if numpy_installed else 'not installed'})")
+
+if __name__ == "__main__":
+    main()
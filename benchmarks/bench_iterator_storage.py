@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+# Memory per element and !sum time of iterator storage, against the plain
+# list of numbers iterators used to be, in each numeric mode
+#   python3 benchmarks/bench_iterator_storage.py [ELEMENT_COUNT]
+
+import os
+import sys
+import time
+import decimal
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import sccalc
+
+def measure_memory(build) -> (object, int):
+    '''
+    Returns what build() returns and the bytes it allocated, that are still held
+    '''
+    tracemalloc.start()
+    start_size = tracemalloc.get_traced_memory()[0]
+    built = build()
+    size = tracemalloc.get_traced_memory()[0] - start_size
+    tracemalloc.stop()
+    return built, size
+
+def time_sum(iterator) -> float:
+    sccalc.iterator_arrays["it"] = iterator
+    start = time.perf_counter()
+    sccalc.run_interpreter(["!sum it total"])
+    return time.perf_counter() - start
+
+def main() -> None:
+    element_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    sccalc.set_trace_level(sccalc.TRACE_LEVEL_OFF)
+    cases = [
+        (sccalc.NUMERIC_MODE_DECIMAL, "i / 4"),
+        (sccalc.NUMERIC_MODE_DECIMAL, "i / 3"),
+        (sccalc.NUMERIC_MODE_DECIMAL_NATIVE, "i / 10"),
+        (sccalc.NUMERIC_MODE_FLOAT, "i / 3"),
+    ]
+    print(f"{'mode':<16}{'values':<8}{'list':>12}{'iterator':>12}{'list !sum':>12}{'iter !sum':>12}")
+    for numeric_mode, expression in cases:
+        sccalc.set_numeric_mode(numeric_mode)
+        divisor = sccalc.parse_number_literal(expression.split("/")[1])
+        values = [sccalc.to_number(i) / divisor for i in range(element_count)]
+        # The values are copied so neither measurement counts the other's objects
+        value_list, list_size = measure_memory(lambda: [sccalc.to_number(str(value)) if numeric_mode != sccalc.NUMERIC_MODE_FLOAT else value * 1.0 for value in values])
+        iterator, iterator_size = measure_memory(lambda: sccalc.IteratorArray(values))
+        del values
+        list_sum_time = time_sum(value_list)
+        iterator_sum_time = time_sum(iterator)
+        print(f"{numeric_mode:<16}{expression:<8}{list_size/element_count:>10.1f}B {iterator_size/element_count:>10.1f}B"
+                f"{list_sum_time*1000:>10.1f}ms{iterator_sum_time*1000:>10.1f}ms")
+    print(f"({element_count} elements, bytes per element including the number objects)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+# Lexer throughput, in tokens per second, on long generated expressions
+#   python3 benchmarks/bench_lexer.py [TERM_COUNT] [REPEATS]
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import sccalc
+
+OPERANDS = ["12", "3.25", "0.5", "x", "rate_1", "pi", "e", "sqrt(y)", "cos(angle)"]
+OPERATORS = ["+", "-", "*", "/", "%", "^", ">=", "<=", "==", "!=", "&&", "||"]
+
+def generate_expression(term_count: int, seed: int) -> str:
+    generator = random.Random(seed)
+    terms = [generator.choice(OPERANDS)]
+    for _ in range(term_count-1):
+        terms.append(generator.choice(OPERATORS))
+        operand = generator.choice(OPERANDS)
+        terms.append(f"({operand})" if generator.random() < 0.2 else operand)
+    return " ".join(terms)
+
+def measure(lexer, expression: str, repeats: int) -> float:
+    '''
+    Returns the best tokens per second of repeats runs
+    '''
+    best_rate = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        token_count = len(lexer(expression))
+        best_rate = max(best_rate, token_count / (time.perf_counter() - start))
+    return best_rate
+
+def main() -> None:
+    term_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    sccalc.set_trace_level(sccalc.TRACE_LEVEL_OFF)
+    expression = generate_expression(term_count, 0)
+    if sccalc.get_lex_error_count(sccalc.lex(expression)) != 0:
+        raise RuntimeError("generated expression has lexical errors")
+
+    print(f"expression length: {len(expression)} chars, {len(sccalc.lex(expression))} tokens")
+    results = {}
+    for name, lexer in [("lex_unicode", sccalc.lex_unicode), ("lex", sccalc.lex)]:
+        results[name] = measure(lexer, expression, repeats)
+        print(f"{name:<12} {results[name]:>14,.0f} tokens/s")
+    print(f"speedup: {results['lex']/results['lex_unicode']:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+# Time from script text to a CompiledScript ready to run, compiling every
+# time versus loading from the on disk script cache
+#   python3 benchmarks/bench_script_cache.py [LINE_COUNTS] [REPEATS]
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import sccalc
+
+def generate_script(line_count: int) -> str:
+    lines = ["i = 0", "total = 0", "!while i < 10"]
+    for line_index in range(line_count):
+        if line_index % 10 == 0:
+            lines.append(f"!if total > {line_index}")
+            lines.append(f"!printf \"line {line_index}: %v\" total")
+            lines.append("!endif")
+        else:
+            lines.append(f"total = total + i * {line_index % 7 + 1} - sqrt({line_index}) / 3")
+    lines.append("i = i + 1")
+    lines.append("!endwhile")
+    return "\n".join(lines)
+
+def measure(function, repeats: int) -> float:
+    '''
+    Returns the best time in seconds of repeats runs
+    '''
+    best_time = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best_time = elapsed if best_time == None else min(best_time, elapsed)
+    return best_time
+
+def main() -> None:
+    line_counts = [int(count) for count in sys.argv[1].split(",")] if len(sys.argv) > 1 else [100, 1000, 10000]
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    sccalc.set_trace_level(sccalc.TRACE_LEVEL_OFF)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        script_cache = sccalc.ScriptCache(cache_dir, sccalc.DEFAULT_SCRIPT_CACHE_MAX_SIZE)
+        print(f"{'lines':>8} {'compile':>12} {'cache load':>12} {'speedup':>8}")
+        for line_count in line_counts:
+            script_text = generate_script(line_count)
+            def compile_script():
+                # Compiled from scratch, as a new process would
+                sccalc.g_expression_cache.clear()
+                sccalc.compile_script(script_text.split("\n"))
+            compile_time = measure(compile_script, repeats)
+            script_cache.put(script_text, sccalc.compile_script(script_text.split("\n")))
+            load_time = measure(lambda: script_cache.get(script_text), repeats)
+            print(f"{line_count:>8} {compile_time*1000:>10.2f}ms {load_time*1000:>10.2f}ms {compile_time/load_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+# Latency of a script and of an expression sent to --serve, against starting
+# sccalc.py for each of them
+#   python3 benchmarks/bench_server.py [REQUEST_COUNT]
+
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import sccalc
+
+SCCALC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "sccalc.py")
+SCRIPT = "i = 0\ntotal = 0\n!while i < 20\ni = i + 1\ntotal = total + sqrt(i)\n!endwhile\n!varout total"
+EXPRESSION = "2 * sqrt(3) + 1 / 7"
+PROCESS_RUN_COUNT = 10
+
+def receive_exactly(connection: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if len(chunk) == 0:
+            raise ConnectionError("Server closed the connection")
+        data += chunk
+    return data
+
+def send_request(connection: socket.socket, request: dict) -> dict:
+    message = json.dumps(request).encode("utf-8")
+    connection.sendall(sccalc.SERVER_FRAME_HEADER.pack(len(message)) + message)
+    response_size = sccalc.SERVER_FRAME_HEADER.unpack(receive_exactly(connection, sccalc.SERVER_FRAME_HEADER.size))[0]
+    return json.loads(receive_exactly(connection, response_size))
+
+def measure(function, count: int) -> float:
+    '''
+    Returns the mean time in seconds of count runs
+    '''
+    start = time.perf_counter()
+    for _ in range(count):
+        function()
+    return (time.perf_counter() - start) / count
+
+def main() -> None:
+    request_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with tempfile.TemporaryDirectory() as socket_dir:
+        script_path = os.path.join(socket_dir, "script.sc")
+        with open(script_path, "w") as file_handle:
+            file_handle.write(SCRIPT)
+        socket_path = os.path.join(socket_dir, "sccalc.sock")
+        server = subprocess.Popen([sys.executable, SCCALC_PATH, "--no-debug", f"--serve={socket_path}"], stdout=subprocess.PIPE, text=True)
+        try:
+            server.stdout.readline() # Serving on ...
+            connection = socket.socket(socket.AF_UNIX)
+            connection.connect(socket_path)
+            assert send_request(connection, {"script": SCRIPT})["exit_code"] == 0
+            script_time = measure(lambda: send_request(connection, {"script": SCRIPT}), request_count)
+            expression_time = measure(lambda: send_request(connection, {"expression": EXPRESSION}), request_count)
+            connection.close()
+        finally:
+            server.terminate()
+            server.wait()
+        process_script_time = measure(lambda: subprocess.run([sys.executable, SCCALC_PATH, "--no-debug", "--no-script-cache", script_path], stdout=subprocess.DEVNULL, check=True), PROCESS_RUN_COUNT)
+        # Only the expression can be given, so the debugging output is discarded too
+        process_expression_time = measure(lambda: subprocess.run([sys.executable, SCCALC_PATH, EXPRESSION], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True), PROCESS_RUN_COUNT)
+    print(f"{'':<12}{'process':>12}{'--serve':>12}{'speedup':>9}")
+    print(f"{'script':<12}{process_script_time*1000:>10.2f}ms{script_time*1000:>10.3f}ms{process_script_time/script_time:>8.0f}x")
+    print(f"{'expression':<12}{process_expression_time*1000:>10.2f}ms{expression_time*1000:>10.3f}ms{process_expression_time/expression_time:>8.0f}x")
+    print(f"({request_count} requests over one Unix domain socket connection)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+# Start-up time of evaluating a trivial expression, as sccalc.py and as
+# python3 -m sccalc, against python3 -c pass. Exits with 1 when the time of
+# either over python3 -c pass exceeds MAX_OVERHEAD_MS. Both load
+# sccalc_core.py from its cached bytecode, only the small sccalc.py is
+# compiled from source on every run
+#   python3 benchmarks/bench_startup.py [RUN_COUNT] [MAX_OVERHEAD_MS]
+
+import os
+import sys
+import time
+import py_compile
+import subprocess
+
+SCCALC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SCCALC_PATH = os.path.join(SCCALC_DIR, "sccalc.py")
+SCCALC_CORE_PATH = os.path.join(SCCALC_DIR, "sccalc_core.py")
+EXPRESSION = "1+2"
+
+COMMANDS = [
+    ("python3 -c pass", [sys.executable, "-c", "pass"]),
+    ("sccalc.py", [sys.executable, SCCALC_PATH, EXPRESSION]),
+    ("-m sccalc", [sys.executable, "-m", "sccalc", EXPRESSION]),
+    ("-c 'import sccalc'", [sys.executable, "-c", "import sccalc"]),
+]
+
+def measure(commands: list[tuple[str, list[str]]], count: int) -> dict[str, float]:
+    '''
+    Returns the least time in seconds of count runs of each command. The
+    commands are run in turn, so whatever else the machine is doing slows each
+    of them alike
+    '''
+    least_times = {}
+    for _ in range(count):
+        for name, command in commands:
+            start = time.perf_counter()
+            # Only the expression can be given, so the debugging output is discarded too
+            subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=SCCALC_DIR, check=True)
+            run_time = time.perf_counter() - start
+            least_times[name] = min(run_time, least_times.get(name, run_time))
+    return least_times
+
+def main() -> None:
+    run_count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    max_overhead_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 40
+    py_compile.compile(SCCALC_CORE_PATH, doraise=True) # As left by the first run
+    least_times = measure(COMMANDS, run_count)
+    pass_time = least_times["python3 -c pass"]
+    print(f"{'':<24}{'time':>10}{'overhead':>12}")
+    for name, command in COMMANDS:
+        overhead = f"{(least_times[name] - pass_time)*1000:>10.1f}ms" if command != COMMANDS[0][1] else ""
+        print(f"{name:<24}{least_times[name]*1000:>8.1f}ms{overhead}")
+    print(f"(least of {run_count} runs)")
+    exceeded = False
+    for name in ("sccalc.py", "-m sccalc"):
+        overhead_ms = (least_times[name] - pass_time) * 1000
+        if overhead_ms > max_overhead_ms:
+            print(f"{name} start-up overhead {overhead_ms:.1f}ms exceeds {max_overhead_ms:.1f}ms", file=sys.stderr)
+            exceeded = True
+    if exceeded:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5129 @@
+#!/usr/bin/env python3
+#!/usr/bin/env -S python3 -O
+
+# Script Calc.py
+
+import math
+import decimal
+import sys
+import typing
+import os
+import string
+import itertools
+import collections
+import operator
+import contextvars
+import threading
+import re
+import gc
+import array
+import struct
+import time
+
+APP_VERSION_MAJOR = 4
+APP_VERSION_MINOR = 3
+APP_SCRIPT_VERSION = 8
+
+CUSTOM_SCRIPT_VERSION = False
+
+MAX_SYMBOL_SLOTS = 65536 # Names given a numbered slot, the rest are their own slot
+symbol_slot_indices: dict[str, int] = {}
+symbol_slot_indices_lock = threading.Lock()
+def get_symbol_slot(name: str) -> int or str:
+    '''
+    Returns the slot of a variable name. Slots are shared by every SymbolTable
+    and are never freed, so a slot can be resolved once and reused.
+    Once MAX_SYMBOL_SLOTS names have a slot, any other name is its own slot,
+    as a --serve client can send any number of names for the life of the server.
+    '''
+    slot = symbol_slot_indices.get(name)
+    if slot != None:
+        return slot
+    if len(symbol_slot_indices) >= MAX_SYMBOL_SLOTS:
+        return name
+    with symbol_slot_indices_lock:
+        return symbol_slot_indices.setdefault(name, len(symbol_slot_indices))
+
+class SymbolTable:
+    '''
+    Variable storage, with the same interface as a dict. Values are held in
+    slot_values, keyed by get_symbol_slot(), without the undefined variables.
+    Slots are shared by every table, so a dict keeps a new table's size to
+    its own variables.
+    '''
+    def __init__(self, initial_variables: dict or None = None):
+        self.slot_values: dict[int, object] = {}
+        self.defined_slots: dict[str, int] = {} # In order of definition
+        if initial_variables != None:
+            self.update(initial_variables)
+    def get_slot_value(self, slot: int or str):
+        return self.slot_values.get(slot)
+    def __setitem__(self, name: str, value) -> None:
+        slot = get_symbol_slot(name)
+        self.slot_values[slot] = value
+        self.defined_slots[name] = slot
+    def __getitem__(self, name: str):
+        slot = self.defined_slots.get(name)
+        if slot == None:
+            raise KeyError(name)
+        return self.slot_values[slot]
+    def __delitem__(self, name: str) -> None:
+        del self.slot_values[self.defined_slots.pop(name)]
+    def get(self, name: str, default = None):
+        slot = self.defined_slots.get(name)
+        if slot == None:
+            return default
+        return self.slot_values[slot]
+    def __contains__(self, name: str) -> bool:
+        return name in self.defined_slots
+    def __iter__(self):
+        return iter(self.defined_slots)
+    def __len__(self) -> int:
+        return len(self.defined_slots)
+    def keys(self):
+        return self.defined_slots.keys()
+    def values(self) -> list:
+        return [self.slot_values[slot] for slot in self.defined_slots.values()]
+    def items(self) -> list:
+        return [(name, self.slot_values[slot]) for name, slot in self.defined_slots.items()]
+    def update(self, other_variables: dict) -> None:
+        for name, value in other_variables.items():
+            self[name] = value
+    def clear(self) -> None:
+        self.slot_values = {}
+        self.defined_slots = {}
+    def copy(self):
+        return SymbolTable(self)
+    def __reduce__(self):
+        # Slots are only valid within this process, so are assigned again when unpickled
+        return (SymbolTable, (dict(self.items()),))
+    def __repr__(self) -> str:
+        return f"SymbolTable({dict(self.items())})"
+
+class IteratorArray:
+    '''
+    Iterator storage, with the list interface the iterator commands use.
+    Values are held in an array('d') of doubles while every value appended is
+    exactly a double (always the case in the float numeric mode), otherwise
+    in decimal_text as comma separated decimal.Decimal strings. Both keep the
+    exact representation of each value, so e.g. 2.50 is not read back as 2.5.
+    floats may also be a read only memoryview, of a memory mapped iterator
+    file, which is copied into an array('d') when first modified.
+    '''
+    def __init__(self, values: typing.Iterable = (), number_type: type or None = None):
+        self.number_type = g_number_type if number_type == None else number_type
+        self.floats: array.array or memoryview or None = array.array("d")
+        self.decimal_text: bytearray or None = None
+        self.length = 0
+        self.extend(values)
+    def append(self, value) -> None:
+        if self.floats != None:
+            if type(value) is float:
+                self.get_writable_floats().append(value)
+                self.length += 1
+                return
+            float_value = float(value)
+            if decimal.Decimal(float_value).compare_total(value) == 0:
+                self.get_writable_floats().append(float_value)
+                self.length += 1
+                return
+            self.use_decimal_text()
+        if self.length > 0:
+            self.decimal_text += b","
+        self.decimal_text += str(value).encode("ascii")
+        self.length += 1
+    @staticmethod
+    def from_values(values: typing.Iterable, number_type: type):
+        '''
+        Returns a new IteratorArray, taking ownership of values when it is an
+        array.array("d") or a memoryview of doubles
+        '''
+        if isinstance(values, (array.array, memoryview)):
+            iterator = IteratorArray((), number_type)
+            iterator.floats = values
+            iterator.length = len(values)
+            return iterator
+        return IteratorArray(values, number_type)
+    @staticmethod
+    def from_decimal_text(decimal_text: bytearray, length: int, number_type: type):
+        '''
+        Returns a new IteratorArray of the length comma separated values of
+        decimal_text, taking ownership of it
+        '''
+        iterator = IteratorArray((), number_type)
+        iterator.floats = None
+        iterator.decimal_text = decimal_text
+        iterator.length = length
+        return iterator
+    def extend_floats(self, floats: array.array) -> None:
+        '''
+        Appends an array.array("d") of values that are each exactly a double
+        '''
+        if self.floats == None:
+            self.extend(floats)
+            return None
+        self.get_writable_floats().extend(floats)
+        self.length += len(floats)
+    def extend(self, values: typing.Iterable) -> None:
+        if self.floats != None and isinstance(values, IteratorArray) and values.floats != None and values.number_type is self.number_type:
+            self.get_writable_floats().frombytes(memoryview(values.floats).cast("B"))
+            self.length += len(values.floats)
+            return
+        for value in values:
+            self.append(value)
+    def compress(self, mask) -> None:
+        '''
+        Keeps only the values whose element of mask is true, mask being a
+        sequence of the same length or a numpy bool array
+        '''
+        if self.floats != None:
+            if isinstance(mask, (list, tuple)):
+                self.floats = array.array("d", itertools.compress(self.floats, mask))
+            else:
+                numpy = get_numpy()
+                self.floats = array.array("d", numpy.frombuffer(self.floats, dtype=numpy.float64)[mask].tobytes())
+            self.length = len(self.floats)
+            return None
+        if self.length == 0:
+            return None
+        kept_values = list(itertools.compress(self.decimal_text.decode("ascii").split(","), mask))
+        self.decimal_text = bytearray(",".join(kept_values).encode("ascii"))
+        self.length = len(kept_values)
+    def iter_chunks(self, chunk_size: int):
+        '''
+        Yields the values as new IteratorArray objects of up to chunk_size values
+        '''
+        if self.floats != None:
+            for start in range(0, self.length, chunk_size):
+                yield IteratorArray.from_values(self.floats[start:start+chunk_size], self.number_type)
+            return None
+        start_offset = 0
+        for start in range(0, self.length, chunk_size):
+            end = min(start + chunk_size, self.length)
+            end_offset = start_offset
+            for _ in range(end - start):
+                end_offset = self.decimal_text.find(b",", end_offset)+1 or len(self.decimal_text)+1
+            yield IteratorArray.from_decimal_text(self.decimal_text[start_offset:end_offset-1], end - start, self.number_type)
+            start_offset = end_offset
+    def iter_chunks_backward(self, end: int, chunk_size: int, max_chunk_size: int):
+        '''
+        Yields (start, chunk), the values from index start up to end as new
+        IteratorArray objects, from end back to the first value. chunk_size
+        doubles for each chunk, up to max_chunk_size. The separators of decimal
+        text are each only searched for once, and no value is parsed.
+        '''
+        if self.floats != None:
+            while end > 0:
+                start = max(end - chunk_size, 0)
+                yield (start, IteratorArray.from_values(self.floats[start:end], self.number_type))
+                end = start
+                chunk_size = min(chunk_size*2, max_chunk_size)
+            return None
+        end_offset = self.get_text_offset(end)
+        while end > 0:
+            start = max(end - chunk_size, 0)
+            start_offset = end_offset
+            for _ in range(end - start):
+                start_offset = self.decimal_text.rfind(b",", 0, start_offset-1)+1
+            yield (start, IteratorArray.from_decimal_text(self.decimal_text[start_offset:end_offset-1], end - start, self.number_type))
+            end = start
+            end_offset = start_offset
+            chunk_size = min(chunk_size*2, max_chunk_size)
+    def get_text_offset(self, index: int) -> int:
+        '''
+        Returns the offset in decimal_text that the value at index starts at,
+        as if there was a separator after the last value for index == length.
+        The separators are searched for from the closer end.
+        '''
+        if index >= self.length:
+            return len(self.decimal_text)+1
+        if index <= self.length - index:
+            offset = 0
+            for _ in range(index):
+                offset = self.decimal_text.index(b",", offset)+1
+            return offset
+        offset = len(self.decimal_text)
+        for _ in range(self.length - index):
+            offset = self.decimal_text.rindex(b",", 0, offset)
+        return offset+1
+    def get_writable_floats(self) -> array.array:
+        if not isinstance(self.floats, array.array):
+            floats = array.array("d")
+            floats.frombytes(self.floats.cast("B"))
+            self.floats = floats
+        return self.floats
+    def use_decimal_text(self) -> None:
+        values = list(self)
+        self.floats = None
+        self.decimal_text = bytearray(",".join([str(value) for value in values]).encode("ascii"))
+    def pop(self):
+        if self.length == 0:
+            raise IndexError("pop from empty IteratorArray")
+        self.length -= 1
+        if self.floats != None:
+            value = self.get_writable_floats().pop()
+            return value if self.number_type is float else decimal.Decimal(value)
+        separator_index = self.decimal_text.rfind(b",")
+        value = self.number_type(self.decimal_text[separator_index+1:].decode("ascii"))
+        del self.decimal_text[max(separator_index, 0):]
+        return value
+    def __iter__(self):
+        if self.floats != None:
+            if self.number_type is float:
+                return iter(self.floats)
+            return map(decimal.Decimal, self.floats)
+        if self.length == 0:
+            return iter(())
+        return map(self.number_type, self.decimal_text.decode("ascii").split(","))
+    def __getitem__(self, index: int):
+        if self.floats != None:
+            value = self.floats[index]
+            return value if self.number_type is float else decimal.Decimal(value)
+        if index < 0:
+            index += self.length
+        if index < 0 or index >= self.length:
+            raise IndexError("IteratorArray index out of range")
+        # Only the one value is parsed
+        return self.number_type(self.decimal_text[self.get_text_offset(index):self.get_text_offset(index+1)-1].decode("ascii"))
+    def __len__(self) -> int:
+        return self.length
+    def copy(self):
+        iterator = IteratorArray((), self.number_type)
+        iterator.floats = None if self.floats == None else self.floats[:]
+        iterator.decimal_text = None if self.decimal_text == None else self.decimal_text[:]
+        iterator.length = self.length
+        return iterator
+    def get_storage_size(self) -> int:
+        '''
+        Returns the number of bytes used to hold the values
+        '''
+        if self.floats != None:
+            return self.floats.itemsize * len(self.floats)
+        return len(self.decimal_text)
+    def __repr__(self) -> str:
+        return f"IteratorArray({list(self)})"
+
+ITERATOR_PIPELINE_CHUNK_SIZE = 1 << 14 # Values passed through the stages of a lazy iterator at a time
+
+class IteratorPipelineError(Exception):
+    '''
+    Raised when a stage of an IteratorPipeline reports errors for a value
+    '''
+    def __init__(self, errors: list[str]):
+        super().__init__(errors)
+        self.errors = errors
+
+class IteratorPipelineStage:
+    '''
+    A !map or !filter recorded by a lazy iterator. The variables and decimal
+    context are those of when the command ran, so the stage gives the same
+    values as the command would have, whenever it is applied.
+    @Param: expression, None for a '!filter ITER A CMP B' comparison
+    @Param: comparison, (operands, compare) as taken by get_comparison_mask()
+    '''
+    def __init__(self, command_name: str, iterator_name: str, expression: str or None, comparison: tuple or None = None):
+        self.command_name = command_name
+        self.iterator_name = iterator_name
+        self.expression = expression
+        self.comparison = comparison
+        self.variables = get_interpreter().variables.copy()
+        self.decimal_context = decimal.getcontext().copy()
+    def apply(self, chunk: IteratorArray) -> IteratorArray:
+        '''
+        Returns the values of chunk after this stage, chunk may be modified.
+        Raises IteratorPipelineError
+        '''
+        with decimal.localcontext(self.decimal_context):
+            if self.expression == None:
+                chunk.compress(get_comparison_mask(chunk, *self.comparison))
+                return chunk
+            results = eval_iterator_kernel(self.expression, self.iterator_name, chunk, self.variables)
+            if results is None:
+                results = self.eval_each(chunk)
+        if self.command_name == "map":
+            if not isinstance(results, list):
+                results = array.array("d", results.tobytes())
+            return IteratorArray.from_values(results, chunk.number_type)
+        if not isinstance(results, list):
+            results = results != 0
+        chunk.compress(results)
+        return chunk
+    def eval_each(self, chunk: IteratorArray) -> list:
+        '''
+        Evaluates the expression for each value of chunk through eval_expression(),
+        with the stage's variables in place of the interpreter's
+        '''
+        interpreter = get_interpreter()
+        interpreter_variables = interpreter.variables
+        interpreter.variables = self.variables
+        try:
+            results = []
+            for value in chunk:
+                self.variables[self.iterator_name] = value
+                result, errors = eval_expression(self.expression)
+                if result == None:
+                    raise IteratorPipelineError(errors)
+                results.append(result)
+            return results
+        finally:
+            interpreter.variables = interpreter_variables
+
+class IteratorPipeline:
+    '''
+    A lazy iterator, the values of source with stages still to be applied.
+    The stages are applied together, ITERATOR_PIPELINE_CHUNK_SIZE values of
+    source at a time, each time the values are used, so only a chunk of the
+    intermediate values is ever held. Iterating or taking the length raises
+    IteratorPipelineError when a stage reports errors.
+    source is never modified, so may be shared between pipelines.
+    '''
+    def __init__(self, source: IteratorArray, stages: list[IteratorPipelineStage] or None = None):
+        self.source = source
+        self.stages: list[IteratorPipelineStage] = [] if stages == None else stages
+        # (value, source end) from the last get_last_value(), no value of
+        # source from source end on is left by the stages
+        self.last_value_state: tuple[object, int] or None = None
+    def apply_stages(self, chunk: IteratorArray) -> IteratorArray:
+        for stage in self.stages:
+            if len(chunk) == 0:
+                break
+            chunk = stage.apply(chunk)
+        return chunk
+    def iter_chunks(self):
+        '''
+        Yields the values after every stage, as IteratorArray objects
+        '''
+        for chunk in self.source.iter_chunks(ITERATOR_PIPELINE_CHUNK_SIZE):
+            chunk = self.apply_stages(chunk)
+            if len(chunk) > 0:
+                yield chunk
+    def get_last_value(self):
+        '''
+        Returns the last value after every stage, or None if there are none.
+        Only the values of source from the end back to the one giving it are
+        used, in chunks that double in size. Stages are only ever added, and
+        can not add values, so the search starts where the previous call's
+        ended, and a pipeline left empty stays empty.
+        '''
+        end = len(self.source)
+        if self.last_value_state != None:
+            last_value, end = self.last_value_state
+            if last_value is None:
+                return None
+        for start, chunk in self.source.iter_chunks_backward(end, 64, ITERATOR_PIPELINE_CHUNK_SIZE):
+            chunk = self.apply_stages(chunk)
+            if len(chunk) > 0:
+                self.last_value_state = (chunk[len(chunk)-1], end)
+                return self.last_value_state[0]
+            end = start
+        self.last_value_state = (None, 0)
+        return None
+    def materialize(self) -> IteratorArray:
+        iterator = IteratorArray((), self.source.number_type)
+        for chunk in self.iter_chunks():
+            iterator.extend(chunk)
+        return iterator
+    def __iter__(self):
+        return itertools.chain.from_iterable(self.iter_chunks())
+    def __len__(self) -> int:
+        return sum([len(chunk) for chunk in self.iter_chunks()])
+    def copy(self):
+        iterator = IteratorPipeline(self.source, self.stages.copy())
+        iterator.last_value_state = self.last_value_state
+        return iterator
+    def __repr__(self) -> str:
+        stages_str = ", ".join([f"!{stage.command_name} {stage.expression}" for stage in self.stages])
+        return f"IteratorPipeline({self.source!r}, [{stages_str}])"
+
+NUMERIC_MODE_DECIMAL = "decimal"
+NUMERIC_MODE_DECIMAL_NATIVE = "decimal-native"
+NUMERIC_MODE_FLOAT = "float"
+NUMERIC_MODE_NUMBER_TYPES = {NUMERIC_MODE_DECIMAL: decimal.Decimal, NUMERIC_MODE_DECIMAL_NATIVE: decimal.Decimal, NUMERIC_MODE_FLOAT: float}
+'''
+Every number the evaluator works with is of type g_number_type, only change
+through set_numeric_mode()
+'''
+g_numeric_mode = NUMERIC_MODE_DECIMAL
+g_number_type = decimal.Decimal
+g_power_function = math.pow
+
+DECIMAL_ROUNDING_MODES = {"half-even": decimal.ROUND_HALF_EVEN, "half-up": decimal.ROUND_HALF_UP, "half-down": decimal.ROUND_HALF_DOWN,
+        "up": decimal.ROUND_UP, "down": decimal.ROUND_DOWN, "ceiling": decimal.ROUND_CEILING, "floor": decimal.ROUND_FLOOR, "05up": decimal.ROUND_05UP}
+DEFAULT_DECIMAL_PRECISION = decimal.DefaultContext.prec
+DEFAULT_DECIMAL_ROUNDING = decimal.DefaultContext.rounding
+'''
+The decimal context every script starts with, see set_decimal_context()
+'''
+g_default_decimal_precision = DEFAULT_DECIMAL_PRECISION
+g_default_decimal_rounding = DEFAULT_DECIMAL_ROUNDING
+
+PROGRAM_LICENSE = """
+Copyright 2025 CoreTurboBoost
+
+Redistribution and use in source and binary forms, with or without modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice, this list of conditions and the following disclaimer.
+
+2. Redistributions in binary form must reproduce the above copyright notice, this list of conditions and the following disclaimer in the documentation and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS “AS IS” AND
+ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR
+ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY
+THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN
+IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+def print_program_license():
+    print(PROGRAM_LICENSE)
+
+def log10(x):
+    return math.log(x, 10)
+def log2(x):
+    return math.log(x, 2)
+def cosec(x):
+    return 1/math.sin(x)
+def sec(x):
+    return 1/math.cos(x)
+def cot(x):
+    return 1/math.tan(x)
+
+def negate(x):
+    return -x
+
+def remainder(a, b):
+    # decimal.Decimal % takes the sign of a, for floats only math.fmod does the same
+    if type(a) is float:
+        return math.fmod(a, b)
+    return a % b
+
+'''
+decimal.Decimal versions of the unary functions, used by the decimal-native
+numeric mode. Each is computed with guard digits, then rounded to the current
+decimal context. Failures raise the same exception types as the math module.
+'''
+decimal_pi_cache: dict[int, decimal.Decimal] = {}
+def decimal_pi() -> decimal.Decimal:
+    precision = decimal.getcontext().prec
+    pi = decimal_pi_cache.get(precision)
+    if pi == None:
+        with decimal.localcontext() as context:
+            context.prec += 2
+            three = decimal.Decimal(3)
+            last_sum, term, pi, n, na, d, da = 0, three, three, 1, 0, 0, 24
+            while pi != last_sum:
+                last_sum = pi
+                n, na = n+na, na+8
+                d, da = d+da, da+32
+                term = (term * n) / d
+                pi += term
+        pi = +pi
+        decimal_pi_cache[precision] = pi
+    return pi
+
+def reduce_decimal_angle(x: decimal.Decimal) -> decimal.Decimal:
+    '''
+    Returns x reduced into [-pi, pi], using enough digits of pi for the size of x
+    '''
+    with decimal.localcontext() as context:
+        context.prec += max(0, x.adjusted()) + 2
+        return x.remainder_near(2*decimal_pi())
+
+def decimal_sin(x: decimal.Decimal) -> decimal.Decimal:
+    if x.is_nan():
+        return +x
+    if x.is_infinite():
+        raise ValueError("math domain error")
+    with decimal.localcontext() as context:
+        context.prec += 2
+        x = reduce_decimal_angle(x)
+        i, last_sum, sum, factorial, numerator, sign = 1, 0, x, 1, x, 1
+        while sum != last_sum:
+            last_sum = sum
+            i += 2
+            factorial *= i * (i-1)
+            numerator *= x * x
+            sign *= -1
+            sum += numerator / factorial * sign
+    return +sum
+
+def decimal_cos(x: decimal.Decimal) -> decimal.Decimal:
+    if x.is_nan():
+        return +x
+    if x.is_infinite():
+        raise ValueError("math domain error")
+    with decimal.localcontext() as context:
+        context.prec += 2
+        x = reduce_decimal_angle(x)
+        i, last_sum, sum, factorial, numerator, sign = 0, 0, 1, 1, 1, 1
+        while sum != last_sum:
+            last_sum = sum
+            i += 2
+            factorial *= i * (i-1)
+            numerator *= x * x
+            sign *= -1
+            sum += numerator / factorial * sign
+    return +sum
+
+def decimal_tan(x: decimal.Decimal) -> decimal.Decimal:
+    with decimal.localcontext() as context:
+        context.prec += 2
+        value = decimal_sin(x) / decimal_cos(x)
+    return +value
+
+def decimal_cosec(x: decimal.Decimal) -> decimal.Decimal:
+    with decimal.localcontext() as context:
+        context.prec += 2
+        value = 1 / decimal_sin(x)
+    return +value
+
+def decimal_sec(x: decimal.Decimal) -> decimal.Decimal:
+    with decimal.localcontext() as context:
+        context.prec += 2
+        value = 1 / decimal_cos(x)
+    return +value
+
+def decimal_cot(x: decimal.Decimal) -> decimal.Decimal:
+    with decimal.localcontext() as context:
+        context.prec += 2
+        value = decimal_cos(x) / decimal_sin(x)
+    return +value
+
+def decimal_atan(x: decimal.Decimal) -> decimal.Decimal:
+    if x.is_nan():
+        return +x
+    if x.is_infinite():
+        return +(decimal_pi() / 2).copy_sign(x)
+    with decimal.localcontext() as context:
+        context.prec += 4
+        # atan(x) = 2*atan(x / (1 + sqrt(1 + x*x))), until the series converges quickly
+        doubling_count = 0
+        while abs(x) > decimal.Decimal("0.1"):
+            x = x / (1 + (1 + x*x).sqrt())
+            doubling_count += 1
+        x_squared = x * x
+        last_sum, sum, term, n = 0, x, x, 1
+        while sum != last_sum:
+            last_sum = sum
+            term *= -x_squared
+            n += 2
+            sum += term / n
+        sum *= 2 ** doubling_count
+    return +sum
+
+def decimal_asin(x: decimal.Decimal) -> decimal.Decimal:
+    if abs(x) > 1:
+        raise ValueError("math domain error")
+    with decimal.localcontext() as context:
+        context.prec += 2
+        if abs(x) == 1:
+            value = (decimal_pi() / 2).copy_sign(x)
+        else:
+            value = decimal_atan(x / (1 - x*x).sqrt())
+    return +value
+
+def decimal_acos(x: decimal.Decimal) -> decimal.Decimal:
+    if abs(x) > 1:
+        raise ValueError("math domain error")
+    with decimal.localcontext() as context:
+        context.prec += 2
+        value = decimal_pi() / 2 - decimal_asin(x)
+    return +value
+
+def decimal_sqrt(x: decimal.Decimal) -> decimal.Decimal:
+    if x < 0:
+        raise ValueError("math domain error")
+    return x.sqrt()
+
+def decimal_log10(x: decimal.Decimal) -> decimal.Decimal:
+    if x <= 0:
+        raise ValueError("math domain error")
+    return x.log10()
+
+def decimal_log2(x: decimal.Decimal) -> decimal.Decimal:
+    if x <= 0:
+        raise ValueError("math domain error")
+    if x.is_finite():
+        # Exact for powers of two, as ln(x)/ln(2) is not
+        for power_of_two, sign in [(x, 1), (1/x, -1)]:
+            if power_of_two == power_of_two.to_integral_value():
+                integer = int(power_of_two)
+                if integer & (integer-1) == 0:
+                    return decimal.Decimal(sign * (integer.bit_length()-1))
+    with decimal.localcontext() as context:
+        context.prec += 2
+        value = x.ln() / decimal.Decimal(2).ln()
+    return +value
+
+def decimal_power(a: decimal.Decimal, b: decimal.Decimal) -> decimal.Decimal:
+    if a == 0 and b < 0:
+        raise ValueError("math domain error")
+    try:
+        return a ** b
+    except decimal.InvalidOperation:
+        raise ValueError("math domain error")
+
+def product(array: list) -> decimal.Decimal:
+    if len(array) == 0:
+        return 0
+    val = 1
+    for a in array:
+        val *= a
+    return val
+
+# Functions of the operator module, so they can be pickled for worker processes
+comparison_operators = {"==": operator.eq, "!=": operator.ne,
+        ">=": operator.ge, "<=": operator.le,
+        ">": operator.gt, "<": operator.lt}
+
+PUNCTUATION_CHARS = frozenset(string.punctuation)
+def is_punct(input_str: str) -> bool:
+    return all(char in PUNCTUATION_CHARS for char in input_str)
+
+TRACE_LEXER = 0
+TRACE_PARSER = 1
+TRACE_EVAL = 2
+TRACE_COMMANDS = 3
+TRACE_CONTROL_FLOW = 4
+TRACE_CATEGORY_NAMES = ["lexer", "parser", "eval", "commands", "control-flow"]
+
+TRACE_LEVEL_OFF = 0
+TRACE_LEVEL_DEBUG = 1
+TRACE_LEVEL_VERBOSE = 2
+TRACE_LEVEL_NAMES = ["off", "debug", "verbose"]
+
+'''
+Highest level of trace message output for each category, indexed by the
+TRACE_ category
+'''
+g_trace_levels = [TRACE_LEVEL_VERBOSE] * len(TRACE_CATEGORY_NAMES)
+g_trace_sink: typing.TextIO = sys.stderr
+
+def trace_enabled(category: int, level: int) -> bool:
+    return __debug__ and g_trace_levels[category] >= level
+def trace(category: int, level: int, message_fn: typing.Callable) -> None:
+    '''
+    message_fn: def _() -> str. Only called when the message is output, so a
+    disabled category does not pay for formatting the message.
+    '''
+    if __debug__:
+        if g_trace_levels[category] >= level:
+            g_trace_sink.write(f"[{TRACE_CATEGORY_NAMES[category]}]: {message_fn()}\n")
+def set_trace_level(level: int, categories: list[int] or None = None) -> None:
+    if categories == None:
+        categories = range(len(TRACE_CATEGORY_NAMES))
+    for category in categories:
+        g_trace_levels[category] = level
+def is_any_trace_enabled() -> bool:
+    return any(level > TRACE_LEVEL_OFF for level in g_trace_levels)
+def parse_trace_option(option: str) -> str or None:
+    '''
+    Applies a trace option of the format <CATEGORY>[,<CATEGORY>]...[:<LEVEL>]
+    Returns an error string or None on success
+    '''
+    categories_str, _, level_str = option.partition(":")
+    level = TRACE_LEVEL_VERBOSE
+    if len(level_str) > 0:
+        if level_str not in TRACE_LEVEL_NAMES:
+            return f"Unknown trace level '{level_str}', expected one of {' '.join(TRACE_LEVEL_NAMES)}"
+        level = TRACE_LEVEL_NAMES.index(level_str)
+    categories = []
+    for category_str in categories_str.split(","):
+        if category_str == "all":
+            categories.extend(range(len(TRACE_CATEGORY_NAMES)))
+        elif category_str in TRACE_CATEGORY_NAMES:
+            categories.append(TRACE_CATEGORY_NAMES.index(category_str))
+        else:
+            return f"Unknown trace category '{category_str}', expected all or one of {' '.join(TRACE_CATEGORY_NAMES)}"
+    set_trace_level(level, categories)
+    return None
+
+class TokenError:
+    TYPE_NONE = 0
+    TYPE_UNKNOWN_CHAR = 1
+    TYPE_UNKNOWN_IDENTIFIER = 2
+    TYPE_DECIMAL_POINT_COUNT = 3
+    TYPE_MISSING_DIGIT_VALUE = 4
+    def __init__(self):
+        self.string = ""
+        self.type = TokenError.TYPE_NONE
+    def __str__(self):
+        return f"TokenError(string: {self.string}, type: {self.type})"
+
+class Token:
+    TYPE_BAD = -1
+    TYPE_NONE = 0
+    TYPE_IDENTIFIER = 1
+    TYPE_CONST = 2
+    TYPE_NUMBER = 3
+    TYPE_BINARY_FUNCTION = 4
+    TYPE_OPEN_BRACKET = 9
+    TYPE_CLOSE_BRACKET = 10
+    TYPE_FUNCTION = 11
+    TYPE_VAR = 12
+    TYPE_ASSIGNMENT = 13
+    TYPE_ASSIGNMENT_TARGET = 14
+    def get_str_from_type_enum(enum_type: TYPE_NONE):
+        if (enum_type == Token.TYPE_BAD):
+            return "Bad"
+        elif (enum_type == Token.TYPE_NONE):
+            return "None"
+        elif (enum_type == Token.TYPE_IDENTIFIER):
+            return "Identifier"
+        elif (enum_type == Token.TYPE_CONST):
+            return "Const"
+        elif (enum_type == Token.TYPE_NUMBER):
+            return "Number"
+        elif (enum_type == Token.TYPE_BINARY_FUNCTION):
+            return "Binary Function"
+        elif (enum_type == Token.TYPE_OPEN_BRACKET):
+            return "Open bracket"
+        elif (enum_type == Token.TYPE_CLOSE_BRACKET):
+            return "Close bracket"
+        elif (enum_type == Token.TYPE_FUNCTION):
+            return "Function"
+        elif (enum_type == Token.TYPE_VAR):
+            return "Variable"
+        elif (enum_type == Token.TYPE_ASSIGNMENT):
+            return "Assignment"
+        elif (enum_type == Token.TYPE_ASSIGNMENT_TARGET):
+            return "Assignment target"
+        else:
+            return "Unknown"
+
+    # Object specific methods
+    __slots__ = ("lexeame", "type", "char_index", "error_object", "value", "slot")
+    def __init__(self, lexeame: str = "", token_type: int = TYPE_NONE, char_index: int = 0, error_object: TokenError = None):
+        self.lexeame = lexeame
+        self.type = token_type
+        self.char_index = char_index
+        self.error_object = error_object
+        self.value = None # Parsed number, set when compiled
+        self.slot = None # Variable slot, set when compiled
+    def __getstate__(self) -> tuple:
+        return (self.lexeame, self.type, self.char_index, self.error_object, self.value)
+    def __setstate__(self, state: tuple) -> None:
+        self.lexeame, self.type, self.char_index, self.error_object, self.value = state
+        # Slots are only valid within the process that resolved them
+        self.slot = get_symbol_slot(self.lexeame) if self.type == Token.TYPE_VAR or self.type == Token.TYPE_ASSIGNMENT_TARGET else None
+    def get_type_str(self):
+        return Token.get_str_from_type_enum(self.type)
+    def __str__(self):
+        return f"Token(lexeame: {self.lexeame}, type: {self.get_type_str()}, char_index: {self.char_index}, error_object: {self.error_object})"
+
+def is_valid_var(inp: str) -> bool:
+    if len(inp) == 0:
+        return False
+    remaining_chars_valid = True
+    for ch in inp[1:]:
+        if not (ch.isalnum() or ch == '_'):
+            remaining_chars_valid = False
+            break
+    if inp[0].isalpha() or inp[0] == '_':
+        return remaining_chars_valid
+    return False
+
+def lex_unicode(expression : str) -> list[Token]:
+    '''
+    Character by character lexer, used by lex() for any non ASCII expression.
+    '''
+    # TODO: Refactor to handle lex, rpn-generation, minus-to-negation. Return a
+    #   list of error strings, rather than needing an external function. Want to
+    #   catch as many formatting errors here, leaving only run-time errors and
+    #   variable resolution for the evaluation function
+    skip_char_count = 0
+    tokens = []
+    def append_unknown_char_token(char: str, char_index: int) -> None:
+        error_object = TokenError()
+        error_object.type = TokenError.TYPE_UNKNOWN_CHAR
+        print_char = f"\'{char}\'" if char.isprintable() else f"{ord(char)}"
+        error_object.string = f"Unknown char {print_char}"
+        cur_token = Token("", Token.TYPE_BAD, char_index, error_object)
+        tokens.append(cur_token)
+    for char_index, char in enumerate(expression):
+        if (skip_char_count > 0):
+            skip_char_count -= 1
+            continue
+        if (char.isspace()):
+            continue
+        if (char.isdigit() or char == '.'):
+            decimal_count = 0
+            cur_token = Token()
+            cur_token.char_index = char_index
+            cur_token.type = Token.TYPE_NUMBER
+            cur_token.lexeame = ""
+            skip_char_count = -1
+            for char_index in range(char_index, len(expression)):
+                char = expression[char_index]
+                if (char == '.'):
+                    decimal_count += 1
+                    if (decimal_count > 1):
+                        cur_token.type = Token.TYPE_BAD
+                        cur_token.error_object = TokenError()
+                        cur_token.error_object.type = TokenError.TYPE_DECIMAL_POINT_COUNT
+                        cur_token.error_object.string = f"Number cannot have more than one decimal point"
+                        break
+                    cur_token.lexeame += char
+                    skip_char_count += 1
+                elif (char.isdigit()):
+                    cur_token.lexeame += char
+                    skip_char_count += 1
+                else:
+                    break
+            if cur_token.lexeame[-1] == '.':
+                cur_token.type = Token.TYPE_BAD
+                cur_token.error_object = TokenError()
+                cur_token.error_object.type = TokenError.TYPE_MISSING_DIGIT_VALUE
+                cur_token.error_object.string = f"Number is missing a digit after the decimal point"
+            tokens.append(cur_token)
+        elif (char.isalpha() or char == '_'):
+            cur_token = Token()
+            cur_token.char_index = char_index
+            cur_token.type = Token.TYPE_IDENTIFIER
+            cur_token.lexeame = ""
+            skip_char_count -= 1
+            for char_index in range(char_index, len(expression)):
+                char = expression[char_index]
+                if (char.isalnum() or char == '_'):
+                    cur_token.lexeame += char
+                    skip_char_count += 1
+                else:
+                    break
+            if (cur_token.lexeame in KNOWN_CONSTS.keys()):
+                cur_token.type = Token.TYPE_CONST
+            elif (cur_token.lexeame in KNOWN_FUNCTIONS.keys()):
+                cur_token.type = Token.TYPE_FUNCTION
+            elif (cur_token.lexeame == 'A'):
+                cur_token.type = Token.TYPE_NUMBER
+                cur_token.lexeame = str(get_interpreter().previous_answer)
+            else:
+                cur_token.type = Token.TYPE_VAR
+                #cur_token.error_object = TokenError()
+                #cur_token.error_object.type = TokenError.TYPE_UNKNOWN_IDENTIFIER
+                #cur_token.error_object.string = f"Unknown constant or function \'{cur_token.lexeame}\'"
+            tokens.append(cur_token)
+        elif (char == '('):
+            tokens.append(Token('(', Token.TYPE_OPEN_BRACKET, char_index, None))
+        elif (char == ')'):
+            tokens.append(Token(')', Token.TYPE_CLOSE_BRACKET, char_index, None))
+        elif is_punct(char):
+            trial_function = f"{char}"
+            for sub_char_index, sub_char in enumerate(expression[char_index+1:]):
+                if not is_punct(sub_char):
+                    break
+                sub_char_index += char_index
+                trial_function += sub_char
+                found_name = None
+                skip_char_count += 1
+                if len(trial_function) == binary_functions_max_name_len:
+                    break
+            while len(trial_function) > 0:
+                matched_binary_fn = False
+                for binary_fn in binary_function_names:
+                    if trial_function == binary_fn:
+                        tokens.append(Token(trial_function, Token.TYPE_BINARY_FUNCTION, char_index, None))
+                        matched_binary_fn = True
+                        break
+                if matched_binary_fn:
+                    break
+                if (trial_function == '='):
+                    tokens.append(Token('=', Token.TYPE_ASSIGNMENT, char_index, None))
+                    break
+                skip_char_count -= 1
+                trial_function = trial_function[:len(trial_function)-1]
+            if len(trial_function) == 0:
+                append_unknown_char_token(char, char_index)
+        else:
+            append_unknown_char_token(char, char_index)
+    return tokens
+
+LEX_CHAR_CLASS_OTHER = 0
+LEX_CHAR_CLASS_SPACE = 1
+LEX_CHAR_CLASS_NUMBER = 2
+LEX_CHAR_CLASS_IDENTIFIER = 3
+LEX_CHAR_CLASS_OPEN_BRACKET = 4
+LEX_CHAR_CLASS_CLOSE_BRACKET = 5
+LEX_CHAR_CLASS_PUNCT = 6
+def get_lex_char_class(char: str) -> int:
+    if char.isspace():
+        return LEX_CHAR_CLASS_SPACE
+    if char.isdigit() or char == '.':
+        return LEX_CHAR_CLASS_NUMBER
+    if char.isalpha() or char == '_':
+        return LEX_CHAR_CLASS_IDENTIFIER
+    if char == '(':
+        return LEX_CHAR_CLASS_OPEN_BRACKET
+    if char == ')':
+        return LEX_CHAR_CLASS_CLOSE_BRACKET
+    if is_punct(char):
+        return LEX_CHAR_CLASS_PUNCT
+    return LEX_CHAR_CLASS_OTHER
+'''
+The lex char class of every ASCII char, indexed by ord(char). Matches the
+checks made by lex_unicode()
+'''
+LEX_ASCII_CHAR_CLASSES = [get_lex_char_class(chr(code)) for code in range(128)]
+LEX_SPACE_PATTERN = re.compile("[" + re.escape("".join(chr(code) for code in range(128) if LEX_ASCII_CHAR_CLASSES[code] == LEX_CHAR_CLASS_SPACE)) + "]+")
+LEX_NUMBER_PATTERN = re.compile(r"[0-9]*\.?[0-9]*")
+LEX_IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+def build_operator_trie(operators: dict[str, int]) -> dict:
+    '''
+    @Param: operators, {lexeame: token_type}
+    Returns nested dicts {char: node}, where a node holds the token type of the
+    lexeame ending at that node under the key None.
+    '''
+    trie = {}
+    for lexeame, token_type in operators.items():
+        node = trie
+        for char in lexeame:
+            node = node.setdefault(char, {})
+        node[None] = token_type
+    return trie
+
+def lex(expression : str) -> list[Token]:
+    '''
+    Table driven lexer. Produces the same tokens as lex_unicode(), which it
+    uses for any expression that is not ASCII only.
+    '''
+    if not expression.isascii():
+        return lex_unicode(expression)
+    tokens = []
+    # Local names, the loop runs once per token
+    append_token = tokens.append
+    char_classes = LEX_ASCII_CHAR_CLASSES
+    match_space = LEX_SPACE_PATTERN.match
+    match_number = LEX_NUMBER_PATTERN.match
+    match_identifier = LEX_IDENTIFIER_PATTERN.match
+    known_consts = KNOWN_CONSTS
+    known_functions = KNOWN_FUNCTIONS
+    expression_len = len(expression)
+    char_index = 0
+    while char_index < expression_len:
+        char = expression[char_index]
+        char_class = char_classes[ord(char)]
+        if char_class == LEX_CHAR_CLASS_SPACE:
+            char_index = match_space(expression, char_index).end()
+        elif char_class == LEX_CHAR_CLASS_IDENTIFIER:
+            end_index = match_identifier(expression, char_index).end()
+            lexeame = expression[char_index:end_index]
+            if (lexeame in known_consts):
+                append_token(Token(lexeame, Token.TYPE_CONST, char_index, None))
+            elif (lexeame in known_functions):
+                append_token(Token(lexeame, Token.TYPE_FUNCTION, char_index, None))
+            elif (lexeame == 'A'):
+                append_token(Token(str(get_interpreter().previous_answer), Token.TYPE_NUMBER, char_index, None))
+            else:
+                append_token(Token(lexeame, Token.TYPE_VAR, char_index, None))
+            char_index = end_index
+        elif char_class == LEX_CHAR_CLASS_NUMBER:
+            end_index = match_number(expression, char_index).end()
+            cur_token = Token(expression[char_index:end_index], Token.TYPE_NUMBER, char_index, None)
+            if end_index < expression_len and expression[end_index] == '.':
+                cur_token.type = Token.TYPE_BAD
+                cur_token.error_object = TokenError()
+                cur_token.error_object.type = TokenError.TYPE_DECIMAL_POINT_COUNT
+                cur_token.error_object.string = f"Number cannot have more than one decimal point"
+            if cur_token.lexeame[-1] == '.':
+                cur_token.type = Token.TYPE_BAD
+                cur_token.error_object = TokenError()
+                cur_token.error_object.type = TokenError.TYPE_MISSING_DIGIT_VALUE
+                cur_token.error_object.string = f"Number is missing a digit after the decimal point"
+            append_token(cur_token)
+            char_index = end_index
+        elif char_class == LEX_CHAR_CLASS_OPEN_BRACKET:
+            append_token(Token('(', Token.TYPE_OPEN_BRACKET, char_index, None))
+            char_index += 1
+        elif char_class == LEX_CHAR_CLASS_CLOSE_BRACKET:
+            append_token(Token(')', Token.TYPE_CLOSE_BRACKET, char_index, None))
+            char_index += 1
+        else:
+            # Longest operator match, walking the trie
+            matched_len = 0
+            matched_type = None
+            node = operator_trie
+            for end_index in range(char_index, expression_len):
+                node = node.get(expression[end_index])
+                if node == None:
+                    break
+                if None in node:
+                    matched_len = end_index+1 - char_index
+                    matched_type = node[None]
+            if matched_len == 0:
+                error_object = TokenError()
+                error_object.type = TokenError.TYPE_UNKNOWN_CHAR
+                error_object.string = f"Unknown char \'{char}\'" if char.isprintable() else f"Unknown char {ord(char)}"
+                append_token(Token("", Token.TYPE_BAD, char_index, error_object))
+                char_index += 1
+                continue
+            append_token(Token(expression[char_index:char_index+matched_len], matched_type, char_index, None))
+            char_index += matched_len
+    return tokens
+
+def get_lex_error_count(tokens : typing.List[Token]):
+    error_count = 0
+    for token in tokens:
+        if (token.type == Token.TYPE_BAD):
+            error_count += 1
+    return error_count
+
+def get_lex_error_strs(tokens: typing.List[Token], heading: str="") -> list[str]:
+    errors = []
+    for token in tokens:
+        if token.type == Token.TYPE_BAD:
+            error = f"{heading}TOKEN ERROR: char {token.char_index+1}. {token.error_object.string}."
+            errors.append(error)
+    return errors
+def print_lex_errors(tokens : typing.List[Token], heading:str="") -> int:
+    errors = get_lex_error_strs(tokens, heading)
+    output_file = get_interpreter().get_output_file()
+    for error in errors:
+        print(error, file=output_file)
+    return len(errors)
+
+def pre_eval_lex_tokens(tokens: list[Token]) -> list[str]:
+    '''
+    Returns (parsed_tokens, errors)
+    @Param: tokens, modified in-place
+    '''
+    pass
+def mark_assignment_targets_ip(tokens: list[Token]) -> None:
+    '''
+    @Param: tokens, modified in place
+    @Note: Marks every variable that is being assigned to. All other variables
+    are resolved to their values during evaluation, so the post fix program
+    does not depend on the current variable values.
+    '''
+    for i, token in enumerate(tokens):
+        if token.type == Token.TYPE_VAR and i+1 < len(tokens):
+            if tokens[i+1].type == Token.TYPE_ASSIGNMENT:
+                tokens[i] = Token(token.lexeame, Token.TYPE_ASSIGNMENT_TARGET, token.char_index, None)
+
+def convert_constants_ip(tokens: list[Token]) -> None:
+    '''
+    @Param: tokens, modified in-place
+    '''
+    for cur_token_index in range(len(tokens)):
+        cur_token = tokens[cur_token_index]
+        if (cur_token.type == Token.TYPE_CONST):
+            tokens[cur_token_index].lexeame = get_constant_str(tokens[cur_token_index].lexeame)
+            tokens[cur_token_index].type = Token.TYPE_NUMBER
+
+def convert_subtraction_to_negation_ip(tokens: list[Token]) -> None:
+    open_bracket_token = Token()
+    open_bracket_token.char_index = -1
+    open_bracket_token.type = Token.TYPE_OPEN_BRACKET
+    open_bracket_token.lexeame = "("
+    close_bracket_token = Token()
+    close_bracket_token.char_index = -1
+    close_bracket_token.type = Token.TYPE_CLOSE_BRACKET
+    close_bracket_token.lexeame = ")"
+    zero_token = Token()
+    zero_token.char_index = -1
+    zero_token.type = Token.TYPE_NUMBER
+    zero_token.lexeame = "0"
+
+    cur_token_index = 0
+    cur_token = None
+    while (cur_token_index < len(tokens)):
+        cur_token = tokens[cur_token_index]
+        if (cur_token.type == Token.TYPE_BINARY_FUNCTION and cur_token.lexeame == "-"): # Special case for the '-' sign (to attempt to keep compatibility with older program versions)
+            if (cur_token_index == 0):
+                if (len(tokens) > 1):
+                    trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"cur_token_index:{cur_token_index} next token type:\'{Token.get_str_from_type_enum(tokens[cur_token_index+1].type)}\'")
+                    if (tokens[cur_token_index+1].type == Token.TYPE_NUMBER or tokens[cur_token_index+1].type == Token.TYPE_CONST or tokens[cur_token_index+1].type == Token.TYPE_IDENTIFIER or tokens[cur_token_index+1].type == Token.TYPE_VAR):
+                        trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: "     Added tokens: (0<token>))")
+                        tokens.insert(0, open_bracket_token)
+                        tokens.insert(1, zero_token)
+                        tokens.insert(cur_token_index+4, close_bracket_token)
+                        cur_token_index += 3
+            else:
+                if (cur_token_index+1 < len(tokens)):
+                    trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"cur_token_index:{cur_token_index} last token type:\'{Token.get_str_from_type_enum(tokens[cur_token_index-1].type)}\', next token type:\'{Token.get_str_from_type_enum(tokens[cur_token_index+1].type)}\'")
+                    if ((tokens[cur_token_index-1].type != Token.TYPE_NUMBER and tokens[cur_token_index-1].type != Token.TYPE_CONST and tokens[cur_token_index-1].type != Token.TYPE_IDENTIFIER and tokens[cur_token_index-1].type != Token.TYPE_VAR and tokens[cur_token_index-1].type != Token.TYPE_CLOSE_BRACKET) and (tokens[cur_token_index+1].type == Token.TYPE_NUMBER or tokens[cur_token_index+1].type == Token.TYPE_CONST or tokens[cur_token_index+1].type == Token.TYPE_IDENTIFIER or tokens[cur_token_index+1].type == Token.TYPE_VAR)):
+                        trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"((tokens[cur_token_index-1].type != Token.TYPE_NUMBER:{tokens[cur_token_index-1].type != Token.TYPE_NUMBER}")
+                        trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"tokens[cur_token_index-1].type != Token.TYPE_CONST:{tokens[cur_token_index-1].type != Token.TYPE_CONST}")
+                        trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"tokens[cur_token_index-1] != Token.TYPE_IDENTIFIER:{tokens[cur_token_index-1].type != Token.TYPE_IDENTIFIER}")
+                        trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"tokens[cur_token_index-1] != Token.TYPE_VAR:{tokens[cur_token_index-1].type != Token.TYPE_VAR}")
+                        trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"tokens[cur_token_index-1] != Token.TYPE_CLOSE_BRACKET:{tokens[cur_token_index-1].type != Token.TYPE_CLOSE_BRACKET}")
+                        trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"tokens[cur_token_index+1].type == Token.TYPE_NUMBER:{tokens[cur_token_index+1].type == Token.TYPE_NUMBER}")
+                        trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"tokens[cur_token_index+1] == Token.TYPE_CONST:{tokens[cur_token_index+1].type == Token.TYPE_CONST}")
+                        trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"tokens[cur_token_index+1] == Token.TYPE_IDENTIFIER:{tokens[cur_token_index+1].type == Token.TYPE_IDENTIFIER}")
+                        trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"tokens[cur_token_index+1] == Token.TYPE_VAR:{tokens[cur_token_index+1].type == Token.TYPE_VAR}")
+                        trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: "     Added tokens: (0<token>))")
+                        tokens.insert(cur_token_index, zero_token)
+                        tokens.insert(cur_token_index, open_bracket_token)
+                        tokens.insert(cur_token_index+4, close_bracket_token)
+                        cur_token_index += 3
+        cur_token_index += 1
+
+def get_op_precedence(token : Token):
+    '''
+    get_precedence of operators
+    '''
+    # larger number greater precedence
+    if token.type == token.TYPE_BINARY_FUNCTION:
+        return BINARY_FUNCTIONS[token.lexeame].precedence
+    if (token.type == Token.TYPE_NONE or token.type == Token.TYPE_OPEN_BRACKET):
+        return LOWEST_PRECEDENCE_VALUE
+    if (token.type == Token.TYPE_ASSIGNMENT):
+        return ASSIGNMENT_PRECEDENCE_VALUE
+    if (token.type == Token.TYPE_FUNCTION):
+        return UNARY_FUNCTION_PRECEDENCE_VALUE
+    trace(TRACE_PARSER, TRACE_LEVEL_DEBUG, lambda: f"get_precedence fn param not recognised token_type:{token.type}")
+    return -1
+def is_operator(token_type : Token):
+    if (token_type == Token.TYPE_BINARY_FUNCTION):
+        return True
+    if (token_type == Token.TYPE_FUNCTION):
+        return True
+    if (token_type == Token.TYPE_ASSIGNMENT):
+        return True
+    return False
+
+def compile_lex_tokens(tokens : typing.List[Token]) -> (list[Token], list[str]):
+    '''
+    Converts the lexed tokens into a post fix program, which does not depend
+    on the values of any variables.
+    Returns (post_fix_token_list: list[Token], errors: list[str])
+       errors : list[str], empty list on success.
+    '''
+    tokens = tokens.copy()
+    mark_assignment_targets_ip(tokens)
+
+    errors = []
+    operators_stack = []
+    post_fix_token_list = []
+
+    # handle minus signs and convert constants
+    convert_constants_ip(tokens)
+    convert_subtraction_to_negation_ip(tokens)
+
+    trace(TRACE_PARSER, TRACE_LEVEL_DEBUG, lambda: f"Printing partial processed tokens:")
+    trace(TRACE_PARSER, TRACE_LEVEL_DEBUG, lambda: " ".join([token.lexeame for token in tokens]))
+
+    #infix to postfix
+    trace_verbose = trace_enabled(TRACE_PARSER, TRACE_LEVEL_VERBOSE)
+    open_bracket_count = 0
+    for token_index, token in enumerate(tokens):
+
+        if trace_verbose:
+            trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"[{token_index}] post fix expression: \'{''.join([str(o.lexeame) + ' ' for o in post_fix_token_list])}\'")
+
+        if (token.type == Token.TYPE_IDENTIFIER or token.type == Token.TYPE_CONST or token.type == Token.TYPE_VAR or token.type == Token.TYPE_ASSIGNMENT_TARGET):
+            post_fix_token_list.append(token)
+        elif (token.type == Token.TYPE_NUMBER):
+            post_fix_token_list.append(token)
+        elif (token.type == Token.TYPE_OPEN_BRACKET):
+            open_bracket_count += 1
+            operators_stack.append(token)
+        elif (token.type == Token.TYPE_CLOSE_BRACKET):
+            open_bracket_count -= 1
+            cur_token = operators_stack[-1]
+            while (cur_token.type != Token.TYPE_OPEN_BRACKET):
+                if (len(operators_stack) == 0):
+                    errors.append("Unmatched brackets, no matching \'(\' found")
+                    break
+                post_fix_token_list.append(operators_stack.pop())
+                cur_token = operators_stack[-1]
+            if (len(operators_stack) > 0):
+                operators_stack.pop() 
+        elif (is_operator(token.type) and token.type == Token.TYPE_FUNCTION):
+            cur_func_prec = get_op_precedence(token)
+            if len(operators_stack) > 0:
+                stack_top_op_precedence = get_op_precedence(operators_stack[-1])
+                while stack_top_op_precedence >= cur_func_prec and operators_stack[-1].type != Token.TYPE_FUNCTION:
+                    post_fix_token_list.append(operators_stack.pop())
+                    if (len(operators_stack) > 0):
+                        stack_top_op_precedence = get_op_precedence(operators_stack[-1])
+                    else:
+                        break
+            operators_stack.append(token)
+
+        elif (is_operator(token.type)):
+            trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"[{token_index}] Considered token as an operator, {token}")
+            cur_op_precedence = get_op_precedence(token)
+            if (len(operators_stack) > 0):
+                stack_top_op_precedence = get_op_precedence(operators_stack[-1])
+            else:
+                stack_top_op_precedence = get_op_precedence(Token())
+            trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"[{token_index}] both precedences (cur, stack_top): ({cur_op_precedence}, {stack_top_op_precedence})")
+            if (cur_op_precedence > stack_top_op_precedence):
+                trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"[{token_index}] Added {token.lexeame} to op stack")
+            while (stack_top_op_precedence >= cur_op_precedence):
+                trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"[{token_index}] Adding operator to post-fix list ({operators_stack[-1].lexeame})")
+                trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"[{token_index}] Adding operator to post-fix list ({operators_stack[-1].lexeame}) then added another operator to operators_stack ({token.lexeame})")
+                post_fix_token_list.append(operators_stack.pop())
+                if (len(operators_stack) > 0):
+                    stack_top_op_precedence = get_op_precedence(operators_stack[-1])
+                else:
+                    stack_top_op_precedence = get_op_precedence(Token())
+            operators_stack.append(token)
+        else:
+            error_string = f"[char_index:{token.char_index}] Token list contains unknown or bad token type"
+            errors.append(error_string)
+    
+    if (len(operators_stack) > 0):
+        trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f"Adding remaining operators on stack to post-fix list, len:{len(operators_stack)}")
+    for operator_index in range(len(operators_stack)):
+        trace(TRACE_PARSER, TRACE_LEVEL_VERBOSE, lambda: f" [{operator_index}] adding operator:{operators_stack[-1].lexeame} to post_fix_token_list")
+        post_fix_token_list.append(operators_stack.pop())
+
+    if (open_bracket_count > 0):
+        errors.append(f"Bracket mismatch. Some brackets dont have \')\', {open_bracket_count} unclosed brackets remaining")
+
+    trace(TRACE_PARSER, TRACE_LEVEL_DEBUG, lambda: f"post fix expression: {''.join([' ' + str(o.lexeame) for o in post_fix_token_list])}")
+
+    bind_post_fix_operands_ip(post_fix_token_list)
+    return (post_fix_token_list, errors)
+
+def bind_post_fix_operands_ip(post_fix_token_list: list[Token]) -> None:
+    '''
+    @Param: post_fix_token_list, modified in place
+    @Note: Parses every number once and resolves every variable to its slot,
+    so evaluation does not need to convert between strings and numbers.
+    '''
+    for token in post_fix_token_list:
+        if token.type == Token.TYPE_NUMBER:
+            token.value = g_number_type(token.lexeame)
+        elif token.type == Token.TYPE_VAR or token.type == Token.TYPE_ASSIGNMENT_TARGET:
+            token.slot = get_symbol_slot(token.lexeame)
+
+def is_number(a) -> bool:
+    return isinstance(a, g_number_type)
+
+def to_number(value) -> decimal.Decimal or float:
+    '''
+    Converts a stored value (e.g. an int count) into g_number_type
+    '''
+    if type(value) is g_number_type:
+        return value
+    if type(value) is int:
+        # Exact either way, without formatting the int
+        return g_number_type(value)
+    return g_number_type(str(value))
+
+def to_whole_number(value, minimum: int, maximum: int) -> int or None:
+    '''
+    Returns value as an int, or None if it is not a whole number from minimum
+    to maximum. Infinity and NaN are None, rather than raising from int()
+    '''
+    value = to_number(value)
+    if isinstance(value, decimal.Decimal):
+        if not value.is_finite():
+            return None
+    elif not math.isfinite(value):
+        return None
+    if value != int(value) or value < minimum or value > maximum:
+        return None
+    return int(value)
+
+def set_numeric_mode(numeric_mode: str) -> None:
+    '''
+    Selects the type of every number and how functions are computed
+      NUMERIC_MODE_DECIMAL (default): decimal.Decimal numbers, functions computed with floats
+      NUMERIC_MODE_DECIMAL_NATIVE: decimal.Decimal numbers and functions, literals are never rounded through a float
+      NUMERIC_MODE_FLOAT: float numbers and functions
+    The mode is shared by every interpreter, the variables and iterators of
+    the current interpreter are converted, and compiled expressions are
+    dropped as their constants have the old type.
+    Raises IteratorPipelineError, if the stages of a lazy iterator report errors
+    '''
+    global g_numeric_mode, g_number_type, g_power_function, g_unary_functions
+    if numeric_mode not in NUMERIC_MODE_NUMBER_TYPES.keys():
+        raise ValueError(f"numeric_mode must be one of {', '.join(NUMERIC_MODE_NUMBER_TYPES.keys())}")
+    interpreter = get_interpreter()
+    variables = interpreter.variables
+    iterator_arrays = interpreter.iterators
+    # The stages of lazy iterators are applied in the mode they were given in
+    for name in list(iterator_arrays.keys()):
+        get_iterator_array(name)
+    g_numeric_mode = numeric_mode
+    g_number_type = NUMERIC_MODE_NUMBER_TYPES[numeric_mode]
+    if numeric_mode == NUMERIC_MODE_DECIMAL_NATIVE:
+        g_power_function = decimal_power
+        g_unary_functions = DECIMAL_NATIVE_FUNCTIONS
+    else:
+        g_power_function = math.pow
+        g_unary_functions = KNOWN_FUNCTIONS
+    g_expression_cache.clear()
+    for name, value in variables.items():
+        if isinstance(value, (decimal.Decimal, float, int)):
+            variables[name] = to_number(value)
+    for name, iterator in iterator_arrays.items():
+        iterator_arrays[name] = IteratorArray([to_number(value) for value in iterator])
+
+def set_decimal_context(precision: int, rounding: str) -> None:
+    '''
+    Sets the precision (significant digits) and rounding (one of the
+    decimal.ROUND_* constants) of the current decimal context. Expressions
+    compiled with another context are compiled again when next used.
+    '''
+    if not isinstance(precision, int):
+        raise TypeError("precision must be of type int")
+    if precision < 1 or precision > decimal.MAX_PREC:
+        raise ValueError(f"precision must be between 1 and {decimal.MAX_PREC}")
+    if rounding not in DECIMAL_ROUNDING_MODES.values():
+        raise ValueError("rounding must be one of the decimal.ROUND_* constants")
+    context = decimal.getcontext()
+    context.prec = precision
+    context.rounding = rounding
+
+def set_default_decimal_context(precision: int, rounding: str) -> None:
+    '''
+    Sets the decimal context every script starts with, and the current one
+    '''
+    global g_default_decimal_precision, g_default_decimal_rounding
+    set_decimal_context(precision, rounding)
+    g_default_decimal_precision = precision
+    g_default_decimal_rounding = rounding
+
+def get_compile_context_key() -> tuple:
+    '''
+    Everything, other than the expression text, that the compiled form of an
+    expression depends on. Constants are folded using the decimal context, and
+    A is lexed as the interpreter's previous answer.
+    '''
+    context = decimal.getcontext()
+    return (g_numeric_mode, context.prec, context.rounding, get_interpreter().previous_answer)
+
+def parse_number_literal(phrase: str) -> decimal.Decimal or float or None:
+    '''
+    Returns the number written in phrase, or None if it is not a number
+    '''
+    if g_numeric_mode == NUMERIC_MODE_DECIMAL_NATIVE:
+        try:
+            value = decimal.Decimal(phrase)
+        except decimal.InvalidOperation:
+            return None
+        return None if value.is_snan() else value
+    try:
+        return g_number_type(float(phrase))
+    except ValueError:
+        return None
+
+def eval_post_fix_tokens(post_fix_token_list : typing.List[Token]) -> (decimal.Decimal or None, list[str]):
+    '''
+    Returns list(evaluated_value: decimal.Decimal, errors: list[str])
+       evaluated_value : decimal.Decimal() or None on error.
+       errors : list[str], empty list on success.
+    @Param: post_fix_token_list, not modified. Can be shared between evaluations
+    '''
+    errors = []
+    numbers_stack: list[decimal.Decimal or str] = []
+    variables = get_interpreter().variables
+    variable_slot_values = variables.slot_values
+    trace_verbose = trace_enabled(TRACE_EVAL, TRACE_LEVEL_VERBOSE)
+
+    # process post fix list
+    for token in post_fix_token_list:
+        if (token.type == Token.TYPE_NUMBER):
+            numbers_stack.append(token.value)
+        if (token.type == Token.TYPE_VAR):
+            value = variable_slot_values.get(token.slot)
+            if value != None:
+                if not is_number(value):
+                    value = g_number_type(str(value))
+                numbers_stack.append(value)
+            else:
+                trace(TRACE_EVAL, TRACE_LEVEL_VERBOSE, lambda: f"Adding variable token {token} to the numbers stack")
+                numbers_stack.append(token.lexeame)
+        elif (token.type == Token.TYPE_ASSIGNMENT_TARGET):
+            trace(TRACE_EVAL, TRACE_LEVEL_VERBOSE, lambda: f"Adding variable token {token} to the numbers stack")
+            numbers_stack.append(token.lexeame)
+        elif (is_operator(token.type)):
+            if (len(numbers_stack) < 1):
+                errors.append("Too many operators, for the number of operands")
+                break
+            operand_a = numbers_stack.pop()
+            if (token.type == Token.TYPE_FUNCTION):
+                if trace_verbose:
+                    trace(TRACE_EVAL, TRACE_LEVEL_VERBOSE, lambda: f"running function {token.lexeame} with parameter {operand_a}")
+                try:
+                    if not is_number(operand_a):
+                        errors.append(f"{[token.char_index+1]} Expecting a number, not a undefined variable")
+                        break
+                    numbers_stack.append(g_number_type(g_unary_functions[token.lexeame.lower()](operand_a)))
+                    continue
+                except ZeroDivisionError:
+                    errors.append(f"{[token.char_index+1]} Function failure, division by zero")
+                    break
+                except ValueError:
+                    errors.append(f"{[token.char_index+1]} Function failure, math domain error")
+                    break
+                except:
+                    errors.append(f"{[token.char_index+1]} Function failure, {sys.exc_info()[1]}")
+                    break
+
+            if (len(numbers_stack) < 1):
+                errors.append("1 Too many operators, for the number of operands")
+                break
+            operand_b = numbers_stack.pop()
+            if token.type == Token.TYPE_BINARY_FUNCTION:
+                if not(is_number(operand_a) and is_number(operand_b)):
+                    errors.append(f"{[token.char_index+1]} Expecting a number, not a variable")
+                    break
+                binary_object = BINARY_FUNCTIONS[token.lexeame]
+                evaluated_num, eval_errors = binary_object.call_callback(operand_b, operand_a)
+                errors.extend(eval_errors)
+                if len(eval_errors) == 0:
+                    numbers_stack.append(evaluated_num)
+            if (token.type == Token.TYPE_ASSIGNMENT):
+                if not is_number(operand_a):
+                    errors.append(f"{[token.char_index+1]} Expecting a number, not a variable")
+                    break
+                if not isinstance(operand_b, str):
+                    errors.append(f"{[token.char_index+1]} Assignment can only occur to a variable")
+                    break
+                variables[operand_b] = operand_a
+                numbers_stack.append(operand_a) # Going to return the value that got assigned to the variable
+        if trace_verbose:
+            trace(TRACE_EVAL, TRACE_LEVEL_VERBOSE, lambda: f"numbers_stack at eval: {numbers_stack}")
+
+    if (len(numbers_stack) > 1):
+        errors.append(f"Too few functions/operators, for the number of operands, {len(numbers_stack)} operands remaining")
+        trace(TRACE_EVAL, TRACE_LEVEL_DEBUG, lambda: f"Error: numbers_stack:{numbers_stack}")
+
+    if (len(errors) > 0):
+        return (None, errors)
+    if len(numbers_stack) == 0:
+        return (None, ["No expression given"])
+    if not is_number(numbers_stack[0]):
+        return (None, ["Remaining value is not a number"])
+    return (numbers_stack[0], errors)
+
+def eval_lex_tokens(tokens : typing.List[Token]) -> (decimal.Decimal or None, list[str]):
+    '''
+    Returns list(evaluated_value: decimal.Decimal, errors: list[str])
+       evaluated_value : decimal.Decimal() or None on error.
+       errors : list[str], empty list on success.
+    '''
+    post_fix_token_list, errors = compile_lex_tokens(tokens)
+    if (len(errors) > 0):
+        return (None, errors)
+    return eval_post_fix_tokens(post_fix_token_list)
+
+g_optimize_expressions = True
+
+'''
+Binary functions whose result is rounded to the decimal context, and which
+can only fail by raising (never by reporting an error and carrying on).
+'''
+OPTIMIZER_ROUNDED_BINARY_FUNCTIONS = frozenset(["+", "-", "*", ">", "<", ">=", "<=", "==", "!=", "&&", "||"])
+OPTIMIZER_BOOLEAN_BINARY_FUNCTIONS = frozenset([">", "<", ">=", "<=", "==", "!=", "&&", "||"])
+
+class PostFixNode:
+    '''
+    A sub expression found by optimize_post_fix_tokens()
+      value: the folded decimal.Decimal, or None when the sub expression is not constant
+      rounded: when the result has been rounded to the decimal context, so is unchanged by x*1
+      never_negative_zero: when the result can never be -0, so is unchanged by negate(negate(x))
+      may_fail: when evaluating it can report an error and leave nothing on the numbers stack
+    '''
+    __slots__ = ("tokens", "value", "rounded", "never_negative_zero", "may_fail", "negated_node")
+    def __init__(self, tokens: list[Token], value: decimal.Decimal or None = None, rounded: bool = False, never_negative_zero: bool = False, may_fail: bool = False):
+        self.tokens = tokens
+        self.value = value
+        self.rounded = rounded
+        self.never_negative_zero = never_negative_zero
+        self.may_fail = may_fail
+        self.negated_node: PostFixNode or None = None
+    def is_exactly_one(self) -> bool:
+        if type(self.value) is float:
+            return self.value == 1.0
+        # 1.0 is not an identity, x*1.0 changes the exponent of x
+        return self.value != None and self.value.as_tuple() == (0, (1,), 0)
+
+def new_folded_node(value: decimal.Decimal, operator_token: Token) -> PostFixNode:
+    token = Token()
+    token.type = Token.TYPE_NUMBER
+    token.lexeame = str(value)
+    token.char_index = operator_token.char_index
+    token.value = value
+    return PostFixNode([token], value)
+
+def optimize_post_fix_tokens(post_fix_token_list: list[Token]) -> (list[Token], int):
+    '''
+    Folds every constant sub expression into a single number, and removes the
+    identities x*1, x/1 and negate(negate(x)) where they cannot change the
+    result of x.
+    Returns (optimized_post_fix_token_list: list[Token], removed_node_count: int)
+    @Param: post_fix_token_list, not modified. Must be error free
+    @Note: Folding uses the current decimal context. Sub expressions that
+    report an error or raise when folded are left as they are, so are still
+    reported when evaluated. x+0 is never removed, as it can change the
+    exponent of x and the sign of -0. 1*x is never removed, as the 1 would
+    still be on the numbers stack if x fails, changing the reported errors.
+    '''
+    nodes_stack: list[PostFixNode] = []
+    for token in post_fix_token_list:
+        if token.type == Token.TYPE_NUMBER:
+            nodes_stack.append(PostFixNode([token], token.value))
+        elif token.type == Token.TYPE_VAR or token.type == Token.TYPE_ASSIGNMENT_TARGET:
+            nodes_stack.append(PostFixNode([token]))
+        elif token.type == Token.TYPE_FUNCTION:
+            if len(nodes_stack) < 1:
+                return (post_fix_token_list, 0)
+            operand = nodes_stack.pop()
+            function_name = token.lexeame.lower()
+            if operand.value != None:
+                try:
+                    nodes_stack.append(new_folded_node(g_number_type(g_unary_functions[function_name](operand.value)), token))
+                    continue
+                except Exception:
+                    pass
+            if function_name == "negate" and operand.negated_node != None:
+                inner_node = operand.negated_node
+                if inner_node.rounded and inner_node.never_negative_zero and not inner_node.may_fail:
+                    nodes_stack.append(inner_node)
+                    continue
+            node = PostFixNode(operand.tokens + [token], may_fail=operand.may_fail)
+            if function_name == "negate":
+                # Negating rounds, and turns -0 into 0 unless rounding towards -infinity
+                node.rounded = True
+                node.never_negative_zero = decimal.getcontext().rounding != decimal.ROUND_FLOOR
+                node.negated_node = operand
+            nodes_stack.append(node)
+        elif token.type == Token.TYPE_BINARY_FUNCTION:
+            if len(nodes_stack) < 2:
+                return (post_fix_token_list, 0)
+            operand_a = nodes_stack.pop()
+            operand_b = nodes_stack.pop()
+            if operand_a.value != None and operand_b.value != None:
+                try:
+                    evaluated_num, eval_errors = BINARY_FUNCTIONS[token.lexeame].call_callback(operand_b.value, operand_a.value)
+                    if len(eval_errors) == 0:
+                        nodes_stack.append(new_folded_node(evaluated_num, token))
+                        continue
+                except Exception:
+                    pass
+            if token.lexeame == "*" or token.lexeame == "/":
+                if operand_a.is_exactly_one() and operand_b.rounded and not operand_b.may_fail:
+                    nodes_stack.append(operand_b)
+                    continue
+            node = PostFixNode(operand_b.tokens + operand_a.tokens + [token], may_fail=operand_a.may_fail or operand_b.may_fail)
+            node.rounded = token.lexeame in OPTIMIZER_ROUNDED_BINARY_FUNCTIONS or token.lexeame in ("/", "%")
+            node.never_negative_zero = token.lexeame in OPTIMIZER_BOOLEAN_BINARY_FUNCTIONS
+            node.may_fail = node.may_fail or token.lexeame not in OPTIMIZER_ROUNDED_BINARY_FUNCTIONS
+            nodes_stack.append(node)
+        elif token.type == Token.TYPE_ASSIGNMENT:
+            if len(nodes_stack) < 2:
+                return (post_fix_token_list, 0)
+            operand_a = nodes_stack.pop()
+            operand_b = nodes_stack.pop()
+            nodes_stack.append(PostFixNode(operand_b.tokens + operand_a.tokens + [token], may_fail=operand_a.may_fail or operand_b.may_fail))
+        else:
+            return (post_fix_token_list, 0)
+    if len(nodes_stack) != 1:
+        return (post_fix_token_list, 0)
+    optimized_post_fix_token_list = nodes_stack[0].tokens
+    return (optimized_post_fix_token_list, len(post_fix_token_list) - len(optimized_post_fix_token_list))
+
+g_compile_expressions = False
+
+'''
+Python source templates for the binary functions, used by the expression
+compiler. Each must behave exactly as the BinaryFunction callback, raising an
+exception wherever the callback or its pre condition would report an error.
+'''
+COMPILED_BINARY_FUNCTION_TEMPLATES = {
+    "+": "({a} + {b})",
+    "-": "({a} - {b})",
+    "*": "({a} * {b})",
+    "/": "({a} / {b})",
+    "%": "({a} % {b})",
+    "^": "_number(_pow({a}, {b}))",
+    ">": "_number({a} > {b})",
+    "<": "_number({a} < {b})",
+    ">=": "_number({a} >= {b})",
+    "<=": "_number({a} <= {b})",
+    "==": "_number({a} == {b})",
+    "!=": "_number({a} != {b})",
+    "&&": "_number(bool({a}) & bool({b}))",
+    "||": "_number(bool({a}) | bool({b}))",
+}
+COMPILED_FLOAT_BINARY_FUNCTION_TEMPLATES = {**COMPILED_BINARY_FUNCTION_TEMPLATES, "%": "_fmod({a}, {b})"}
+
+class CompiledExpressionFallback(Exception):
+    '''
+    Raised by a compiled expression function when it cannot produce a value,
+    the post fix program is then evaluated by eval_post_fix_tokens() instead.
+    '''
+    pass
+
+def generate_post_fix_source(post_fix_token_list: list[Token], namespace: dict, get_var_source: typing.Callable,
+        binary_function_templates: dict[str, str] or None = None, get_function_source: typing.Callable or None = None) -> (str, str or None) or None:
+    '''
+    Converts a post fix program into a single python expression.
+    Returns (expression_source, assignment_target) or None if the program
+    can not be compiled, in which case it must be interpreted.
+    @Param: namespace, modified in place. Receives the constants and functions
+    referenced by expression_source
+    @Param: get_var_source: def _(var_token: Token) -> str
+    @Param: binary_function_templates, defaults to those of the numeric mode
+    @Param: get_function_source: def _(function_name: str, function_local: str, operand_source: str) -> str
+    @Note: Only an assignment as the final operation is compiled, so a
+    compiled expression has no side effects until its value is known.
+    '''
+    namespace["_number"] = g_number_type
+    namespace["_pow"] = g_power_function
+    namespace["_fmod"] = math.fmod
+    if binary_function_templates == None:
+        binary_function_templates = COMPILED_FLOAT_BINARY_FUNCTION_TEMPLATES if g_number_type is float else COMPILED_BINARY_FUNCTION_TEMPLATES
+    if get_function_source == None:
+        get_function_source = lambda function_name, function_local, operand_source: f"_number({function_local}({operand_source}))"
+    operand_stack: list[str] = []
+    assignment_target = None
+    for token_index, token in enumerate(post_fix_token_list):
+        if token.type == Token.TYPE_NUMBER:
+            constant_name = f"_c{token_index}"
+            namespace[constant_name] = token.value
+            operand_stack.append(constant_name)
+        elif token.type == Token.TYPE_VAR:
+            operand_stack.append(get_var_source(token))
+        elif token.type == Token.TYPE_ASSIGNMENT_TARGET:
+            if token_index != 0 or assignment_target != None:
+                return None
+            assignment_target = token.lexeame
+        elif token.type == Token.TYPE_FUNCTION:
+            if len(operand_stack) < 1:
+                return None
+            function_local = f"_f_{token.lexeame.lower()}"
+            namespace[function_local] = g_unary_functions[token.lexeame.lower()]
+            operand_stack.append(get_function_source(token.lexeame.lower(), function_local, operand_stack.pop()))
+        elif token.type == Token.TYPE_BINARY_FUNCTION:
+            template = binary_function_templates.get(token.lexeame)
+            if template == None or len(operand_stack) < 2:
+                return None
+            operand_a = operand_stack.pop()
+            operand_b = operand_stack.pop()
+            operand_stack.append(template.format(a=operand_b, b=operand_a))
+        elif token.type == Token.TYPE_ASSIGNMENT:
+            if assignment_target == None or token_index != len(post_fix_token_list)-1:
+                return None
+        else:
+            return None
+    if len(operand_stack) != 1:
+        return None
+    return (operand_stack[0], assignment_target)
+
+def get_var_locals_source(var_locals: dict[int, str]) -> list[str]:
+    '''
+    Returns the source lines, of a function taking variables, that read each
+    slot of var_locals into its local as g_number_type
+    '''
+    source_lines = []
+    if len(var_locals) > 0:
+        source_lines.append("    _slot_values = variables.slot_values.get")
+    for slot, var_local in var_locals.items():
+        source_lines.append(f"    {var_local} = _slot_values({slot!r})")
+        source_lines.append(f"    if {var_local} is None: raise _fallback()")
+        source_lines.append(f"    if type({var_local}) is not _number: {var_local} = _number(_str({var_local}))")
+    return source_lines
+
+def compile_post_fix_tokens(post_fix_token_list: list[Token]) -> typing.Callable or None:
+    '''
+    Builds a python function from a post fix program, using compile().
+    Returns def _(variables: SymbolTable) -> decimal.Decimal, or None if the
+    program can not be compiled. The function raises an exception wherever
+    eval_post_fix_tokens() would return errors.
+    '''
+    namespace = {"_str": str, "_fallback": CompiledExpressionFallback}
+    var_locals: dict[int, str] = {}
+    def get_var_source(var_token: Token) -> str:
+        if var_token.slot not in var_locals:
+            var_locals[var_token.slot] = f"_v{len(var_locals)}"
+        return var_locals[var_token.slot]
+    generated_source = generate_post_fix_source(post_fix_token_list, namespace, get_var_source)
+    if generated_source == None:
+        return None
+    expression_source, assignment_target = generated_source
+    source_lines = ["def _compiled_expression(variables):"]
+    source_lines += get_var_locals_source(var_locals)
+    source_lines.append(f"    _value = {expression_source}")
+    if assignment_target != None:
+        source_lines.append(f"    variables[{assignment_target!r}] = _value")
+    source_lines.append("    return _value")
+    source = "\n".join(source_lines)
+    trace(TRACE_PARSER, TRACE_LEVEL_DEBUG, lambda: f"compiled expression source:\n{source}")
+    exec(compile(source, "<sccalc expression>", "exec"), namespace)
+    return namespace["_compiled_expression"]
+
+numpy_import_attempted = False
+numpy_module = None
+def get_numpy():
+    '''
+    Returns the numpy module, or None if it is not installed. It is only
+    imported on first use, as importing it is slow.
+    '''
+    global numpy_import_attempted, numpy_module
+    if not numpy_import_attempted:
+        numpy_import_attempted = True
+        try:
+            import numpy
+            numpy_module = numpy
+        except ImportError:
+            trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: "numpy is not installed, iterator kernels are list comprehensions")
+    return numpy_module
+
+def numpy_elementwise(function: typing.Callable, *operands):
+    '''
+    Applies a python function to each element of the numpy array (or scalar)
+    operands, for functions without a numpy version giving the same result
+    '''
+    numpy = get_numpy()
+    return numpy.asarray(numpy.frompyfunc(function, len(operands), 1)(*operands), dtype=numpy.float64)
+
+'''
+Python source templates for the binary functions over numpy float64 arrays,
+used by iterator kernels. Only operations numpy computes with exactly the
+same result as the float callbacks are numpy calls, the rest are applied
+with numpy_elementwise(). Errors are raised by numpy.errstate().
+'''
+NUMPY_BINARY_FUNCTION_TEMPLATES = {
+    "+": "({a} + {b})",
+    "-": "({a} - {b})",
+    "*": "({a} * {b})",
+    "/": "({a} / {b})",
+    "%": "_np.fmod({a}, {b})",
+    "^": "_elementwise(_pow, {a}, {b})",
+    ">": "_np.greater({a}, {b}).astype(_f64)",
+    "<": "_np.less({a}, {b}).astype(_f64)",
+    ">=": "_np.greater_equal({a}, {b}).astype(_f64)",
+    "<=": "_np.less_equal({a}, {b}).astype(_f64)",
+    "==": "_np.equal({a}, {b}).astype(_f64)",
+    "!=": "_np.not_equal({a}, {b}).astype(_f64)",
+    "&&": "_np.logical_and({a}, {b}).astype(_f64)",
+    "||": "_np.logical_or({a}, {b}).astype(_f64)",
+}
+NUMPY_UNARY_FUNCTION_SOURCES = {"negate": "_np.negative", "sqrt": "_np.sqrt"}
+
+def compile_iterator_kernel(post_fix_token_list: list[Token], iterator_name: str, use_numpy: bool) -> typing.Callable or None:
+    '''
+    Builds a python function evaluating a post fix program for every value of
+    an iterator at once, with the iterator's variable as each value.
+    Returns def _(values, variables) -> list or numpy.ndarray, or None if the
+    program can not be compiled (including when it assigns a variable).
+    @Param: use_numpy, values is then a numpy float64 array, and a numpy
+    float64 array of the same length is returned. Otherwise values is any
+    iterable of g_number_type, and a list is returned.
+    @Note: The function raises an exception wherever eval_post_fix_tokens()
+    would return errors for any value, the caller must then evaluate each
+    value through the interpreter to get the exact errors.
+    '''
+    namespace = {"_str": str, "_fallback": CompiledExpressionFallback}
+    iterator_slot = get_symbol_slot(iterator_name)
+    var_locals: dict[int, str] = {}
+    def get_var_source(var_token: Token) -> str:
+        if var_token.slot == iterator_slot:
+            return "_x"
+        if var_token.slot not in var_locals:
+            var_locals[var_token.slot] = f"_v{len(var_locals)}"
+        return var_locals[var_token.slot]
+    if use_numpy:
+        numpy = get_numpy()
+        namespace.update({"_np": numpy, "_f64": numpy.float64, "_elementwise": numpy_elementwise})
+        def get_function_source(function_name: str, function_local: str, operand_source: str) -> str:
+            if function_name in NUMPY_UNARY_FUNCTION_SOURCES:
+                return f"{NUMPY_UNARY_FUNCTION_SOURCES[function_name]}({operand_source})"
+            return f"_elementwise({function_local}, {operand_source})"
+        generated_source = generate_post_fix_source(post_fix_token_list, namespace, get_var_source, NUMPY_BINARY_FUNCTION_TEMPLATES, get_function_source)
+    else:
+        generated_source = generate_post_fix_source(post_fix_token_list, namespace, get_var_source)
+    if generated_source == None or generated_source[1] != None:
+        return None
+    expression_source = generated_source[0]
+    source_lines = ["def _iterator_kernel(_values, variables):"]
+    source_lines += get_var_locals_source(var_locals)
+    if use_numpy:
+        source_lines.append("    _x = _values")
+        # Underflow is not an error for the float callbacks either
+        source_lines.append("    with _np.errstate(all='raise', under='ignore'):")
+        source_lines.append(f"        _value = {expression_source}")
+        source_lines.append("    return _np.broadcast_to(_np.asarray(_value, dtype=_f64), _values.shape)")
+    else:
+        source_lines.append(f"    return [{expression_source} for _x in _values]")
+    source = "\n".join(source_lines)
+    trace(TRACE_PARSER, TRACE_LEVEL_DEBUG, lambda: f"compiled iterator kernel source:\n{source}")
+    exec(compile(source, "<sccalc iterator kernel>", "exec"), namespace)
+    return namespace["_iterator_kernel"]
+
+class CompiledExpression:
+    '''
+    The variable independent form of an expression. Instances are shared by
+    every evaluation of the same expression text, so must not be modified.
+    '''
+    def __init__(self, lex_error_tokens: list[Token], post_fix_tokens: list[Token], errors: list[str]):
+        self.lex_error_tokens = lex_error_tokens
+        self.post_fix_tokens = post_fix_tokens
+        self.errors = errors
+        self.function_compiled = False
+        self.function: typing.Callable or None = None
+        self.removed_node_count = 0 # Set by compile_expression(), from optimize_post_fix_tokens()
+        self.compile_context_key: tuple or None = None # Set by compile_expression(), from get_compile_context_key()
+        self.iterator_kernels: dict[tuple[str, bool], typing.Callable or None] = {}
+    def __getstate__(self) -> dict:
+        # The compiled functions can not be pickled, they are compiled again on first use
+        state = self.__dict__.copy()
+        state["function_compiled"] = False
+        state["function"] = None
+        state["iterator_kernels"] = {}
+        return state
+    def has_lex_errors(self) -> bool:
+        return len(self.lex_error_tokens) > 0
+    def get_function(self) -> typing.Callable or None:
+        '''
+        Returns the result of compile_post_fix_tokens(), compiled on first use
+        '''
+        if not self.function_compiled:
+            self.function_compiled = True
+            if len(self.errors) == 0 and not self.has_lex_errors():
+                self.function = compile_post_fix_tokens(self.post_fix_tokens)
+        return self.function
+    def get_iterator_kernel(self, iterator_name: str, use_numpy: bool) -> typing.Callable or None:
+        '''
+        Returns the result of compile_iterator_kernel(), compiled on first use
+        '''
+        key = (iterator_name, use_numpy)
+        if key not in self.iterator_kernels:
+            kernel = None
+            if len(self.errors) == 0 and not self.has_lex_errors():
+                kernel = compile_iterator_kernel(self.post_fix_tokens, iterator_name, use_numpy)
+            self.iterator_kernels[key] = kernel
+        return self.iterator_kernels[key]
+    def evaluate(self, use_function: bool or None = None) -> (decimal.Decimal or None, list[str]):
+        '''
+        Returns the same as eval_lex_tokens()
+        @Param: use_function, if the result of get_function() is used, defaults to g_compile_expressions
+        '''
+        if len(self.errors) > 0:
+            return (None, self.errors.copy())
+        if use_function == None:
+            use_function = g_compile_expressions
+        if use_function:
+            function = self.get_function()
+            if function != None:
+                try:
+                    return (function(get_interpreter().variables), [])
+                except Exception:
+                    # Re-run through the interpreter, to get the exact errors
+                    pass
+        return eval_post_fix_tokens(self.post_fix_tokens)
+
+class ExpressionCache:
+    '''
+    Bounded least recently used cache of CompiledExpression objects, keyed by
+    the expression text. A max_size of 0 disables the cache. Shared by every
+    interpreter, so the entries are only changed while holding lock.
+    '''
+    def __init__(self, max_size: int):
+        self.lock = threading.Lock()
+        self.entries: collections.OrderedDict[str, CompiledExpression] = collections.OrderedDict()
+        self.max_size = 0
+        self.hit_count = 0
+        self.miss_count = 0
+        self.eviction_count = 0
+        self.set_max_size(max_size)
+    def set_max_size(self, max_size: int) -> None:
+        if not isinstance(max_size, int):
+            raise TypeError("max_size must be of type int")
+        if max_size < 0:
+            raise ValueError("max_size cannot be negative")
+        with self.lock:
+            self.max_size = max_size
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.eviction_count += 1
+    def get(self, expression: str) -> CompiledExpression or None:
+        with self.lock:
+            compiled_expression = self.entries.get(expression)
+            if compiled_expression == None:
+                self.miss_count += 1
+                return None
+            self.hit_count += 1
+            self.entries.move_to_end(expression)
+            return compiled_expression
+    def put(self, expression: str, compiled_expression: CompiledExpression) -> None:
+        if self.max_size == 0:
+            return None
+        with self.lock:
+            self.entries[expression] = compiled_expression
+            self.entries.move_to_end(expression)
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.eviction_count += 1
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+    def reset_stats(self) -> None:
+        self.hit_count = 0
+        self.miss_count = 0
+        self.eviction_count = 0
+    def get_stats_str(self) -> str:
+        return f"expression cache: size {len(self.entries)}/{self.max_size}, hits {self.hit_count}, misses {self.miss_count}, evictions {self.eviction_count}"
+
+DEFAULT_EXPRESSION_CACHE_SIZE = 1024
+g_expression_cache = ExpressionCache(DEFAULT_EXPRESSION_CACHE_SIZE)
+
+def compile_expression(expression: str) -> CompiledExpression:
+    compile_context_key = get_compile_context_key()
+    compiled_expression = g_expression_cache.get(expression)
+    if compiled_expression != None and compiled_expression.compile_context_key == compile_context_key:
+        return compiled_expression
+    lex_tokens = lex(expression)
+    trace(TRACE_LEXER, TRACE_LEVEL_DEBUG, lambda: f"lexed '{expression}' into {len(lex_tokens)} tokens")
+    trace(TRACE_LEXER, TRACE_LEVEL_VERBOSE, lambda: "\n".join([f"  {token}" for token in lex_tokens]))
+    lex_error_tokens = [token for token in lex_tokens if token.type == Token.TYPE_BAD]
+    if len(lex_error_tokens) > 0:
+        compiled_expression = CompiledExpression(lex_error_tokens, [], [])
+    else:
+        post_fix_token_list, errors = compile_lex_tokens(lex_tokens)
+        removed_node_count = 0
+        if g_optimize_expressions and len(errors) == 0:
+            post_fix_token_list, removed_node_count = optimize_post_fix_tokens(post_fix_token_list)
+            trace(TRACE_PARSER, TRACE_LEVEL_DEBUG, lambda: f"optimizer removed {removed_node_count} nodes, post fix expression: {''.join([' ' + str(o.lexeame) for o in post_fix_token_list])}")
+        compiled_expression = CompiledExpression([], post_fix_token_list, errors)
+        compiled_expression.removed_node_count = removed_node_count
+    compiled_expression.compile_context_key = compile_context_key
+    g_expression_cache.put(expression, compiled_expression)
+    return compiled_expression
+
+g_vectorize_iterators = True
+g_lazy_iterators = False
+
+def eval_iterator_kernel(expression: str, iterator_name: str, iterator: IteratorArray or None = None, kernel_variables: SymbolTable or None = None) -> list or None:
+    '''
+    Evaluates expression for every value of an iterator, with the iterator's
+    variable as each value, in a single call of a compiled kernel. NumPy is
+    used for float iterators when it is installed.
+    Returns the values as a list, a numpy float64 array when NumPy was used,
+    or None if each value must be evaluated with eval_expression() instead
+    (the expression can not be vectorized, or reports an error for a value).
+    @Param: iterator, defaults to the IteratorArray named iterator_name
+    @Param: kernel_variables, defaults to the interpreter's variables
+    '''
+    if not g_vectorize_iterators:
+        return None
+    compiled_expression = compile_expression(expression)
+    if iterator == None:
+        iterator = get_interpreter().iterators[iterator_name]
+    if kernel_variables == None:
+        kernel_variables = get_interpreter().variables
+    use_numpy = iterator.number_type is float and iterator.floats != None and get_numpy() != None
+    kernel = compiled_expression.get_iterator_kernel(iterator_name, use_numpy)
+    if kernel == None:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"'{expression}' can not be vectorized")
+        return None
+    try:
+        if use_numpy:
+            numpy = get_numpy()
+            return kernel(numpy.frombuffer(iterator.floats, dtype=numpy.float64), kernel_variables)
+        return kernel(iterator, kernel_variables)
+    except Exception:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"iterator kernel for '{expression}' failed, {sys.exc_info()[1]!r}")
+        return None
+
+def expression_assigns_variable(expression: str) -> bool:
+    compiled_expression = compile_expression(expression)
+    return any([token.type == Token.TYPE_ASSIGNMENT_TARGET for token in compiled_expression.post_fix_tokens])
+
+def can_defer_expression(expression: str) -> bool:
+    '''
+    Returns True if expression can be applied as an IteratorPipelineStage,
+    it compiles without errors and does not assign a variable
+    '''
+    compiled_expression = compile_expression(expression)
+    if len(compiled_expression.errors) > 0 or compiled_expression.has_lex_errors():
+        return False
+    return not expression_assigns_variable(expression)
+
+def get_iterator_array(iterator_name: str) -> IteratorArray:
+    '''
+    Returns the values of an iterator as an IteratorArray. A lazy iterator's
+    stages are applied, and the IteratorArray replaces it.
+    Raises IteratorPipelineError
+    '''
+    iterator_arrays = get_interpreter().iterators
+    iterator = iterator_arrays[iterator_name]
+    if isinstance(iterator, IteratorPipeline):
+        iterator = iterator.materialize()
+        iterator_arrays[iterator_name] = iterator
+    return iterator
+
+def add_iterator_stage(iterator_name: str, stage: IteratorPipelineStage) -> None:
+    '''
+    Records a !map or !filter on an iterator, making it lazy. The iterator's
+    variable is assigned the last value, as by the command.
+    Raises IteratorPipelineError
+    '''
+    interpreter = get_interpreter()
+    iterator = interpreter.iterators[iterator_name]
+    if not isinstance(iterator, IteratorPipeline):
+        iterator = IteratorPipeline(iterator)
+    last_value = iterator.get_last_value()
+    if last_value is not None:
+        interpreter.variables[iterator_name] = last_value
+    iterator.stages.append(stage)
+    interpreter.iterators[iterator_name] = iterator
+    trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"Recorded !{stage.command_name} as stage {len(iterator.stages)} of lazy iterator {iterator_name}")
+
+def eval_expression(expression: str) -> (decimal.Decimal or None, list[str]):
+    return eval_compiled_expression(compile_expression(expression))
+
+def eval_compiled_expression(compiled_expression: CompiledExpression, use_function: bool or None = None) -> (decimal.Decimal or None, list[str]):
+    '''
+    Returns the same as eval_expression()
+    @Param: use_function, as taken by CompiledExpression.evaluate()
+    '''
+    errors = get_lex_error_strs(compiled_expression.lex_error_tokens)
+    if len(errors) > 0:
+        return (None, errors)
+    value, errors = compiled_expression.evaluate(use_function)
+    errors = [f"EVALUATE ERROR: {error}" for error in errors]
+    if len(errors) > 0:
+        return (None, errors)
+    return (value, errors)
+
+class SccalcEmbeddedExit(Exception):
+    def __init__(self, code_or_msg: int or str):
+        super()
+        self.code_or_msg = code_or_msg
+    def get_code_or_msg(self) -> int or str:
+        return self.code_or_msg
+    def __repr__(self) -> str:
+        return f"SccalcEmbeddedExit(exit_code={self.code_or_msg})"
+G_IS_EMBEDDED = False
+def exit_script_command(code_or_msg: int or str):
+    if G_IS_EMBEDDED or get_interpreter().is_embedded:
+        raise SccalcEmbeddedExit(code_or_msg)
+    sys.exit(code_or_msg)
+
+class IOType:
+    IOT_IN = 0
+    IOT_OUT = 1
+    IOT_IN_OUT = 2
+    def to_string(self_type):
+        if self_type == IOType.IOT_IN:
+            return "IN"
+        elif self_type == IOType.IOT_OUT:
+            return "OUT"
+        elif self_type == IOType.IOT_IN_OUT:
+            return "IN-OUT"
+        else:
+            raise Exception("Unhandled IOType str convertions")
+
+class CommandDataType:
+    CDT_LITERAL_NUMBER = 1
+    CDT_VAR = 2
+    CDT_ITERATOR = 3
+
+def merge_tags(a: list[str], b: list[str]) -> list[str]:
+    '''
+    Modifies the 'a' list in place.
+    Returns the the list 'a'
+    '''
+    for val in b:
+        if val in a:
+            continue
+        a.append(val)
+
+class CommandDataPackage:
+    def __init__(self, data_type: CommandDataType, data: float or str):
+        self.data_type = data_type
+        self.data = data
+
+class CommandProcessMatchReturnData:
+    def __init__(self, values: list, errors: list[str], tags: list[str]):
+        if not isinstance(values, list):
+            raise TypeError("values should be of type list")
+        if not isinstance(errors, list):
+            raise TypeError("errors should be of type list[str]")
+        for error in errors:
+            if not isinstance(error, str):
+                raise TypeError("errors elements must be of type str only")
+        if not isinstance(tags, list):
+            raise TypeError("tags should be of type list[str]")
+        for tag in tags:
+            if not isinstance(tag, str):
+                raise TypeError("tags elements must be of type str only")
+        self.values = values
+        self.errors = errors
+        self.tags = tags
+        self.validate_internal_state()
+    def __str__(self) -> str:
+        return f"CommandProcessMatchReturnData({self.values=}, {self.errors=}, {self.tags=})"
+    def __repr__(self) -> str:
+        return self.__str__()
+    def __add__(self, other):
+        values = self.values.copy()
+        errors = self.errors.copy()
+        tags = self.tags.copy()
+        values.extend(other.values)
+        errors.extend(other.errors)
+        merge_tags(tags, other.tags)
+        return CommandProcessMatchReturnData(values, errors, tags)
+    def validate_internal_state(self) -> None:
+        if len(self.values) == 0 and len(self.errors) == 0:
+            raise Exception("Assumption not met. len(values) and len(errors) cannot both be zero")
+        if len(self.values) > 0 and len(self.errors) > 0:
+            raise Exception("Assumption not met. len(values) and len(errors) cannot both be > 0")
+    def successful_match(self) -> bool:
+        self.validate_internal_state()
+        return len(self.values) > 0
+    def has_errors(self) -> bool:
+        self.validate_internal_state()
+        return len(self.errors) > 0
+
+# Set while CommandProcessTree.bind_match_plan() matches a script line, the
+# nodes whose match reads the interpreter's state then return a placeholder
+g_binding_match_plan: contextvars.ContextVar = contextvars.ContextVar("g_binding_match_plan", default=False)
+
+class CommandProcessPlaceholder:
+    '''
+    Stands in for the values of a node in a CommandProcessMatchPlan, the node
+    is matched against phrases again each time the script line runs
+    '''
+    __slots__ = ("node", "phrases", "value_count")
+    def __init__(self, node, phrases: list[str], value_count: int):
+        self.node = node
+        self.phrases = phrases
+        self.value_count = value_count
+
+def get_placeholder_match(node, phrases: list[str], value_count: int) -> CommandProcessMatchReturnData:
+    return CommandProcessMatchReturnData([CommandProcessPlaceholder(node, phrases, value_count)] + [None]*(value_count-1), [], [node.tag])
+
+class CommandProcessMatchPlan:
+    '''
+    The match of a script line's arguments, with which alternative of each
+    node was taken worked out once. Only the nodes that read variables,
+    iterators or expressions are matched again each time the line runs.
+    '''
+    def __init__(self, values: list, tags: list[str]):
+        self.values = values
+        self.tags = tags
+        self.placeholder_indices = [value_index for value_index, value in enumerate(values) if isinstance(value, CommandProcessPlaceholder)]
+    def resolve(self) -> list or None:
+        '''
+        Returns the values of the match, or None when a placeholder node does
+        not match as it did when bound, the line is then matched in full
+        '''
+        values = self.values.copy()
+        for value_index in self.placeholder_indices:
+            placeholder = values[value_index]
+            data = placeholder.node.match(placeholder.phrases)
+            if data.has_errors() or len(data.values) != placeholder.value_count:
+                return None
+            values[value_index:value_index+placeholder.value_count] = data.values
+        return values
+
+class CommandProcessNode: # Abstract
+    def reset_iterator(self) -> None:
+        pass
+    def match(self, phrases: list[str]) -> CommandProcessMatchReturnData:
+        pass
+    def get_str(self) -> str:
+        pass
+
+class CommandProcessRequiredGroup(CommandProcessNode):
+    def __init__(self, nodes: list[CommandProcessNode]):
+        self.nodes = nodes
+        self.reset_iterator()
+    def match(self, phrases: list[str]) -> CommandProcessMatchReturnData:
+        phrases_index = 0
+        operation_final_values = []
+        operation_tags = []
+        for nodes_index in range(len(self.nodes)):
+            if phrases_index >= len(phrases):
+                # Missing required arguments
+                trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: " CommandProcessRequiredGroup: Missing required arguments")
+                return CommandProcessMatchReturnData([], ["Missing required arguments"], [])
+            data = self.nodes[nodes_index].match(phrases[phrases_index:])
+            if data.has_errors():
+                return CommandProcessMatchReturnData([], data.errors, [])
+            operation_final_values.extend(data.values)
+            merge_tags(operation_tags, data.tags)
+            phrases_index += len(data.values)
+        return CommandProcessMatchReturnData(operation_final_values, [], operation_tags)
+    def get_str(self) -> str:
+        nodes_str = ""
+        for i, node in enumerate(self.nodes):
+            if i != 0:
+                nodes_str += " "
+            nodes_str += node.get_str()
+        return f"{nodes_str}"
+
+class CommandProcessXOR(CommandProcessNode):
+    def __init__(self, nodes: list[CommandProcessNode]):
+        self.nodes = nodes
+    def match(self, phrases: list[str]) -> CommandProcessMatchReturnData:
+        phrases_index = 0
+        all_errors: list = []
+        for nodes_index in range(len(self.nodes)):
+            if phrases_index >= len(phrases):
+                trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: " CommandProcessXOR: Missing required arguments")
+                return CommandProcessMatchReturnData([], ["Missing required arguments"], [])
+            data = self.nodes[nodes_index].match(phrases[phrases_index:])
+            if data.has_errors():
+                all_errors.extend(data.errors)
+                continue
+            phrases_index += len(data.values)
+            return CommandProcessMatchReturnData(data.values, [], data.tags)
+        all_errors.extend(["No phrase matches required arguments"])
+        return CommandProcessMatchReturnData([], all_errors, data.tags)
+    def get_str(self) -> str:
+        nodes_str = ""
+        for i, node in enumerate(self.nodes):
+            if i != 0:
+                nodes_str += "|"
+            nodes_str += node.get_str()
+        return f"<{nodes_str}>"
+
+class CommandProcessOptional(CommandProcessNode):
+    def __init__(self, optional_node: CommandProcessNode):
+        self.optional_node = optional_node
+    def match(self, phrases: list[str]) -> CommandProcessMatchReturnData:
+        if len(phrases) == 0:
+            return CommandProcessMatchReturnData([None], [], [])
+        data = self.optional_node.match(phrases)
+        return data
+    def get_str(self) -> str:
+        return f"[{self.optional_node.get_str()}]"
+
+class CommandProcessAddition(CommandProcessNode):
+    def __init__(self, main_node: CommandProcessNode, optional_node: CommandProcessNode):
+        self.main_node = main_node
+        self.optional_node = optional_node
+    def match(self, phrases: list[str]) -> CommandProcessMatchReturnData:
+        if len(phrases) == 0:
+            trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: " CommandProcessAddition: Missing required arguments")
+            return CommandProcessMatchReturnData([], ["Missing required arguements"], [])
+        phrases_index = 0
+        data = self.main_node.match(phrases[phrases_index:])
+        if data.has_errors():
+            return CommandProcessMatchReturnData([], data.errors, [])
+        phrases_index += len(data.values)
+        no_more_phrases = phrases_index == len(phrases)
+        if no_more_phrases:
+            return data
+        optional_data = self.optional_node.match(phrases[phrases_index:])
+        if optional_data.has_errors():
+            return CommandProcessMatchReturnData([], optional_data.errors, [])
+        return data + optional_data
+    def get_str(self) -> str:
+        return f"{self.main_node.get_str()} [{self.optional_node.get_str()}]"
+
+class CommandProcessRepeat(CommandProcessNode):
+    '''
+    Have the match continue untill it returns errors,
+    Two types of behaviours when it errors,
+      either stop processing the matches, and return as a success (yes, even means no match is a success, or could add a check to garantee a single match (even have it as an arguemnt)), 
+      or fail if any matches fail, meaning repeat must always be placed at the end, no exceptions
+    '''
+    def __init__(self, node: CommandProcessNode):
+        self.node = node
+    def match(self, phrases: list[str]) -> CommandProcessMatchReturnData:
+        final_tags = []
+        final_values = []
+        phrasei = 0
+        while phrasei < len(phrases):
+            data = self.node.match(phrases[phrasei:])
+            phrasei += max(len(data.values), 1)
+            if data.has_errors():
+                if len(final_values) == 0:
+                    trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: " CommandProcessRepeat: Requires at least one valid argument")
+                    data.errors.append("Repeat command requires at least one valid argument")
+                    return CommandProcessMatchReturnData([], data.errors, [])
+                return CommandProcessMatchReturnData(final_values, data.errors, final_tags)
+            final_values.extend(data.values)
+            merge_tags(final_tags, data.tags)
+        return CommandProcessMatchReturnData(final_values, data.errors, final_tags)
+    def get_str(self) -> str:
+        return f"{self.node.get_str()}..."
+
+def convert_to_number_or_none(phrase: str) -> decimal.Decimal or None:
+    return parse_number_literal(phrase)
+class CommandProcessLiteralNumber(CommandProcessNode):
+    def __init__(self, tag: str):
+        self.tag = tag
+    def match(self, phrases: list[str]) -> CommandProcessMatchReturnData:
+        if len(phrases) == 0:
+            return CommandProcessMatchReturnData([], ["Missing required arguements"], [])
+        converted_value = convert_to_number_or_none(phrases[0])
+        if converted_value == None:
+            trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: " CommandProcessLiteralNumber: Failed to convert")
+            return CommandProcessMatchReturnData([], [f"Cannot convert '{phrases[0]}' to a number"], [])
+        return CommandProcessMatchReturnData([converted_value], [], [self.tag])
+    def get_str(self) -> str:
+        return "NUMBER"
+class CommandProcessVariable(CommandProcessNode):
+    def __init__(self, io_type: IOType, tag: str, convert_in_var_to_number: bool):
+        self.io_type = io_type
+        self.tag = tag
+        self.convert_in_var_to_number = convert_in_var_to_number
+    def match(self, phrases: list[str]) -> CommandProcessMatchReturnData:
+        variables = get_interpreter().variables
+        if len(phrases) == 0:
+            return CommandProcessMatchReturnData([], ["Missing required arguements"], [])
+        if self.io_type != IOType.IOT_OUT and g_binding_match_plan.get():
+            return get_placeholder_match(self, phrases, 1)
+        phrase = phrases[0]
+        var_exists = variables.get(phrase) != None
+        if self.io_type == IOType.IOT_IN or self.io_type == IOType.IOT_IN_OUT:
+            if not var_exists:
+                trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: " CommandProcessVariable: use of undefined var")
+                return CommandProcessMatchReturnData([], [f"Varible '{phrase}' is undefined"], [])
+            if self.convert_in_var_to_number and self.io_type == IOType.IOT_IN:
+                phrase = variables.get(phrase)
+        return CommandProcessMatchReturnData([phrase], [], [self.tag])
+    def get_str(self) -> str:
+        io_str = IOType.to_string(self.io_type)
+        return f"{io_str}-VAR"
+class CommandProcessIterator(CommandProcessNode):
+    def __init__(self, io_type: IOType, tag: str):
+        self.io_type = io_type
+        self.tag = tag
+    def match(self, phrases: list[str]) -> CommandProcessMatchReturnData:
+        iterator_arrays = get_interpreter().iterators
+        if len(phrases) == 0:
+            return CommandProcessMatchReturnData([], ["Missing required arguements"], [])
+        if self.io_type != IOType.IOT_OUT and g_binding_match_plan.get():
+            return get_placeholder_match(self, phrases, 1)
+        phrase = phrases[0]
+        iterator_exists = iterator_arrays.get(phrase) != None
+        if self.io_type == IOType.IOT_IN or self.io_type == IOType.IOT_IN_OUT:
+            if not iterator_exists:
+                trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f" Available iterators: {iterator_arrays=}")
+                trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: " CommandProcessIterator: use of undefined iter")
+                return CommandProcessMatchReturnData([], [f"Iterator '{phrase}' is undefined"], [])
+        return CommandProcessMatchReturnData([phrase], [], [self.tag])
+    def get_str(self) -> str:
+        io_str = IOType.to_string(self.io_type)
+        return f"{io_str}-ITER"
+class CommandProcessCmpOperator(CommandProcessNode):
+    def __init__(self, tag: str):
+        self.tag = tag
+    def match(self, phrases: list[str]) -> CommandProcessMatchReturnData:
+        if len(phrases) == 0:
+            return CommandProcessMatchReturnData([], ["Missing required arguements"], [])
+        phrase = phrases[0]
+        operator = comparison_operators.get(phrase)
+        if operator == None:
+            trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: " CommandProcessCmpOperator: unrecognised operator")
+            return CommandProcessMatchReturnData([], [f"Comparison operator '{operator}' is unrecognised"], [])
+        return CommandProcessMatchReturnData([operator], [], [self.tag])
+    def get_str(self) -> str:
+        return "CMP-OP"
+class CommandProcessExpression(CommandProcessNode):
+    '''
+    @Param: last_phrase_only, only match when no phrases follow, other than
+    options (phrases starting with '-')
+    '''
+    def __init__(self, tag: str, last_phrase_only: bool = False):
+        self.tag = tag
+        self.last_phrase_only = last_phrase_only
+    def match(self, phrases: list[str]) -> CommandProcessMatchReturnData:
+        if len(phrases) == 0:
+            return CommandProcessMatchReturnData([], ["Missing required arguements"], [])
+        if self.last_phrase_only and len(phrases) > 1 and phrases[1][:1] != "-":
+            trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: " CommandProcessExpression: Expression is not the last phrase")
+            return CommandProcessMatchReturnData([], ["Expression must be the last argument"], [])
+        if g_binding_match_plan.get():
+            # Lexing depends on the previous answer
+            return get_placeholder_match(self, phrases, 1)
+        phrase = phrases[0]
+        compiled_expression = compile_expression(phrase)
+        errors = get_lex_error_strs(compiled_expression.lex_error_tokens)
+        if len(errors) > 0:
+            trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: " CommandProcessExpression: Expression had lexical errors")
+            return CommandProcessMatchReturnData([], errors, [])
+        return CommandProcessMatchReturnData([phrase], [], [self.tag])
+    def get_str(self) -> str:
+        return "EXPRESSION"
+
+class CommandProcessText(CommandProcessNode):
+    def __init__(self, tag: str, match_exact_str: str or None):
+        self.tag = tag
+        self.match_exact_str = match_exact_str
+    def match(self, phrases: list[str]) -> CommandProcessMatchReturnData:
+        if len(phrases) == 0:
+            return CommandProcessMatchReturnData([], ["Missing required arguments"], [])
+        if self.match_exact_str != None:
+            if phrases[0] != self.match_exact_str:
+                return CommandProcessMatchReturnData([], [f"Exact string '{self.match_exact_str}' not matched"], [])
+        return CommandProcessMatchReturnData([phrases[0]], [], [self.tag])
+    def get_str(self) -> str:
+        text = "TEXT" if self.match_exact_str == None else self.match_exact_str
+        return text
+
+def get_and_format_iterator_str(iterator_name: str) -> None or str:
+    '''
+    Raises IteratorPipelineError
+    '''
+    iterator_arrays = get_interpreter().iterators
+    iterator = iterator_arrays.get(iterator_name)
+    if iterator == None:
+        return iterator
+    formatted_iterator_str = ", ".join([str(val) for val in iterator])
+    return f"[{formatted_iterator_str}]"
+
+def get_iterator_format_value(iterator_name: str) -> list:
+    try:
+        return [get_and_format_iterator_str(iterator_name), [f"Iterator '{iterator_name}' is undefined"]]
+    except IteratorPipelineError as e:
+        return [None, e.errors]
+
+'''
+values callback signature
+CHAR: def _(specifier: char) -> list[any or None, list[str]]
+'''
+FORMAT_SPECIFIER_FUNCTIONALITY_MAPPINGS = {
+    "v": lambda a: [get_interpreter().variables.get(a), [f"Variable '{a}' is undefined"]], 
+    "e": lambda a: eval_expression(a),
+    "i": lambda a: get_iterator_format_value(a), 
+    "n": lambda a: [convert_to_number_or_none(a), [f"'{a}' is not a valid literal number"]]
+}
+class CommandProcessFormatString(CommandProcessNode):
+    def __init__(self, tag: str):
+        self.tag = tag
+    def match(self, phrases: list[str]) -> CommandProcessMatchReturnData:
+        if len(phrases) == 0:
+            return CommandProcessMatchReturnData([], ["Missing required arguments, format specifier"], [])
+        if g_binding_match_plan.get():
+            return get_placeholder_match(self, phrases, self.get_value_count(phrases[0]))
+        cur_phrase_phrases_index = 0
+        formatted_string = ""
+        format_string = phrases[cur_phrase_phrases_index]
+        char_skip_count = 0
+        for chari, char in enumerate(format_string):
+            trace(TRACE_COMMANDS, TRACE_LEVEL_VERBOSE, lambda: f"CommandProcessFormatString.match(): Processing current char '{char}'")
+            if char_skip_count > 0:
+                char_skip_count -= 1
+                continue
+            if char == "%":
+                trace(TRACE_COMMANDS, TRACE_LEVEL_VERBOSE, lambda: f"CommandProcessFormatString.match():    char matched %")
+                if chari >= len(format_string):
+                    return CommandProcessMatchReturnData([], ["Format string cannot end with a %, use  %%  for a literal percentage sign.", []])
+                next_char = format_string[chari+1]
+                char_skip_count += 1
+                if next_char == "%":
+                    formatted_string += "%"
+                elif next_char in FORMAT_SPECIFIER_FUNCTIONALITY_MAPPINGS.keys():
+                    if cur_phrase_phrases_index+1 >= len(phrases):
+                        return CommandProcessMatchReturnData([], ["Missing some format specifier arguments"], [])
+                    value, errors = FORMAT_SPECIFIER_FUNCTIONALITY_MAPPINGS[next_char](phrases[cur_phrase_phrases_index+1])
+                    cur_phrase_phrases_index += 1
+                    if value == None:
+                        extended_errors = ["Format string conversion error occurred"]
+                        extended_errors.extend(errors)
+                        return CommandProcessMatchReturnData([], extended_errors, [])
+                    formatted_string += str(value)
+                else:
+                    return CommandProcessMatchReturnData([], [f"Unrecognised format specifier '{next_char}'"], [])
+            else:
+                trace(TRACE_COMMANDS, TRACE_LEVEL_VERBOSE, lambda: f"CommandProcessFormatString.match():    char matched literal '{char}'")
+                formatted_string += char
+        return_values = [formatted_string]
+        return_values.extend([None] * cur_phrase_phrases_index)
+        trace(TRACE_COMMANDS, TRACE_LEVEL_VERBOSE, lambda: f"CommandProcessFormatString.match():    Number of return values:{len(return_values)}, values:{return_values}, phrases:{phrases}")
+        return CommandProcessMatchReturnData(return_values, [], [self.tag])
+    def get_value_count(self, format_string: str) -> int:
+        '''
+        Returns the number of values match() returns for format_string, the
+        string itself and one for each format argument
+        '''
+        value_count = 1
+        chari = 0
+        while chari < len(format_string)-1:
+            if format_string[chari] == "%":
+                if format_string[chari+1] in FORMAT_SPECIFIER_FUNCTIONALITY_MAPPINGS.keys():
+                    value_count += 1
+                chari += 1
+            chari += 1
+        return value_count
+    def get_str(self) -> str:
+        return f"FORMAT_STRING [FORMAT_ARGS].."
+
+class CommandProcessTreeMatchState:
+    def __init__(self, command_matched: bool, args_matched: bool, command_errors: list[str], callback_errors: list[str], values: list, tags: list[str]):
+        self.command_matched = command_matched
+        self.args_matched = args_matched
+        self.command_errors = command_errors
+        self.callback_errors = callback_errors
+        self.values = values
+        self.tags = tags
+        self.assert_check_types()
+    def assert_check_types(self) -> None:
+        if not isinstance(self.command_matched, bool):
+            raise TypeError("command_matched must be of type bool")
+        if not isinstance(self.args_matched, bool):
+            raise TypeError("args_matched must be of type bool")
+        if not isinstance(self.command_errors, list):
+            raise TypeError("command_errors must be of type list[str]")
+        for error in self.command_errors:
+            if not isinstance(error, str):
+                raise TypeError("command_errors must only contain strings")
+        if not isinstance(self.callback_errors, list):
+            raise TypeError("callback_errors must be of type list[str]")
+        for error in self.callback_errors:
+            if not isinstance(error, str):
+                raise TypeError("callback_errors must only contain strings")
+        if not isinstance(self.values, list):
+            raise TypeError("values must be of type list")
+        if not isinstance(self.tags, list):
+            raise TypeError("tags must be of type list")
+        for tag in self.tags:
+            if not isinstance(tag, str):
+                raise TypeError("tags must only contain strings")
+    def __str__(self) -> str:
+        return f"CommandProcessMatchState({self.command_matched=}, {self.args_matched=}, {self.callback_had_errors=}, {self.values=}, {self.tags=})"
+    def callback_had_errors(self) -> bool:
+        return len(self.callback_errors) > 0
+    def command_match_had_errors(self) -> bool:
+        return len(self.command_errors)
+class CommandProcessTree:
+    def __init__(self, name: str, root_node: CommandProcessNode):
+        self.name = name
+        self.root_node = root_node
+    def match_and_run(self, test_phrases: list[str], script_line_number: int, on_success_callback: typing.Callable) -> CommandProcessTreeMatchState:
+        '''
+        on_success_callback: def callback(values: list, tags: list[str]) -> None or list[str]
+        '''
+        if len(test_phrases) == 0:
+            trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"CommandProcessTree.match_and_run(): {self.get_str()}: test_phrases.len()==0")
+            return CommandProcessTreeMatchState(False, False, ["Given len of test_phrases list is zero"], [], [], [])
+        match_name = f"!{self.name}"
+        if test_phrases[0] != match_name:
+            return CommandProcessTreeMatchState(False, False, ["Command provided in test_phrases, does not match the current command name"], [], [], [])
+        return self.match_args_and_run(test_phrases, script_line_number, on_success_callback)
+
+    def bind_match_plan(self, test_phrases: list[str]) -> CommandProcessMatchPlan or None:
+        '''
+        Returns the match plan of test_phrases, already known to start with
+        this command's name, or None when they can not match
+        '''
+        token = g_binding_match_plan.set(True)
+        try:
+            data = self.root_node.match(test_phrases[1:])
+        finally:
+            g_binding_match_plan.reset(token)
+        if data.has_errors() or len(data.values) < len(test_phrases)-1:
+            return None
+        return CommandProcessMatchPlan(data.values, data.tags)
+
+    def match_args_and_run(self, test_phrases: list[str], script_line_number: int, on_success_callback: typing.Callable, match_plan: CommandProcessMatchPlan or None = None) -> CommandProcessTreeMatchState:
+        '''
+        Same as match_and_run(), for test_phrases already known to start with
+        this command's name. match_plan, from bind_match_plan() for the same
+        test_phrases, saves matching them in full
+        '''
+        match_args_len_exact = True
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"given phrases: {test_phrases}")
+        values = match_plan.resolve() if match_plan != None else None
+        if values != None:
+            tags = match_plan.tags
+        else:
+            data = self.root_node.match(test_phrases[1:])
+            trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"match_and_run: root_node ({self.root_node}): return ({data=})")
+            if data.has_errors():
+                output_file = get_interpreter().get_output_file()
+                print(f"[{script_line_number}] Errors occurred for command {self.name}: Expected format '{self.get_str()}'", file=output_file)
+                for error in data.errors:
+                    print(f"  {error}", file=output_file)
+                return CommandProcessTreeMatchState(True, False, data.errors, [], [], [])
+            if len(data.values) < len(test_phrases)-1 and match_args_len_exact:
+                trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: "Early return due to too many arguments")
+                return CommandProcessTreeMatchState(True, False, ["There are more parameters given in test_phrases then what the command matched"], [], [], [])
+            values = data.values
+            tags = data.tags
+        callback_errors = []
+        while None in values:
+            values.remove(None)
+        if on_success_callback != None:
+            try:
+                return_value = on_success_callback(values, tags)
+            except IteratorPipelineError as e:
+                # From a stage of a lazy iterator the command used
+                return_value = e.errors
+            except Exception as e:
+                raise e
+            if return_value != None and isinstance(return_value, (list, tuple)):
+                callback_errors = [f"[{script_line_number}] {self.name}: {error}" for error in return_value]
+                output_file = get_interpreter().get_output_file()
+                for error in callback_errors:
+                    print(error, file=output_file)
+        return CommandProcessTreeMatchState(True, True, [], callback_errors, values, tags)
+
+    def get_str(self) -> str:
+        return f"!{self.name} {self.root_node.get_str()}"
+
+
+class BinaryFunction:
+    def __init__(self, lexeame: str, precedence: int, callback: typing.Callable, pre_condition_fn: typing.Callable or None):
+        self._lexeame = None
+        self.lexeame = lexeame
+        if not isinstance(precedence, int):
+            raise TypeError("precedence must be of type int")
+        if not isinstance(callback, typing.Callable):
+            raise TypeError("callback must be of type callable")
+        if pre_condition_fn == None:
+            pre_condition_fn = lambda a, b: []
+        if not isinstance(pre_condition_fn, typing.Callable):
+            raise TypeError("pre_condition_fn must be of type callable")
+        self._precedence = precedence
+        self._callback = callback
+        self._pre_condition_fn = pre_condition_fn
+    def __str__(self) -> str:
+        return f"BinaryFunction({self.lexeame=}, {self.precedence=}, {self.callback=})"
+
+    def handle_precondition(self, left_operand: decimal.Decimal, right_operand: decimal.Decimal) -> list[str]:
+        '''
+        Return a list of strings representing errors
+        '''
+        return self._pre_condition_fn(left_operand, right_operand)
+
+    @property
+    def lexeame(self) -> chr:
+        return self._lexeame
+    @lexeame.setter
+    def lexeame(self, lexeame: chr) -> None:
+        if not isinstance(lexeame, str):
+            raise TypeError("lexeame must be of type chr")
+        if len(lexeame) < 1:
+            raise ValueError("lexeame must be at least of length 1")
+        if not is_punct(lexeame):
+            raise ValueError("lexeame must be made strictly from punctuation characters")
+        self._lexeame = lexeame
+
+    @property
+    def precedence(self) -> int:
+        return self._precedence
+    
+    @property
+    def callback(self) -> typing.Callable:
+        return self._callback
+
+    def call_callback(self, left_operand: decimal.Decimal, right_operand: decimal.Decimal) -> (decimal.Decimal, list[str]):
+        precondition_errors = self.handle_precondition(left_operand, right_operand)
+        if len(precondition_errors) > 0:
+            return (None, precondition_errors)
+        try:
+            return_val = self._callback(left_operand, right_operand)
+        except (ArithmeticError, ValueError):
+            return (None, [f"binary callback function failure, {sys.exc_info()[1]}"])
+        if not isinstance(return_val, g_number_type):
+            raise TypeError(f"callback does not return the correct type, expected type {g_number_type.__name__}")
+        return (return_val, [])
+
+KNOWN_CONSTS = {"pi": math.pi, "e": math.e, "deg2rad": (math.pi/180), "rad2deg": (180/math.pi)}
+'''
+NOTE: These functions take a single decimal.Decimal as input and returns a single Decimal.Decimal
+'''
+KNOWN_FUNCTIONS = {"negate": negate, "ceil": math.ceil, "floor": math.floor, "round": round, "sqrt": math.sqrt, "log10": log10, "log2": log2, "cos": math.cos, "sin": math.sin, "tan": math.tan, "cosec": cosec, "sec": sec, "cot": cot, "acos": math.acos, "asin": math.asin, "atan": math.atan}
+DECIMAL_NATIVE_FUNCTIONS = {"negate": negate, "ceil": math.ceil, "floor": math.floor, "round": round, "sqrt": decimal_sqrt, "log10": decimal_log10, "log2": decimal_log2, "cos": decimal_cos, "sin": decimal_sin, "tan": decimal_tan, "cosec": decimal_cosec, "sec": decimal_sec, "cot": decimal_cot, "acos": decimal_acos, "asin": decimal_asin, "atan": decimal_atan}
+'''
+The unary functions of the current numeric mode, only change through set_numeric_mode()
+'''
+g_unary_functions = KNOWN_FUNCTIONS
+
+DECIMAL_NATIVE_CONSTS = {"pi": lambda: decimal_pi(), "e": lambda: decimal.Decimal(1).exp(), "deg2rad": lambda: decimal_pi()/180, "rad2deg": lambda: 180/decimal_pi()}
+def get_constant_str(name: str) -> str:
+    '''
+    Returns the value of a constant, as a number literal for the current numeric mode
+    '''
+    if g_numeric_mode == NUMERIC_MODE_DECIMAL_NATIVE:
+        return str(DECIMAL_NATIVE_CONSTS[name]())
+    return str(KNOWN_CONSTS[name])
+
+
+BINARY_FUNCTIONS = {"+": BinaryFunction('+', 10, lambda a,b: a+b, None), 
+        "-": BinaryFunction('-', 10, lambda a,b: a-b, None), 
+        "*": BinaryFunction('*', 20, lambda a,b: a*b, None),
+        "/": BinaryFunction('/', 20, lambda a,b: a/b, lambda left,right: ["Division by zero"] if right==0 else []),
+        "%": BinaryFunction('%', 20, remainder, lambda left,right: ["Division by zero"] if right==0 else []),
+        "^": BinaryFunction('^', 30, lambda a,b: g_number_type(g_power_function(a,b)), None),
+        ">": BinaryFunction('>', 5, lambda a,b: g_number_type(a>b), None),
+        "<": BinaryFunction('<', 5, lambda a,b: g_number_type(a<b), None),
+        ">=": BinaryFunction('>=', 5, lambda a,b: g_number_type(a>=b), None),
+        "<=": BinaryFunction('<=', 5, lambda a,b: g_number_type(a<=b), None),
+        "==": BinaryFunction('==', 5, lambda a,b: g_number_type(a==b), None),
+        "!=": BinaryFunction('!=', 5, lambda a,b: g_number_type(a!=b), None),
+        "&&": BinaryFunction('&&', 4, lambda a,b: g_number_type(bool(a) and bool(b)), None),
+        "||": BinaryFunction('||', 3, lambda a,b: g_number_type(bool(a) or bool(b)), None), }
+
+binary_function_names = BINARY_FUNCTIONS.keys()
+binary_functions_max_name_len = max(map(lambda a: len(a), BINARY_FUNCTIONS.keys()))
+operator_trie = build_operator_trie({**{name: Token.TYPE_BINARY_FUNCTION for name in binary_function_names}, "=": Token.TYPE_ASSIGNMENT})
+
+LOWEST_PRECEDENCE_VALUE = 0
+ASSIGNMENT_PRECEDENCE_VALUE = 1
+UNARY_FUNCTION_PRECEDENCE_VALUE = 50
+
+def get_user_number_input(prompt, allow_program_exit=False) -> float:
+    interpreter = get_interpreter()
+    is_valid = False
+    number = 0
+    invalid_input_error_message = "Input Error: Expected an int"
+    while not is_valid:
+        is_valid = True
+        try:
+            number = float(interpreter.read_input(prompt))
+        except (ValueError):
+            print(invalid_input_error_message, file=interpreter.get_output_file())
+            is_valid = False
+        except (EOFError, KeyboardInterrupt):
+            # Input from a file can not be given again after it ends
+            if allow_program_exit or interpreter.input_file != None:
+                try:
+                    exit_script_command("Exited by user on input prompt")
+                except SccalcEmbeddedExit as e:
+                    raise e
+            print(invalid_input_error_message, file=interpreter.get_output_file())
+            is_valid = False
+    return number
+
+def build_command_tree_if() -> CommandProcessTree:
+    return CommandProcessTree("if", 
+        CommandProcessAddition(
+            CommandProcessRequiredGroup([
+                CommandProcessXOR([
+                    CommandProcessLiteralNumber(""),
+                    CommandProcessVariable(IOType.IOT_IN, "", True)
+                ]),
+                CommandProcessCmpOperator(""),
+                CommandProcessXOR([
+                    CommandProcessLiteralNumber(""),
+                    CommandProcessVariable(IOType.IOT_IN, "", True)
+                ])
+            ]), 
+            CommandProcessRequiredGroup([
+                CommandProcessVariable(IOType.IOT_OUT, "ifset", True),
+                CommandProcessXOR([
+                    CommandProcessLiteralNumber("ifset"),
+                    CommandProcessVariable(IOType.IOT_IN, "ifset", True)
+                ])
+            ])
+        )
+    )
+
+def build_command_tree_while() -> CommandProcessTree:
+    return CommandProcessTree("while", 
+        CommandProcessRequiredGroup([
+            CommandProcessXOR([
+                CommandProcessLiteralNumber(""),
+                CommandProcessVariable(IOType.IOT_IN, "", True)
+            ]),
+            CommandProcessCmpOperator(""),
+            CommandProcessXOR([
+                CommandProcessLiteralNumber(""),
+                CommandProcessVariable(IOType.IOT_IN, "", True)
+            ]),
+        ])
+    )
+
+def build_command_tree_exit() -> CommandProcessTree:
+    return CommandProcessTree("exit",
+        CommandProcessOptional(
+            CommandProcessXOR([
+                CommandProcessLiteralNumber("code"),
+                CommandProcessVariable(IOType.IOT_IN, "code", True)
+            ])
+        )
+    )
+
+def build_command_tree_input() -> CommandProcessTree:
+    return CommandProcessTree("input",
+        CommandProcessOptional(
+            CommandProcessRepeat(
+                CommandProcessText("prompt", None)
+            )
+        )
+    )
+
+def command_process_callback_input(values: list, tags: list[str]) -> None:
+    variables = get_interpreter().variables
+    trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"command_process_callback_input: {values=} {tags=}")
+    if "prompt" in tags:
+        prompt = " ".join(values)
+    else:
+        prompt = "INPUT >> "
+    try:
+        variables["input"] = g_number_type(get_user_number_input(prompt))
+    except SccalcEmbeddedExit as e:
+        raise e
+
+def build_command_tree_print() -> CommandProcessTree:
+    return CommandProcessTree("print",
+         CommandProcessOptional(
+            CommandProcessRepeat(
+                CommandProcessText("text", None)
+            )
+        )
+    )
+
+def command_process_callback_print(values: list, tags: list[str]) -> None:
+    output = ""
+    if "text" in tags:
+        output = " ".join(values)
+    print(output, file=get_interpreter().get_output_file())
+
+def build_command_tree_varout() -> CommandProcessTree:
+    return CommandProcessTree("varout",
+        CommandProcessOptional(
+            CommandProcessAddition(
+                CommandProcessVariable(IOType.IOT_IN, "var", False),
+                CommandProcessText("name", "-name")
+            )
+        )
+    )
+
+def command_process_callback_varout(values: list, tags: list[str]) -> None:
+    variables = get_interpreter().variables
+    output = f"{values[0]}=" if "name" in tags else ""
+    output += str(variables[values[0]]) if "var" in tags else ""
+    if "var" in tags: print(output, file=get_interpreter().get_output_file())
+
+def build_command_tree_repeat() -> CommandProcessTree:
+    return CommandProcessTree("repeat",
+         CommandProcessRequiredGroup([
+             CommandProcessXOR([
+                 CommandProcessLiteralNumber(""),
+                 CommandProcessVariable(IOType.IOT_IN, "", True)
+             ]),
+             CommandProcessExpression("")
+         ])
+     )
+
+def command_process_callback_repeat(values: list, tags: list[str]) -> list[str]:
+    interpreter = get_interpreter()
+    for _ in range(int(values[0])):
+        interpreter.check_deadline()
+        value, errors = eval_expression(values[1])
+        if len(errors) > 0:
+            return errors
+
+def build_command_tree_yield() -> CommandProcessTree:
+    return CommandProcessTree("yield",
+        CommandProcessRequiredGroup([
+            CommandProcessIterator(IOType.IOT_OUT, ""),
+            CommandProcessXOR([
+                CommandProcessLiteralNumber(""),
+                CommandProcessVariable(IOType.IOT_IN, "", True)
+            ])
+        ])
+    )
+
+def command_process_callback_yield(values: list, tags: list[str]) -> None:
+    iterator_arrays = get_interpreter().iterators
+    trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"yield callback: yield command callback called for iterator {values[0]}")
+    if iterator_arrays.get(values[0]) == None:
+        iterator_arrays[values[0]] = IteratorArray()
+    get_iterator_array(values[0]).append(values[1])
+    trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"yield callback: {iterator_arrays=}")
+
+def build_command_tree_clear() -> CommandProcessTree:
+    return CommandProcessTree("clear",
+        CommandProcessIterator(IOType.IOT_IN, "")
+    )
+
+def command_process_callback_clear(values: list, tags: list[str]) -> None:
+    iterator_arrays = get_interpreter().iterators
+    iterator_arrays[values[0]] = IteratorArray()
+
+def build_command_tree_dup() -> CommandProcessTree:
+    return CommandProcessTree("dup",
+        CommandProcessRequiredGroup([
+            CommandProcessIterator(IOType.IOT_OUT, ""),
+            CommandProcessIterator(IOType.IOT_IN, "")
+        ])
+    )
+
+def command_process_callback_dup(values: list, tags: list[str]) -> None:
+    iterator_arrays = get_interpreter().iterators
+    iterator_arrays[values[0]] = iterator_arrays[values[1]].copy()
+
+def build_command_tree_count() -> CommandProcessTree:
+    return CommandProcessTree("count",
+        CommandProcessRequiredGroup([
+            CommandProcessIterator(IOType.IOT_IN, ""),
+            CommandProcessVariable(IOType.IOT_OUT, "", False)
+        ])
+    )
+
+def command_process_callback_count(values: list, tags: list[str]) -> None:
+    interpreter = get_interpreter()
+    variables = interpreter.variables
+    iterator_arrays = interpreter.iterators
+    variables[values[1]] = len(iterator_arrays[values[0]])
+    trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"count callback: Set variable {values[1]}={variables[values[1]]} from iterator {values[0]}")
+
+def new_parallel_option_node() -> CommandProcessNode:
+    return CommandProcessAddition(
+        CommandProcessText("parallel", "-parallel"),
+        CommandProcessXOR([
+            CommandProcessLiteralNumber(""),
+            CommandProcessVariable(IOType.IOT_IN, "", True)
+        ])
+    )
+
+def build_command_tree_map() -> CommandProcessTree:
+    return CommandProcessTree("map",
+        CommandProcessAddition(
+            CommandProcessRequiredGroup([
+                CommandProcessIterator(IOType.IOT_IN_OUT, ""),
+                CommandProcessExpression("", True)
+            ]),
+            new_parallel_option_node()
+        )
+    )
+
+MAX_PARALLEL_WORKERS = 256
+PARALLEL_CHUNKS_PER_WORKER = 4 # Smaller chunks even out the work when values take longer than others
+g_parallel_threshold = 0 # Iterators with at least this many values are mapped and filtered in parallel, 0 for never
+g_parallel_executor = None
+g_parallel_executor_key: tuple or None = None
+
+def init_parallel_worker(numeric_mode: str, vectorize_iterators: bool, compile_expressions: bool, optimize_expressions: bool) -> None:
+    '''
+    Initializer of the worker processes, giving them the interpreter's settings
+    '''
+    global g_vectorize_iterators, g_compile_expressions, g_optimize_expressions
+    set_trace_level(TRACE_LEVEL_OFF)
+    if numeric_mode != g_numeric_mode:
+        set_numeric_mode(numeric_mode)
+    g_vectorize_iterators = vectorize_iterators
+    g_compile_expressions = compile_expressions
+    g_optimize_expressions = optimize_expressions
+
+def get_parallel_executor(worker_count: int):
+    '''
+    Returns a concurrent.futures.ProcessPoolExecutor of worker_count processes,
+    kept for later commands while the settings it was created with are unchanged
+    '''
+    global g_parallel_executor, g_parallel_executor_key
+    import concurrent.futures
+    settings = (g_numeric_mode, g_vectorize_iterators, g_compile_expressions, g_optimize_expressions)
+    if g_parallel_executor_key != (worker_count, settings):
+        if g_parallel_executor != None:
+            g_parallel_executor.shutdown()
+        g_parallel_executor = concurrent.futures.ProcessPoolExecutor(max_workers=worker_count, initializer=init_parallel_worker, initargs=settings)
+        g_parallel_executor_key = (worker_count, settings)
+    return g_parallel_executor
+
+def get_parallel_worker_count(values: list, tags: list[str], value_count: int) -> (int, list[str]):
+    '''
+    Returns the number of worker processes !map or !filter evaluates with,
+    given by its -parallel option (all cores when no count is given) or
+    g_parallel_threshold, 0 to evaluate in this process
+    '''
+    if "parallel" not in tags:
+        if g_parallel_threshold > 0 and value_count >= g_parallel_threshold and (os.cpu_count() or 1) > 1:
+            return (os.cpu_count(), [])
+        return (0, [])
+    option_index = values.index("-parallel", 2)
+    if option_index+1 == len(values):
+        return (os.cpu_count() or 1, [])
+    worker_count = to_whole_number(values[option_index+1], 1, MAX_PARALLEL_WORKERS)
+    if worker_count == None:
+        return (0, [f"-parallel worker count must be a whole number between 1 and {MAX_PARALLEL_WORKERS}"])
+    return (worker_count, [])
+
+def apply_stage_in_parallel(iterator: IteratorArray, stage: IteratorPipelineStage, worker_count: int) -> IteratorArray or None:
+    '''
+    Applies a !map or !filter stage to every value of iterator in worker
+    processes. The values are split into chunks, each applied by a worker
+    with its own copy of the stage's variables, and joined again in order.
+    Returns None if a stage reports errors or the workers fail, the stage must
+    then be applied in this process (to give the exact errors).
+    '''
+    chunk_size = max(-(-len(iterator) // (worker_count*PARALLEL_CHUNKS_PER_WORKER)), 1)
+    def get_chunks():
+        for chunk in iterator.iter_chunks(chunk_size):
+            if chunk.floats != None:
+                # A memoryview of a memory mapped file can not be pickled
+                chunk.get_writable_floats()
+            yield chunk
+    applied_iterator = IteratorArray((), iterator.number_type)
+    try:
+        for chunk in get_parallel_executor(worker_count).map(stage.apply, get_chunks()):
+            applied_iterator.extend(chunk)
+    except Exception:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"!{stage.command_name} in {worker_count} worker processes failed, {sys.exc_info()[1]!r}")
+        return None
+    return applied_iterator
+
+def command_process_callback_map(values: list, tags: list[str]) -> list[str]:
+    interpreter = get_interpreter()
+    variables = interpreter.variables
+    iterator_arrays = interpreter.iterators
+    if g_lazy_iterators and "parallel" not in tags and can_defer_expression(values[1]):
+        add_iterator_stage(values[0], IteratorPipelineStage("map", values[0], values[1]))
+        return []
+    iterator = get_iterator_array(values[0])
+    worker_count, errors = get_parallel_worker_count(values, tags, len(iterator))
+    if len(errors) > 0:
+        return errors
+    if "parallel" in tags and expression_assigns_variable(values[1]):
+        return ["-parallel can not be used with an expression that assigns a variable"]
+    if worker_count > 0 and len(iterator) > 0 and can_defer_expression(values[1]):
+        mapped_iterator = apply_stage_in_parallel(iterator, IteratorPipelineStage("map", values[0], values[1]), worker_count)
+        if mapped_iterator != None:
+            variables[values[0]] = iterator[len(iterator)-1]
+            iterator_arrays[values[0]] = mapped_iterator
+            return []
+    if len(iterator) > 0:
+        mapped_values = eval_iterator_kernel(values[1], values[0])
+        if mapped_values is not None:
+            # As left by the element wise loop
+            variables[values[0]] = iterator[len(iterator)-1]
+            if not isinstance(mapped_values, list):
+                mapped_values = array.array("d", mapped_values.tobytes())
+            iterator_arrays[values[0]] = IteratorArray.from_values(mapped_values, iterator.number_type)
+            return []
+    mapped_iterator = IteratorArray()
+    for value in iterator:
+        variables[values[0]] = value
+        mapped_value, errors = eval_expression(values[1])
+        if mapped_value == None:
+            # Values before the failing one stay mapped
+            mapped_iterator.extend(itertools.islice(iterator, len(mapped_iterator), None))
+            iterator_arrays[values[0]] = mapped_iterator
+            return errors
+        mapped_iterator.append(mapped_value)
+    iterator_arrays[values[0]] = mapped_iterator
+    return []
+
+def build_command_tree_filter() -> CommandProcessTree:
+    return CommandProcessTree("filter",
+        CommandProcessAddition(
+            CommandProcessRequiredGroup([
+                CommandProcessIterator(IOType.IOT_IN_OUT, ""),
+                CommandProcessXOR([
+                    CommandProcessRequiredGroup([
+                        CommandProcessXOR([
+                            CommandProcessLiteralNumber(""),
+                            CommandProcessVariable(IOType.IOT_IN, "left_var", False)
+                        ]),
+                        CommandProcessCmpOperator(""),
+                        CommandProcessXOR([
+                            CommandProcessLiteralNumber(""),
+                            CommandProcessVariable(IOType.IOT_IN, "right_var", False)
+                        ])
+                    ]),
+                    CommandProcessExpression("expression", True)
+                ])
+            ]),
+            new_parallel_option_node()
+        )
+    )
+
+def get_comparison_operands(iterator_name: str, values: list, tags: list[str]) -> list or None:
+    '''
+    Returns the two operands of the legacy '!filter ITER A CMP B' comparison,
+    None standing for each value of the iterator, or None if an operand
+    variable is undefined
+    '''
+    variables = get_interpreter().variables
+    operands = []
+    for value, tag in [(values[1], "left_var"), (values[3], "right_var")]:
+        if tag not in tags:
+            operands.append(value)
+        elif value == iterator_name:
+            operands.append(None) # Each value of the iterator
+        elif value in variables:
+            operands.append(variables[value])
+        else:
+            return None
+    return operands
+
+def get_comparison_mask(iterator: IteratorArray, operands: list, compare: typing.Callable) -> list:
+    '''
+    Returns the result of the legacy '!filter ITER A CMP B' comparison for each
+    value of the iterator, a numpy bool array for a float iterator when NumPy
+    is installed
+    @Param: operands, from get_comparison_operands()
+    '''
+    numpy = get_numpy() if g_vectorize_iterators and iterator.number_type is float and iterator.floats != None else None
+    if numpy != None:
+        elements = numpy.frombuffer(iterator.floats, dtype=numpy.float64)
+        left, right = [elements if operand is None else operand for operand in operands]
+        return numpy.broadcast_to(numpy.asarray(compare(left, right), dtype=bool), elements.shape)
+    left, right = operands
+    return [compare(value if left is None else left, value if right is None else right) for value in iterator]
+
+def command_process_callback_filter(values: list, tags: list[str]) -> list[str] or None:
+    interpreter = get_interpreter()
+    variables = interpreter.variables
+    iterator_arrays = interpreter.iterators
+    iterator_name = values[0]
+    if g_lazy_iterators and "parallel" not in tags:
+        if "expression" in tags and can_defer_expression(values[1]):
+            add_iterator_stage(iterator_name, IteratorPipelineStage("filter", iterator_name, values[1]))
+            return None
+        operands = None if "expression" in tags else get_comparison_operands(iterator_name, values, tags)
+        if operands != None:
+            add_iterator_stage(iterator_name, IteratorPipelineStage("filter", iterator_name, None, (operands, values[2])))
+            return None
+    iterator = get_iterator_array(iterator_name)
+    worker_count, errors = get_parallel_worker_count(values, tags, len(iterator))
+    if len(errors) > 0:
+        return errors
+    if "parallel" in tags and "expression" in tags and expression_assigns_variable(values[1]):
+        return ["-parallel can not be used with an expression that assigns a variable"]
+    if len(iterator) == 0:
+        return None
+    if worker_count > 0:
+        stage = None
+        if "expression" not in tags:
+            operands = get_comparison_operands(iterator_name, values, tags)
+            if operands != None:
+                stage = IteratorPipelineStage("filter", iterator_name, None, (operands, values[2]))
+        elif can_defer_expression(values[1]):
+            stage = IteratorPipelineStage("filter", iterator_name, values[1])
+        filtered_iterator = None if stage == None else apply_stage_in_parallel(iterator, stage, worker_count)
+        if filtered_iterator != None:
+            variables[iterator_name] = iterator[len(iterator)-1]
+            iterator_arrays[iterator_name] = filtered_iterator
+            return None
+    if "expression" in tags:
+        mask = eval_iterator_kernel(values[1], iterator_name)
+        if mask is not None and not isinstance(mask, list):
+            mask = mask != 0
+    elif g_vectorize_iterators:
+        operands = get_comparison_operands(iterator_name, values, tags)
+        mask = None if operands == None else get_comparison_mask(iterator, operands, values[2])
+    else:
+        mask = None
+    if mask is None:
+        mask = []
+        for val in iterator:
+            variables[iterator_name] = val
+            if "expression" in tags:
+                keep, errors = eval_expression(values[1])
+                if keep == None:
+                    return errors
+            else:
+                left = variables[values[1]] if "left_var" in tags else values[1]
+                right = variables[values[3]] if "right_var" in tags else values[3]
+                keep = values[2](left, right)
+            mask.append(keep)
+    else:
+        # As left by the element wise loop
+        variables[iterator_name] = iterator[len(iterator)-1]
+    iterator.compress(mask)
+
+def build_command_tree_next() -> CommandProcessTree:
+    return CommandProcessTree("next",
+        CommandProcessIterator(IOType.IOT_IN_OUT, "")
+    )
+
+def command_process_callback_next(values: list, tags: list[str]) -> None:
+    variables = get_interpreter().variables
+    iterator_name = values[0]
+    iterator = get_iterator_array(iterator_name)
+    if len(iterator) == 0:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"next callback: Iterator {iterator_name} is empty")
+        return None
+    variables[iterator_name] = iterator.pop()
+    trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: "next callback: Assigned new value to variable {values[0]}={variables[values[0]]}")
+
+def build_command_tree_sum() -> CommandProcessTree:
+    return CommandProcessTree("sum",
+        CommandProcessRequiredGroup([
+            CommandProcessIterator(IOType.IOT_IN, ""),
+            CommandProcessVariable(IOType.IOT_OUT, "", False)
+        ])
+    )
+
+def command_process_callback_sum(values: list, tags: list[str]) -> None:
+    interpreter = get_interpreter()
+    variables = interpreter.variables
+    iterator_arrays = interpreter.iterators
+    variables[values[1]] = sum(iterator_arrays[values[0]])
+
+def build_command_tree_product() -> CommandProcessTree:
+    return CommandProcessTree("product",
+        CommandProcessRequiredGroup([
+            CommandProcessIterator(IOType.IOT_IN, ""),
+            CommandProcessVariable(IOType.IOT_OUT, "", False)
+        ])
+    )
+
+def command_process_callback_product(values: list, tags: list[str]) -> None:
+    interpreter = get_interpreter()
+    variables = interpreter.variables
+    iterator_arrays = interpreter.iterators
+    variables[values[1]] = product(iterator_arrays[values[0]])
+
+def build_command_tree_write() -> CommandProcessTree:
+    return CommandProcessTree("write",
+        CommandProcessAddition(
+            CommandProcessRequiredGroup([
+                CommandProcessText("", None),
+                CommandProcessIterator(IOType.IOT_IN, ""),
+                CommandProcessVariable(IOType.IOT_OUT, "", False)
+            ]),
+            CommandProcessRepeat(
+                CommandProcessXOR([
+                    CommandProcessText("newline", "-newline"),
+                    CommandProcessText("append", "-append"),
+                    CommandProcessText("binary", "-binary"),
+                    CommandProcessRequiredGroup([
+                        CommandProcessText("fixed", "-fixed"),
+                        CommandProcessXOR([
+                            CommandProcessLiteralNumber(""),
+                            CommandProcessVariable(IOType.IOT_IN, "", True)
+                        ])
+                    ])
+                ])
+            )
+        )
+    )
+
+ITERATOR_FILE_MAGIC = b"SCIT"
+ITERATOR_FILE_VERSION = 1
+ITERATOR_FILE_DTYPE_FLOAT64 = 1
+ITERATOR_FILE_DTYPE_DECIMAL_TEXT = 2
+'''
+Header of a binary iterator file, written by !write -binary: magic, version,
+dtype, a padding byte and the value count, little endian. The payload
+follows, either count little endian float64 values or count comma separated
+decimal.Decimal strings in ASCII.
+'''
+ITERATOR_FILE_HEADER = struct.Struct("<4sHBxQ")
+ITERATOR_FILE_DECIMAL_REGEX = rb"[+-]?(?:(?:\d+(?:\.\d*)?|\.\d+)(?:E[+-]?\d+)?|Inf(?:inity)?|NaN\d*)"
+ITERATOR_FILE_DECIMAL_PATTERN = re.compile(ITERATOR_FILE_DECIMAL_REGEX, re.IGNORECASE)
+ITERATOR_FILE_DECIMAL_PAYLOAD_PATTERN = re.compile(rb"(?:%s(?:,%s)*)?" % (ITERATOR_FILE_DECIMAL_REGEX, ITERATOR_FILE_DECIMAL_REGEX), re.IGNORECASE)
+
+def write_iterator_file(file_path: str, iterator: IteratorArray) -> None:
+    '''
+    Writes iterator as a binary iterator file. The file is replaced rather
+    than overwritten, so iterators memory mapped from it are unaffected.
+    Raises OSError
+    '''
+    if iterator.floats != None:
+        dtype = ITERATOR_FILE_DTYPE_FLOAT64
+        payload = iterator.floats
+        if sys.byteorder == "big":
+            payload = array.array("d", payload)
+            payload.byteswap()
+    else:
+        dtype = ITERATOR_FILE_DTYPE_DECIMAL_TEXT
+        payload = iterator.decimal_text
+    # Created with the permissions open() gives, so the umask applies without changing it
+    while True:
+        temporary_path = os.path.join(os.path.dirname(file_path) or ".", f".sccalc-iterator-{os.urandom(8).hex()}")
+        try:
+            file_descriptor = os.open(temporary_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0), 0o666)
+            break
+        except FileExistsError:
+            continue
+    try:
+        with os.fdopen(file_descriptor, "wb") as file_handle:
+            file_handle.write(ITERATOR_FILE_HEADER.pack(ITERATOR_FILE_MAGIC, ITERATOR_FILE_VERSION, dtype, len(iterator)))
+            file_handle.write(payload)
+        os.replace(temporary_path, file_path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+def load_iterator_file(file_path: str) -> (IteratorArray or None, int):
+    '''
+    Loads a binary iterator file written by write_iterator_file(). A float64
+    payload is memory mapped rather than read, so the values are only read
+    from the file when used.
+    Returns (iterator, -1), or (None, byte offset of the invalid data)
+    Raises OSError
+    '''
+    with open(file_path, "rb") as file_handle:
+        header = file_handle.read(ITERATOR_FILE_HEADER.size)
+        if len(header) < ITERATOR_FILE_HEADER.size:
+            return (None, len(header))
+        magic, version, dtype, count = ITERATOR_FILE_HEADER.unpack(header)
+        if magic != ITERATOR_FILE_MAGIC:
+            return (None, 0)
+        if version != ITERATOR_FILE_VERSION:
+            return (None, 4)
+        if dtype == ITERATOR_FILE_DTYPE_FLOAT64:
+            file_size = os.fstat(file_handle.fileno()).st_size
+            expected_file_size = ITERATOR_FILE_HEADER.size + count*8
+            if file_size != expected_file_size:
+                return (None, min(file_size, expected_file_size))
+            iterator = IteratorArray()
+            if count > 0:
+                import mmap
+                mapped_file = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+                iterator.floats = memoryview(mapped_file)[ITERATOR_FILE_HEADER.size:].cast("d")
+                if sys.byteorder == "big":
+                    iterator.get_writable_floats().byteswap()
+            iterator.length = count
+            return (iterator, -1)
+        if dtype != ITERATOR_FILE_DTYPE_DECIMAL_TEXT:
+            return (None, 6)
+        payload = file_handle.read()
+    fields = payload.split(b",") if len(payload) > 0 else []
+    if ITERATOR_FILE_DECIMAL_PAYLOAD_PATTERN.fullmatch(payload) == None or len(fields) != count:
+        # Find the offset of the first value that is invalid, or missing
+        offset = ITERATOR_FILE_HEADER.size
+        for field in fields[:count]:
+            if ITERATOR_FILE_DECIMAL_PATTERN.fullmatch(field) == None:
+                break
+            offset += len(field) + 1
+        return (None, min(offset, ITERATOR_FILE_HEADER.size + len(payload)))
+    if g_number_type is float:
+        return (IteratorArray.from_values(array.array("d", map(float, fields)), float), -1)
+    iterator = IteratorArray()
+    iterator.floats = None
+    iterator.decimal_text = bytearray(payload)
+    iterator.length = count
+    return (iterator, -1)
+
+WRITE_CHUNK_SIZE = 1 << 14 # Values serialized at a time by !write
+WRITE_BUFFER_SIZE = 1 << 20
+MAX_WRITE_FIXED_DIGITS = 1000
+
+def command_process_callback_write(values: list, tags: list[str]) -> list[str] or None:
+    interpreter = get_interpreter()
+    variables = interpreter.variables
+    iterator_arrays = interpreter.iterators
+    file_path = values[0]
+    input_iterator = iterator_arrays[values[1]]
+    output_status_variable_name = values[2]
+    separator = "\n" if "newline" in tags else ","
+    file_mode = "a" if "append" in tags else "w"
+    value_format = ""
+    if "binary" in tags and ("newline" in tags or "append" in tags or "fixed" in tags):
+        return ["-binary can not be combined with -newline, -append or -fixed"]
+    if "fixed" in tags:
+        fixed_digits = to_whole_number(values[values.index("-fixed", 3)+1], 0, MAX_WRITE_FIXED_DIGITS)
+        if fixed_digits == None:
+            return [f"-fixed digits must be a whole number between 0 and {MAX_WRITE_FIXED_DIGITS}"]
+        value_format = f".{fixed_digits}f"
+
+    STATUS_SUCCESS = 0
+    STATUS_PERMISSION_ERROR = 1
+    STATUS_ENCODE_ERROR = 2
+    STATUS_FILE_NOT_FOUND = 4
+    STATUS_IS_A_DIRECTORY = 5
+    STATUS_OTHER_ERROR = 6
+
+    variables[output_status_variable_name] = g_number_type(STATUS_SUCCESS)
+    try:
+        if "binary" in tags:
+            if isinstance(input_iterator, IteratorPipeline):
+                # The header holds the count and type of the values, so they are needed first
+                input_iterator = input_iterator.materialize()
+            write_iterator_file(file_path, input_iterator)
+            return None
+        file_handle = open(file_path, file_mode, buffering=WRITE_BUFFER_SIZE)
+    except FileNotFoundError:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"!write: Directory of file {file_path} not found")
+        variables[output_status_variable_name] = g_number_type(STATUS_FILE_NOT_FOUND)
+        return None
+    except PermissionError:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"!write: Denied permission to write to file {file_path}")
+        variables[output_status_variable_name] = g_number_type(STATUS_PERMISSION_ERROR)
+        return None
+    except IsADirectoryError:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"!write: File path {file_path} is a directory")
+        variables[output_status_variable_name] = g_number_type(STATUS_IS_A_DIRECTORY)
+        return None
+    except OSError as e:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"!write: Could not write to file {file_path}, {e}")
+        variables[output_status_variable_name] = g_number_type(STATUS_OTHER_ERROR)
+        return None
+    # Serialized a chunk at a time, so memory use does not grow with the iterator.
+    # Comma separated values are joined to those already in an appended file,
+    # newline separated values each end with a newline.
+    chunk_prefix = "," if separator == "," and file_mode == "a" and file_handle.tell() > 0 else ""
+    chunk_suffix = separator if separator == "\n" else ""
+    values_iterator = iter(input_iterator)
+    try:
+        with file_handle:
+            while True:
+                chunk_values = list(itertools.islice(values_iterator, WRITE_CHUNK_SIZE))
+                if len(chunk_values) == 0:
+                    break
+                file_handle.write(chunk_prefix + separator.join([format(value, value_format) for value in chunk_values]) + chunk_suffix)
+                chunk_prefix = "," if separator == "," else ""
+    except UnicodeEncodeError:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"!write: Serialized iterator failed encoding when write to file {file_path}")
+        variables[output_status_variable_name] = g_number_type(STATUS_ENCODE_ERROR)
+        return None
+    except PermissionError:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"!write: Denied permission to write to file {file_path}")
+        variables[output_status_variable_name] = g_number_type(STATUS_PERMISSION_ERROR)
+        return None
+    except OSError as e:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"!write: Could not write to file {file_path}, {e}")
+        variables[output_status_variable_name] = g_number_type(STATUS_OTHER_ERROR)
+        return None
+
+def build_command_tree_read() -> CommandProcessTree:
+    return CommandProcessTree("read",
+        CommandProcessAddition(
+            CommandProcessRequiredGroup([
+                CommandProcessText("", None),
+                CommandProcessIterator(IOType.IOT_OUT, ""),
+                CommandProcessVariable(IOType.IOT_OUT, "", False)
+            ]),
+            CommandProcessRepeat(
+                CommandProcessXOR([
+                    CommandProcessText("binary", "-binary"),
+                    CommandProcessVariable(IOType.IOT_OUT, "offset_var", False)
+                ])
+            )
+        )
+    )
+
+READ_CHUNK_SIZE = 1 << 16 # Characters read from the file at a time by !read
+
+def get_encoded_len(text: str, encoding: str) -> int:
+    return len(text) if text.isascii() else len(text.encode(encoding))
+
+def command_process_callback_read(values: list, tags: list[str]) -> None:
+    interpreter = get_interpreter()
+    variables = interpreter.variables
+    iterator_arrays = interpreter.iterators
+    file_path = values[0]
+    output_iterator_name = values[1]
+    output_status_variable_name = values[2]
+    output_offset_variable_name = None
+    if "offset_var" in tags:
+        output_offset_variable_name = [value for value in values[3:] if value != "-binary"][0]
+
+    STATUS_SUCCESS = 0
+    STATUS_PERMISSION_ERROR = 1
+    STATUS_DECODE_ERROR = 2
+    STATUS_DESERIALIZATION_ERROR = 3
+    STATUS_FILE_NOT_FOUND = 4
+    STATUS_IS_A_DIRECTORY = 5
+
+    variables[output_status_variable_name] = g_number_type(STATUS_SUCCESS)
+    if output_offset_variable_name != None:
+        variables[output_offset_variable_name] = g_number_type(-1)
+    try:
+        if "binary" in tags:
+            loaded_iterator, error_offset = load_iterator_file(file_path)
+        else:
+            # Without newline translation, so offsets into the text are offsets into the file
+            file_handle = open(file_path, newline="")
+    except FileNotFoundError:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"!read: File {file_path} not found")
+        variables[output_status_variable_name] = g_number_type(STATUS_FILE_NOT_FOUND)
+        return None
+    except PermissionError:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"!read: Denied permission to read file {file_path}")
+        variables[output_status_variable_name] = g_number_type(STATUS_PERMISSION_ERROR)
+        return None
+    except IsADirectoryError:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"!read: File path {file_path} is a directory")
+        variables[output_status_variable_name] = g_number_type(STATUS_IS_A_DIRECTORY)
+        return None
+    if "binary" in tags:
+        if loaded_iterator == None:
+            trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"!read: Binary iterator file is invalid at byte offset {error_offset}")
+            variables[output_status_variable_name] = g_number_type(STATUS_DESERIALIZATION_ERROR)
+            if output_offset_variable_name != None:
+                variables[output_offset_variable_name] = g_number_type(error_offset)
+            return None
+        iterator_arrays[output_iterator_name] = loaded_iterator
+        return None
+
+    # Comma or newline separated values are parsed a chunk at a time, a value
+    # split across chunks is carried over in pending_text. A newline is one
+    # character as a comma is, so the byte offsets are unchanged by treating
+    # it as one, and a carriage return before it is left to float() and
+    # decimal.Decimal(), which both ignore surrounding whitespace
+    deserialized_numbers = IteratorArray()
+    pending_text = ""
+    pending_text_offset = 0 # Byte offset of pending_text in the file
+    error_offset = None
+    def deserialize(fields: list[str]) -> int or None:
+        '''
+        Appends the numbers of fields to deserialized_numbers, returning the
+        index of the first field that is not a number, or None
+        '''
+        if g_numeric_mode != NUMERIC_MODE_DECIMAL_NATIVE:
+            # Values parsed through a float are always exactly a double
+            try:
+                deserialized_numbers.extend_floats(array.array("d", map(float, fields)))
+                return None
+            except ValueError:
+                pass
+        for field_index, field in enumerate(fields):
+            value = parse_number_literal(field)
+            if value == None:
+                return field_index
+            deserialized_numbers.append(value)
+        return None
+    try:
+        with file_handle:
+            at_end_of_file = False
+            ends_with_newline = False
+            while not at_end_of_file and error_offset == None:
+                chunk = file_handle.read(READ_CHUNK_SIZE)
+                at_end_of_file = chunk == ""
+                if at_end_of_file and pending_text == "" and ends_with_newline:
+                    fields = [] # The newline after the last value, as written by !write -newline
+                else:
+                    fields = (pending_text + chunk.replace("\n", ",")).split(",")
+                ends_with_newline = chunk.endswith("\n")
+                pending_text = "" if at_end_of_file else fields.pop()
+                bad_field_index = deserialize(fields)
+                if bad_field_index != None:
+                    error_offset = pending_text_offset + get_encoded_len(",".join(fields[:bad_field_index] + [""]), file_handle.encoding)
+                elif len(fields) > 0:
+                    pending_text_offset += get_encoded_len(",".join(fields + [""]), file_handle.encoding)
+            # A decode error anywhere in the file takes precedence, as when the file was read whole
+            while chunk != "":
+                chunk = file_handle.read(READ_CHUNK_SIZE)
+    except UnicodeDecodeError:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"!read: File {file_path} is not a valid text file")
+        variables[output_status_variable_name] = g_number_type(STATUS_DECODE_ERROR)
+        return None
+    except PermissionError:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"!read: Denied permission to read file {file_path}")
+        variables[output_status_variable_name] = g_number_type(STATUS_PERMISSION_ERROR)
+        return None
+    if error_offset != None:
+        trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"!read: De-serialized iterator data is invalid at byte offset {error_offset}")
+        variables[output_status_variable_name] = g_number_type(STATUS_DESERIALIZATION_ERROR)
+        if output_offset_variable_name != None:
+            variables[output_offset_variable_name] = g_number_type(error_offset)
+        return None
+    iterator_arrays[output_iterator_name] = deserialized_numbers
+
+def build_command_tree_printf() -> CommandProcessTree:
+    return CommandProcessTree("printf", 
+        CommandProcessAddition(
+            CommandProcessFormatString(""),
+            CommandProcessText("no-new-line", "-no-new-line")
+        )
+    )
+
+def command_process_callback_printf(values: list, tags: list[str]) -> None:
+    end = "\n"
+    if "no-new-line" in tags:
+        end = ""
+    print(values[0], end=end, file=get_interpreter().get_output_file())
+
+def build_command_tree_inputf() -> CommandProcessTree:
+    return CommandProcessTree("inputf",
+        CommandProcessRequiredGroup([
+            CommandProcessVariable(IOType.IOT_OUT, "", False),
+            CommandProcessAddition(
+                CommandProcessFormatString(""),
+                CommandProcessXOR([
+                    CommandProcessText("only-positive", "-only-positive"),
+                    CommandProcessText("only-negative", "-only-negative"),
+                    CommandProcessText("non-negative", "-non-negative"),
+                    CommandProcessText("non-positive", "-non-positive"),
+                ])
+            )
+        ])
+    )
+
+def command_process_callback_inputf(values: list, tags: list[str]) -> None:
+    variables = get_interpreter().variables
+    user_input_invalid = True
+    while user_input_invalid:
+        try:
+            user_input = get_user_number_input(values[1])
+        except SccalcEmbeddedExit as e:
+            raise e
+        user_input_invalid = False
+        if "only-positive" in tags and user_input <= decimal.Decimal(0):
+            user_input_invalid = True
+            print("Input must be positive only (> 0)", file=get_interpreter().get_output_file())
+        elif "only-negative" in tags and user_input >= decimal.Decimal(0):
+            user_input_invalid = True
+            print("Input must be negative only (< 0)", file=get_interpreter().get_output_file())
+        elif "non-negative" in tags and user_input < decimal.Decimal(0):
+            user_input_invalid = True
+            print("Input must be zero or positive", file=get_interpreter().get_output_file())
+        elif "non-positive" in tags and user_input > decimal.Decimal(0):
+            user_input_invalid = True
+            print("Input must be zero or negative", file=get_interpreter().get_output_file())
+
+    variables[values[0]] = user_input
+
+def build_command_tree_precision() -> CommandProcessTree:
+    return CommandProcessTree("precision",
+        CommandProcessXOR([
+            CommandProcessLiteralNumber(""),
+            CommandProcessVariable(IOType.IOT_IN, "", True)
+        ])
+    )
+
+def command_process_callback_precision(values: list, tags: list[str]) -> list[str]:
+    precision = to_whole_number(values[0], 1, decimal.MAX_PREC)
+    if precision == None:
+        return [f"Precision must be a whole number between 1 and {decimal.MAX_PREC}"]
+    set_decimal_context(precision, decimal.getcontext().rounding)
+    trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"precision callback: Set decimal precision to {decimal.getcontext().prec}")
+
+def build_command_tree_rounding() -> CommandProcessTree:
+    return CommandProcessTree("rounding",
+        CommandProcessXOR([CommandProcessText(name, name) for name in DECIMAL_ROUNDING_MODES.keys()])
+    )
+
+def command_process_callback_rounding(values: list, tags: list[str]) -> None:
+    set_decimal_context(decimal.getcontext().prec, DECIMAL_ROUNDING_MODES[values[0]])
+    trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"rounding callback: Set decimal rounding to {decimal.getcontext().rounding}")
+
+'''
+Maps each command name to the function building its grammar tree and to its
+callback. The trees are only built by get_command_trees(), once a script uses
+a command, so evaluating an expression does not build any of them.
+'''
+command_tree_builders = {
+        "if": (build_command_tree_if, None),
+        "while": (build_command_tree_while, None),
+        "exit": (build_command_tree_exit, lambda values, tags: exit_script_command(int(values[0]) if "code" in tags else 0)),
+        "input": (build_command_tree_input, command_process_callback_input),
+        "print": (build_command_tree_print, command_process_callback_print),
+        "varout": (build_command_tree_varout, command_process_callback_varout),
+        "repeat": (build_command_tree_repeat, command_process_callback_repeat),
+        "yield": (build_command_tree_yield, command_process_callback_yield),
+        "clear": (build_command_tree_clear, command_process_callback_clear),
+        "dup": (build_command_tree_dup, command_process_callback_dup),
+        "count": (build_command_tree_count, command_process_callback_count),
+        "map": (build_command_tree_map, command_process_callback_map),
+        "filter": (build_command_tree_filter, command_process_callback_filter),
+        "next": (build_command_tree_next, command_process_callback_next),
+        "sum": (build_command_tree_sum, command_process_callback_sum),
+        "product": (build_command_tree_product, command_process_callback_product),
+        "write": (build_command_tree_write, command_process_callback_write),
+        "read": (build_command_tree_read, command_process_callback_read),
+        "printf": (build_command_tree_printf, command_process_callback_printf),
+        "inputf": (build_command_tree_inputf, command_process_callback_inputf),
+        "precision": (build_command_tree_precision, command_process_callback_precision),
+        "rounding": (build_command_tree_rounding, command_process_callback_rounding),
+        }
+
+g_command_trees = None
+g_command_dispatch_table = None
+
+def check_command_tables() -> None:
+    '''
+    Raises ValueError if the function and command tables do not agree with
+    each other. Run on the first use of the command grammar, rather than on
+    import
+    '''
+    if DECIMAL_NATIVE_FUNCTIONS.keys() != KNOWN_FUNCTIONS.keys():
+        raise ValueError("DECIMAL_NATIVE_FUNCTIONS and KNOWN_FUNCTIONS do not have the same functions")
+    if not all(map(lambda a: a[0] == a[1].lexeame, zip(BINARY_FUNCTIONS.keys(), BINARY_FUNCTIONS.values()))):
+        raise ValueError("Binary function lexeame and BINARY_FUNCTIONS key do not match")
+    if command_tree_builders.keys() != get_help_descriptions()["commands"].keys():
+        raise ValueError("Some command descriptions are missing")
+
+def get_command_trees() -> dict[str, tuple[CommandProcessTree, typing.Callable or None]]:
+    '''
+    Returns the command name to (tree, callback) table, building every command
+    tree on the first call
+    '''
+    global g_command_trees
+    if g_command_trees == None:
+        check_command_tables()
+        g_command_trees = {name: (build_tree(), callback) for name, (build_tree, callback) in command_tree_builders.items()}
+    return g_command_trees
+
+def get_command_dispatch_table() -> dict[str, tuple[CommandProcessTree, typing.Callable or None]]:
+    '''
+    Maps the command token (e.g. "!map") directly to its (tree, callback) from
+    get_command_trees(), so a command line is matched against its own tree only.
+    '''
+    global g_command_dispatch_table
+    if g_command_dispatch_table == None:
+        g_command_dispatch_table = {f"!{command_tree.name}": (command_tree, callback) for command_tree, callback in get_command_trees().values()}
+    return g_command_dispatch_table
+
+g_help_descriptions = None
+
+def get_help_descriptions() -> dict[str, dict[str, str]]:
+    '''
+    Returns the descriptions of the commands, format specifiers, binary
+    functions and unary functions, only used by !help and --gen-script-std-file
+    '''
+    global g_help_descriptions
+    if g_help_descriptions != None:
+        return g_help_descriptions
+    command_process_descriptions = {
+            "if": "Compare the two variables or literal numbers and either assign to a variable (if provided) or start a if statement block, end block with !endif command",
+            "while": "Compare two variables or literal numbers and run the while block while the condition is true, end block with !endwhile command",
+            "exit": "Stop the program with an optional exit code",
+            "input": "Hold execution of the program and request user input as a number. The variable 'input' is assigned the users input",
+            "print": "Output literal text to the user",
+            "varout": "Output the value in a variable",
+            "repeat": "Repeats an expression for a given count (can be a literal number or a variable). Count cannot be accessed or modified",
+            "yield": "Appends a literal number or value in a variable to an iterator",
+            "clear": "Removes all values within an iterator",
+            "dup": "Makes a exact hard copy of an iterator",
+            "count": "Returns the number of remaining values within an iterator, into a chosen variable",
+            "map": "Higher order function that changes each value given an expression. The current iterated value is the variable with the same name as the iterator, Iterator is modifed in place. With --lazy-iterators, it is only applied once the iterator's values are used. -parallel [N] evaluates it in N worker processes (default one per core), the expression can not assign a variable",
+            "filter": "Higher order function, removes values from an iterator, given a condition, either A CMP B or an expression that may use && and ||, keeping values where it is non zero. The current iterated value is the variable with the same name as the iterator. Iterator is modified in place. With --lazy-iterators, it is only applied once the iterator's values are used. -parallel [N] evaluates it in N worker processes (default one per core), the expression can not assign a variable",
+            "next": "Assumes iterator is not empty. Pops the next value from the iterator and assigns it to a variable with the same name as the iterator",
+            "sum": "Higher order function that returns the sum into a chosen output variable, from a given iterator",
+            "product": "Higher order function that returns the product into a chosen output variable, from a given iterator",
+            "write": "Attempts to write the given iterator to a given file path, as comma separated numbers, or one number per line with -newline. -fixed DIGITS writes each number with DIGITS decimal places, -append adds to the end of the file. -binary writes a binary iterator file, which !read -binary loads without parsing. The success of the operation is returned into a chosen variable. 0 is success, any other value is a failure. 1 - permission error. 2 - encode error. 4 - directory not found. 5 - is a directory. 6 - any other error writing the file",
+            "read": "Attempts to read an iterator from a given file path, of comma or newline separated numbers, such as written by !write and !write -newline. The success of the operation is returned into a chosen variable. 0 is success, any other value is a failure. 1 - permission error. 2 - decode error. 3 - de-serialization error. 4 - file not found. 5 - is a directory. The byte offset of a de-serialization error is returned into the optional last variable, -1 if there is none. -binary reads a file written by !write -binary, without parsing the values",
+            "printf": "Formatted version of the !print command",
+            "inputf": "Formatted version of the !input command, allows takes output variable as a parameter",
+            "precision": "Sets the number of significant digits kept by decimal numbers, for the rest of the script",
+            "rounding": "Sets how decimal numbers are rounded to the precision, for the rest of the script",
+    }
+
+    format_specifier_descriptions = {
+        "v": "Variable",
+        "e": "Expression",
+        "i": "Iterator",
+        "n": "Literal number",
+    }
+
+    binary_function_descriptions = {
+        "+":  "Binary addition",
+        "-":  "Binary subtraction",
+        "*":  "Binary multiplication",
+        "/":  "Binary division",
+        "%":  "Modulus operator",
+        "^":  "Exponentiation",
+        ">":  "Greater than",
+        "<":  "Less than",
+        ">=": "Greater than or equal too",
+        "<=": "Less than or equal too",
+        "==": "Exactly equal too, equivalent",
+        "!=": "Not equal too, inequivalent",
+        "&&": "Boolean AND",
+        "||": "Boolean OR"
+    }
+
+    unary_function_descriptions = {
+        "negate": "Negation. Flip the sign of the number",
+        "ceil": "Mathematical ceiling of a number. Rounds number up to nearest whole number",
+        "floor": "Mathematical floor of a number. Rounds number down to the nearest whole number",
+        "round": "Mathematical round to whole number",
+        "sqrt": "Mathematical square root",
+        "log10": "Logarithmic function with base 10",
+        "log2": "Logarithmic function with base 2",
+        "cos": "Trigonometric cosine function, angle in radians",
+        "sin": "Trigonometric sine function, angle in radians",
+        "tan": "Trigonometric tangent function, angle in radians",
+        "cosec": "Trigonometric co-secant function, angle in radians",
+        "sec": "Trigonometric secant function, angle in radians",
+        "cot": "Trigonometric co-tangent function, angle in radians",
+        "acos": "Trigonometric arc-cosine function, angle in radians",
+        "asin": "Trigonometric arc-sine function, angle in radians",
+        "atan": "Trigonometric arc-tangent function, angle in radians"
+    }
+
+    g_help_descriptions = {"commands": command_process_descriptions, "format_specifiers": format_specifier_descriptions,
+            "binary_functions": binary_function_descriptions, "unary_functions": unary_function_descriptions}
+    return g_help_descriptions
+
+def print_constants() -> None:
+    print("Constants:")
+    for constant in KNOWN_CONSTS.keys():
+        print(f" {constant} - {KNOWN_CONSTS[constant]}")
+def print_functions() -> None:
+    print("Unary Functions")
+    for function in KNOWN_FUNCTIONS.keys():
+        print(f" {function}")
+
+def parse_input_for_args(uinput: str) -> list[str]:
+    out_args = []
+    in_quote = False
+    cur_phrase = ""
+    skip_char_count = 0
+    for chari, char in enumerate(uinput):
+        if skip_char_count > 0:
+            skip_char_count -= 1
+            continue
+        if char == "\\":
+            if chari+1 < len(uinput):
+                next_char = uinput[chari+1]
+                skip_char_count += 1
+                if next_char == '"':
+                    cur_phrase += '"'
+                elif next_char == '\\':
+                    cur_phrase += '\\'
+                else:
+                    skip_char_count -= 1
+            continue
+        if char == '"':
+            in_quote = not in_quote
+            continue
+        if in_quote:
+            cur_phrase += char
+            continue
+        if char.isspace():
+            if len(cur_phrase) > 0:
+                out_args.append(cur_phrase)
+            cur_phrase = ""
+            continue
+        cur_phrase += char
+    if len(cur_phrase) > 0:
+        out_args.append(cur_phrase)
+    return out_args
+
+def output_script_standard_file(standards_output_path):
+    help_descriptions = get_help_descriptions()
+    command_trees = get_command_trees()
+    file_handle = open(standards_output_path, "w")
+    file_handle.write("Comments:\n   Commented lines start with a  #  character.\n")
+    file_handle.write("\nCommands description:\n   Command lines start with a  !  character.\n")
+    file_handle.write("   Each command has a unique interface (set of parameters) and have unique functionality.\n")
+    file_handle.write("   Commands allows for text to be surrounded in double quotes (\") to be passed into a single parameter literally (\\ still behaves the same in or out of comments).\n")
+    file_handle.write("   Some characters can be escaped by placing a \\ directly in front of them.\n")
+    file_handle.write("     Escapable characters are  \"  \\")
+    file_handle.write("\nIdentifiers:\n")
+    file_handle.write("   Used for variable names and iterator names.\n")
+    file_handle.write("   Valid characters: Alphabetic or  _  followed by any number of alphanumeric or  _  .\n")
+    file_handle.write("\nExpression:\n")
+    file_handle.write("   Consists of Identifiers, constants, Unary-operators, Binary-Operators and variable assignments.\n")
+    file_handle.write("   If a line does not begin with a  !  or  #  it is assumed to be a expression.\n")
+    file_handle.write("\nVariables description:\n")
+    file_handle.write("   All assigned variables are global variables, there are no local variables.\n")
+    file_handle.write("   Variables can only store decimal (or floating point) numbers.\n")
+    file_handle.write("   Variables can not be deleted or undefined, once they have been assigned to.\n")
+    file_handle.write("\nVariable assignment:\n")
+    file_handle.write("   <Identifier> = <Expression>\n")
+    serialized_predefined_variables = " ".join(get_interpreter().variables.keys())
+    file_handle.write("\nPre-defined variables:\n")
+    file_handle.write(f"   {serialized_predefined_variables}\n")
+    serialized_consts = " ".join(KNOWN_CONSTS.keys())
+    file_handle.write("\nConstants:\n")
+    file_handle.write(f"   {serialized_consts}\n")
+    serialized_comparison_operators = " ".join(comparison_operators.keys())
+    file_handle.write("\nComparison operators (CMP-OP):\n")
+    file_handle.write(f"   {serialized_comparison_operators}\n")
+    longest_unary_fn_name = max([len(fn) for fn in KNOWN_FUNCTIONS.keys()])
+    serialized_unary_functions = "\n".join([f"   {fn:<{longest_unary_fn_name}}  - {help_descriptions['unary_functions'].get(fn)}" for fn in KNOWN_FUNCTIONS.keys()])
+    file_handle.write("\nUnary functions:\n")
+    file_handle.write(f"{serialized_unary_functions}\n")
+    longest_binary_fn_name = max([len(fn) for fn in BINARY_FUNCTIONS.keys()])
+    serialized_binary_functions = "\n".join([f"   {fn:<{longest_binary_fn_name}}  - {help_descriptions['binary_functions'].get(fn)}" for fn in BINARY_FUNCTIONS.keys()])
+    file_handle.write("\nBinary functions:\n")
+    file_handle.write(f"{serialized_binary_functions}\n")
+    function_precedences = list(map(lambda a: (a.precedence, a.lexeame), BINARY_FUNCTIONS.values()))
+    function_precedences.append((UNARY_FUNCTION_PRECEDENCE_VALUE, "<UNARY-FUNCTIONS>"))
+    function_precedences = sorted(function_precedences, key=lambda a: a[0])
+    trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"{function_precedences=}")
+    grouped_function_precedences = [list(group) for key, group in itertools.groupby(function_precedences, lambda a: a[0])]
+    trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"{grouped_function_precedences=}")
+    grouped_function_precedences = [tuple([item[1] for item in group]) for group in grouped_function_precedences]
+    trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"{grouped_function_precedences=}")
+    file_handle.write("\nFunction precedences (from least to most):\n")
+    for precedence_group in grouped_function_precedences:
+        serialized_function_group = " ".join(precedence_group)
+        file_handle.write(f"   {serialized_function_group}\n")
+
+    serialized_format_specifers = [f"{specifier}  - {help_descriptions['format_specifiers'].get(specifier)}" for specifier in FORMAT_SPECIFIER_FUNCTIONALITY_MAPPINGS.keys()]
+    file_handle.write("\nAvailable command format specifiers, in FORMAT_STRING:\n")
+    for format_specifier in serialized_format_specifers:
+        file_handle.write(f"   {format_specifier}\n")
+
+    longest_command_word_len = max([len(cmd[0].get_str()) for cmd in command_trees.values()])
+    file_handle.write("\nAvailable commands:\n")
+    file_handle.write(f"   !strict\n      Tells the interpreter to exit for any error that occurs\n")
+    file_handle.write(f"   !debug [on|off|toggle]\n      Enable or disable debug output\n")
+    file_handle.write(f"   !echo [on|off|toggle]\n      Enable or disable per line expression evaluation output\n")
+    file_handle.write(f"   !endif\n      Marks end of a if block\n")
+    file_handle.write(f"   !endwhile\n      Marks end of a while block\n")
+    for command_tree, command_callback in command_trees.values():
+        file_handle.write(f"   {command_tree.get_str()}\n      {help_descriptions['commands'].get(command_tree.name)}\n")
+    file_handle.close()
+
+class ScriptInstruction:
+    OP_EXPRESSION = 0
+    OP_COMMAND = 1
+    OP_IF = 2
+    OP_WHILE = 3
+    OP_ENDIF = 4
+    OP_ENDWHILE = 5
+    OP_STRICT = 6
+    OP_DEBUG = 7
+    OP_ECHO = 8
+    OP_HELP = 9
+    OP_NAMES = {OP_EXPRESSION: "expression", OP_COMMAND: "command", OP_IF: "if", OP_WHILE: "while", OP_ENDIF: "endif", OP_ENDWHILE: "endwhile", OP_STRICT: "strict", OP_DEBUG: "debug", OP_ECHO: "echo", OP_HELP: "help"}
+    __slots__ = ("opcode", "line_index", "text", "args", "compiled_expression", "command", "match_plan")
+    def __init__(self, opcode: int, line_index: int, text: str, args: list[str]):
+        self.opcode = opcode
+        self.line_index = line_index
+        self.text = text
+        self.args = args
+        # Only for OP_EXPRESSION, None when it must be compiled when run
+        self.compiled_expression: CompiledExpression or None = None
+        # Only for OP_COMMAND, OP_IF and OP_WHILE, the (tree, callback) from get_command_dispatch_table(). None for an unrecognised command
+        self.command: tuple[CommandProcessTree, typing.Callable or None] or None = None
+        # Only for a bound command, from CommandProcessTree.bind_match_plan() when the line first runs
+        self.match_plan: CommandProcessMatchPlan or None = None
+    def __getstate__(self) -> tuple:
+        # Commands are bound again by CompiledScript.bind_commands(), callbacks can not be pickled
+        return (self.opcode, self.line_index, self.text, self.args, self.compiled_expression)
+    def __setstate__(self, state: tuple) -> None:
+        self.opcode, self.line_index, self.text, self.args, self.compiled_expression = state
+        self.command = None
+        self.match_plan = None
+    def get_match_plan(self) -> CommandProcessMatchPlan or None:
+        if self.match_plan == None:
+            self.match_plan = self.command[0].bind_match_plan(self.args)
+        return self.match_plan
+    def get_str(self) -> str:
+        if self.opcode == ScriptInstruction.OP_EXPRESSION:
+            operands = " ".join([str(token.lexeame) for token in self.compiled_expression.post_fix_tokens]) if self.compiled_expression != None else "(not compiled)"
+            return f"{f'[{self.line_index+1}]':<6} {ScriptInstruction.OP_NAMES[self.opcode]:<10} {self.text}  =>  {operands}"
+        return f"{f'[{self.line_index+1}]':<6} {ScriptInstruction.OP_NAMES[self.opcode]:<10} {' '.join([repr(arg) for arg in self.args])}"
+
+def get_script_opcode(args: list[str]) -> int:
+    if args[0] == "!help":
+        return ScriptInstruction.OP_HELP
+    if args[0] == "!endwhile":
+        return ScriptInstruction.OP_ENDWHILE
+    if args[0][0] != "!":
+        return ScriptInstruction.OP_EXPRESSION
+    if args[0] == "!endif":
+        return ScriptInstruction.OP_ENDIF
+    if args[0] == "!strict":
+        return ScriptInstruction.OP_STRICT
+    if args[0] == "!debug":
+        return ScriptInstruction.OP_DEBUG
+    if args[0] == "!echo":
+        return ScriptInstruction.OP_ECHO
+    if args[0] == "!if":
+        return ScriptInstruction.OP_IF
+    if args[0] == "!while":
+        return ScriptInstruction.OP_WHILE
+    return ScriptInstruction.OP_COMMAND
+
+def build_block_closer_indices(instructions: list[ScriptInstruction]) -> list[int or None]:
+    '''
+    Matches every !if with its !endif and every !while with its !endwhile.
+    Returns a list with the index of the matching closer for each opener, and
+    None for every other instruction or an opener that is never closed.
+    @Note: !if and !while blocks are matched independently of each other, and
+    every !if counts as an opener, as when skipping over lines one at a time.
+    '''
+    closer_indices: list[int or None] = [None]*len(instructions)
+    if_opener_indices = []
+    while_opener_indices = []
+    for instruction_index, instruction in enumerate(instructions):
+        if instruction.opcode == ScriptInstruction.OP_IF:
+            if_opener_indices.append(instruction_index)
+        elif instruction.opcode == ScriptInstruction.OP_WHILE:
+            while_opener_indices.append(instruction_index)
+        elif instruction.opcode == ScriptInstruction.OP_ENDIF and len(if_opener_indices) > 0:
+            closer_indices[if_opener_indices.pop()] = instruction_index
+        elif instruction.opcode == ScriptInstruction.OP_ENDWHILE and len(while_opener_indices) > 0:
+            closer_indices[while_opener_indices.pop()] = instruction_index
+    return closer_indices
+
+class CompiledScript:
+    def __init__(self, instructions: list[ScriptInstruction]):
+        self.instructions = instructions
+        self.block_closer_indices = build_block_closer_indices(instructions)
+        self.bind_commands()
+    def bind_commands(self) -> None:
+        for instruction in self.instructions:
+            if instruction.opcode == ScriptInstruction.OP_COMMAND or instruction.opcode == ScriptInstruction.OP_IF or instruction.opcode == ScriptInstruction.OP_WHILE:
+                instruction.command = get_command_dispatch_table().get(instruction.args[0])
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.bind_commands()
+    def get_str(self) -> str:
+        lines = []
+        for instruction_index, instruction in enumerate(self.instructions):
+            line = f"{instruction_index:>4} {instruction.get_str()}"
+            if instruction.opcode == ScriptInstruction.OP_IF or instruction.opcode == ScriptInstruction.OP_WHILE:
+                closer_index = self.block_closer_indices[instruction_index]
+                line += f"  (closed by {closer_index})" if closer_index != None else "  (never closed)"
+            lines.append(line)
+        return "\n".join(lines)
+
+def compile_script(script_lines: list[str]) -> CompiledScript:
+    '''
+    Splits every script line into its arguments and opcode once, so running
+    a line (including every iteration of a !while loop) does not re-parse it.
+    Empty lines, comments and lines without arguments are removed.
+    '''
+    instructions = []
+    for line_index, line in enumerate(script_lines):
+        line = line.strip()
+        if len(line) == 0 or line[0] == '#':
+            continue
+        args = parse_input_for_args(line)
+        if len(args) == 0:
+            continue
+        instruction = ScriptInstruction(get_script_opcode(args), line_index, line, args)
+        if instruction.opcode == ScriptInstruction.OP_EXPRESSION:
+            try:
+                instruction.compiled_expression = compile_expression(line)
+            except Exception:
+                # Left to be compiled when the line is run, so the failure occurs at the same point
+                pass
+        instructions.append(instruction)
+    trace(TRACE_PARSER, TRACE_LEVEL_DEBUG, lambda: f"compiled {len(script_lines)} script lines into {len(instructions)} instructions")
+    return CompiledScript(instructions)
+
+def run_compiled_script(compiled_script: CompiledScript):
+    '''
+    Runs compiled_script in the current interpreter, from the default options
+    and decimal context
+    '''
+    interpreter = get_interpreter()
+    interpreter.enabled_echo = True
+    interpreter.exit_on_failure = False
+    interpreter.error_count = 0
+    set_decimal_context(g_default_decimal_precision, g_default_decimal_rounding)
+    execute_compiled_script(compiled_script)
+
+def execute_compiled_script(compiled_script: CompiledScript):
+    '''
+    Runs compiled_script in the current interpreter, keeping the options and
+    decimal context left by earlier scripts
+    '''
+    interpreter = get_interpreter()
+    output_file = interpreter.get_output_file()
+    def output_error(line_index: int, message: str) -> None:
+        interpreter.error_count += 1
+        err_msg = f"[{line_index+1}] Error: {message}"
+        if interpreter.exit_on_failure:
+            exit_script_command(err_msg)
+        else:
+            print(err_msg, file=output_file)
+    instructions = compiled_script.instructions
+
+    class WhileEmbed:
+        def __init__(self, start_index: int):
+            self.start_index = start_index
+            self.end_index = None
+        def is_end_set(self) -> bool:
+            return self.end_index != None
+    while_embed_objects: list[WhileEmbed] = []
+    block_closer_indices = compiled_script.block_closer_indices
+    skipped_unclosed_if = False
+    instruction_index = 0
+    while instruction_index < len(instructions):
+        instruction = instructions[instruction_index]
+        instruction_index += 1
+        opcode = instruction.opcode
+        line_index = instruction.line_index
+        expression_split = instruction.args
+        trace(TRACE_CONTROL_FLOW, TRACE_LEVEL_DEBUG, lambda: f"loop: instruction_index:{instruction_index-1} instruction:{instruction.get_str()}")
+
+        if opcode == ScriptInstruction.OP_EXPRESSION:
+            compiled_expression = instruction.compiled_expression
+            if compiled_expression == None or compiled_expression.compile_context_key != get_compile_context_key():
+                compiled_expression = compile_expression(instruction.text)
+                instruction.compiled_expression = compiled_expression
+            lex_error_count = print_lex_errors(compiled_expression.lex_error_tokens, f"{line_index+1}: ")
+            if (lex_error_count > 0):
+                interpreter.error_count += 1
+                #print(f"{line_index+1}: {lex_error_count} error(s)")
+                if interpreter.exit_on_failure:
+                    exit_script_command(f"Lexer error on line {line_index+1}")
+                continue
+            evaluated_value, errors = compiled_expression.evaluate()
+            if (len(errors) > 0):
+                interpreter.error_count += 1
+                #print("{line_index+1}: Input had errors, no value returned", file = sys.stderr)
+                for error in errors:
+                    print(f"{line_index+1}: Error: {error}", file = interpreter.get_error_file())
+                if interpreter.exit_on_failure:
+                    exit_script_command(f"Evaluation error on line {line_index+1}")
+                continue
+            if interpreter.enabled_echo:
+                print(evaluated_value, file=output_file)
+        elif opcode == ScriptInstruction.OP_COMMAND:
+            if instruction.command == None:
+                output_error(line_index, f"Command: unrecognised command '{expression_split[0]}'")
+                continue
+            command, callback = instruction.command
+            data = command.match_args_and_run(expression_split, line_index+1, callback, instruction.get_match_plan())
+            if not data.args_matched:
+                exit_script_command(f"Invalid command arguments to command {command.name}")
+            if data.callback_had_errors():
+                exit_script_command(f"Fatal error occurred during command {command.name}, exiting ...")
+        elif opcode == ScriptInstruction.OP_IF:
+            command_match_object = instruction.command[0].match_args_and_run(expression_split, line_index+1, None, instruction.get_match_plan())
+            if not command_match_object.args_matched:
+                exit_script_command(f"Fatal error Missing or invalid arguments for if command statement")
+            condition_true = command_match_object.values[1](command_match_object.values[0], command_match_object.values[2])
+            trace(TRACE_CONTROL_FLOW, TRACE_LEVEL_DEBUG, lambda: f"[{line_index+1}] if condition: {expression_split[1]} {expression_split[2]} {expression_split[3]} = {condition_true}")
+            if 'ifset' in command_match_object.tags:
+                if condition_true:
+                    interpreter.variables[command_match_object.values[3]] = command_match_object.values[4]
+            elif not condition_true:
+                closer_index = block_closer_indices[instruction_index-1]
+                if closer_index == None:
+                    skipped_unclosed_if = True
+                    instruction_index = len(instructions)
+                else:
+                    instruction_index = closer_index+1
+                trace(TRACE_CONTROL_FLOW, TRACE_LEVEL_DEBUG, lambda: f"[{line_index+1}] If condition unmet, jumping to instruction_index:{instruction_index}")
+        elif opcode == ScriptInstruction.OP_WHILE:
+            command_match_object = instruction.command[0].match_args_and_run(expression_split, line_index+1, None, instruction.get_match_plan())
+            if not command_match_object.args_matched:
+                exit_script_command(f"Fatal error Missing or invalid arguments for while command statement")
+            condition_true = command_match_object.values[1](command_match_object.values[0], command_match_object.values[2])
+            if condition_true:
+                while_embed_objects.append(WhileEmbed(instruction_index-1))
+            else:
+                trace(TRACE_CONTROL_FLOW, TRACE_LEVEL_DEBUG, lambda: f"[{line_index+1}] While condition unmet ({expression_split[1]};{command_match_object.values[0]} {expression_split[2]} {expression_split[3]};{command_match_object.values[2]} = {condition_true}). skipping to next endwhile")
+                closer_index = block_closer_indices[instruction_index-1]
+                instruction_index = len(instructions) if closer_index == None else closer_index+1
+        elif opcode == ScriptInstruction.OP_ENDWHILE:
+            if len(while_embed_objects) == 0:
+                output_error(line_index, f"endwhile: unmatched !endwhile")
+                continue
+            while_object = while_embed_objects.pop()
+            instruction_index = while_object.start_index
+            interpreter.check_deadline()
+            trace(TRACE_CONTROL_FLOW, TRACE_LEVEL_DEBUG, lambda: f"[{line_index+1}] Found !endwhile. Now jumping back to line {instructions[instruction_index].line_index+1}  instruction_index:{instruction_index}")
+        elif opcode == ScriptInstruction.OP_ENDIF:
+            trace(TRACE_CONTROL_FLOW, TRACE_LEVEL_DEBUG, lambda: f"[{line_index+1}] ignoring an endif command")
+        elif opcode == ScriptInstruction.OP_STRICT:
+            interpreter.exit_on_failure = True
+        elif opcode == ScriptInstruction.OP_DEBUG:
+            if len(expression_split) <= 1:
+                set_trace_level(TRACE_LEVEL_OFF if is_any_trace_enabled() else TRACE_LEVEL_VERBOSE)
+                print("ENABLED DEBUG OUTPUT" if is_any_trace_enabled() else "DISABLED DEBUG OUTPUT", file=output_file)
+            elif expression_split[1] == "on":
+                set_trace_level(TRACE_LEVEL_VERBOSE)
+            elif expression_split[1] == "off":
+                set_trace_level(TRACE_LEVEL_OFF)
+            elif expression_split[1] == "toggle":
+                set_trace_level(TRACE_LEVEL_OFF if is_any_trace_enabled() else TRACE_LEVEL_VERBOSE)
+            else:
+                output_error(line_index, "debug: Invalid value for debug option")
+        elif opcode == ScriptInstruction.OP_ECHO:
+            if len(expression_split) <= 1:
+                interpreter.enabled_echo = not interpreter.enabled_echo
+                print("ENABLED ECHO OUTPUT" if interpreter.enabled_echo else "DISABLED ECHO OUTPUT", file=output_file)
+            elif expression_split[1] == "on":
+                interpreter.enabled_echo = True
+            elif expression_split[1] == "off":
+                interpreter.enabled_echo = False
+            elif expression_split[1] == "toggle":
+                interpreter.enabled_echo = not interpreter.enabled_echo
+            else:
+                output_error(line_index, "echo: Invalid value for echo option")
+        elif opcode == ScriptInstruction.OP_HELP:
+            if len(expression_split) == 1:
+                output_error(line_index, "!help <COMMAND>")
+                continue
+            focused_command = expression_split[1]
+            command_process_descriptions = get_help_descriptions()["commands"]
+            if not (focused_command in command_process_descriptions.keys()):
+                output_error(line_index, "!help {focused_command} : Command not found")
+                continue
+            print(f"{focused_command} : {command_process_descriptions[focused_command]}", file=output_file)
+
+    if skipped_unclosed_if:
+        print("Warning: Not all if statements have been closed", file=output_file)
+
+def run_interpreter(script_lines: list[str]):
+    # Compiled with the context the script starts with, so constants are folded the same
+    set_decimal_context(g_default_decimal_precision, g_default_decimal_rounding)
+    run_compiled_script(compile_script(script_lines))
+
+class SccalcInterpreter:
+    '''
+    The state a script runs with: its variables and iterators, the options
+    set by !echo and !strict, its error count and decimal context, and the
+    files its input and output use. The lexer, evaluator and command callbacks
+    use the interpreter returned by get_interpreter(), which each method makes
+    the current one of its thread or asyncio task, so many interpreters can be
+    used at once. One interpreter must only be used by one thread at a time.
+    The numeric mode, trace levels and compiled expressions are shared by every
+    interpreter.
+    @Param: output_file, error_file and input_file, None for sys.stdout, sys.stderr and sys.stdin
+    @Param: is_embedded, if exiting a script raises SccalcEmbeddedExit rather than exiting the program
+    '''
+    def __init__(self, output_file: typing.TextIO or None = None, error_file: typing.TextIO or None = None, input_file: typing.TextIO or None = None, is_embedded: bool = True):
+        self.output_file = output_file
+        self.error_file = error_file
+        self.input_file = input_file
+        self.is_embedded = is_embedded
+        self.setup()
+    def setup(self) -> None:
+        '''
+        Can be used to restart the interpreter
+        '''
+        self.enabled_echo: bool = True
+        self.exit_on_failure: bool = False
+        self.error_count: int = 0
+        self.variables: SymbolTable = SymbolTable({"script_version": decimal.Decimal(APP_SCRIPT_VERSION)})
+        self.iterators: dict[str, IteratorArray or IteratorPipeline] = {}
+        self.previous_answer = 0
+        self.decimal_context = decimal.Context(prec=g_default_decimal_precision, rounding=g_default_decimal_rounding)
+        self.has_exited = False
+        self.exit_code = 0
+        self.deadline: float or None = None # time.monotonic() a script must end by, see check_deadline()
+    def check_deadline(self) -> None:
+        '''
+        Exits the script once the deadline has passed. Called wherever a script
+        can loop, so an endless !while can be stopped
+        '''
+        if self.deadline != None and time.monotonic() > self.deadline:
+            exit_script_command("Time limit exceeded")
+    def get_output_file(self) -> typing.TextIO:
+        return sys.stdout if self.output_file == None else self.output_file
+    def get_error_file(self) -> typing.TextIO:
+        return sys.stderr if self.error_file == None else self.error_file
+    def read_input(self, prompt: str) -> str:
+        '''
+        Returns a line of input, without its newline, after outputting prompt.
+        Raises EOFError at the end of the input
+        '''
+        if self.input_file == None:
+            return input(prompt)
+        self.get_output_file().write(prompt)
+        line = self.input_file.readline()
+        if len(line) == 0:
+            raise EOFError()
+        return line.rstrip("\n")
+    def run(self, function: typing.Callable, *args):
+        '''
+        Returns function(*args), called with this as the current interpreter
+        and its decimal context as the current decimal context
+        '''
+        token = g_current_interpreter.set(self)
+        decimal_context = decimal.getcontext()
+        decimal.setcontext(self.decimal_context)
+        try:
+            return function(*args)
+        finally:
+            decimal.setcontext(decimal_context)
+            g_current_interpreter.reset(token)
+    def set_variable(self, name: str, value: decimal.Decimal) -> None:
+        self.variables[name] = value
+    def get_variable(self, name: str) -> decimal.Decimal or None:
+        return self.variables.get(name)
+    def set_iterator(self, name: str, iterator: list[decimal.Decimal]) -> None:
+        self.iterators[name] = IteratorArray([to_number(value) for value in iterator])
+    def get_iterator(self, name: str) -> list[decimal.Decimal] or None:
+        '''
+        Raises IteratorPipelineError
+        '''
+        if self.iterators.get(name) == None:
+            return None
+        return list(self.run(get_iterator_array, name))
+    def eval_expression(self, expression: str) -> (decimal.Decimal or None, list[str]):
+        '''
+        Returns the same as eval_expression()
+        '''
+        return self.run(eval_expression, expression)
+    def evaluate_many(self, expressions: str or typing.Iterable[str], bindings: typing.Iterable[dict] or None = None, job_count: int = 1) -> (list, list[list[str]]):
+        '''
+        Returns the same as evaluate_many()
+        '''
+        return self.run(evaluate_many, expressions, bindings, job_count)
+    def iter_evaluate_many(self, expressions: str or typing.Iterable[str], bindings: typing.Iterable[dict] or None = None, job_count: int = 1):
+        '''
+        Returns the same as iter_evaluate_many()
+        '''
+        return self.run(iter_evaluate_many, expressions, bindings, job_count)
+    def eval_line(self, script_line: str) -> None:
+        self.eval_lines([script_line])
+    def eval_lines(self, script_lines: list[str]) -> None:
+        '''
+        Runs script_lines as a script, continuing with the variables, iterators
+        and options left by earlier calls. A !if or !while block must be closed
+        within the same call.
+        '''
+        if self.has_exited:
+            return None
+        self.run_compiled_script(self.run(compile_script, script_lines))
+    def run_compiled_script(self, compiled_script: CompiledScript) -> None:
+        '''
+        Once the script exits, has_exited is set and later scripts are not run.
+        An exit message is output to the error file, exiting with code 1.
+        '''
+        if self.has_exited:
+            return None
+        try:
+            self.run(execute_compiled_script, compiled_script)
+        except SccalcEmbeddedExit as e:
+            self.has_exited = True
+            self.exit_code = e.get_code_or_msg()
+            if not isinstance(self.exit_code, int):
+                print(self.exit_code, file=self.get_error_file())
+                self.exit_code = 1
+    def get_exit_code(self) -> int:
+        '''
+        Returns the code the script exited with, otherwise 1 if any line had an error
+        '''
+        if self.has_exited:
+            return self.exit_code
+        return int(self.error_count != 0)
+
+g_interpreter = SccalcInterpreter(is_embedded=False) # Used when no other interpreter is running
+g_current_interpreter: contextvars.ContextVar = contextvars.ContextVar("g_current_interpreter", default=g_interpreter)
+
+def get_interpreter() -> SccalcInterpreter:
+    '''
+    Returns the interpreter running in this thread or asyncio task
+    '''
+    return g_current_interpreter.get()
+
+'''
+Module attributes that are now the state of the current interpreter, so
+code using them still works
+'''
+INTERPRETER_ATTRIBUTE_NAMES = {
+    "variables": "variables",
+    "iterator_arrays": "iterators",
+    "previous_answer": "previous_answer",
+    "g_enabled_echo_line_eval": "enabled_echo",
+    "g_exit_on_failure": "exit_on_failure",
+    "g_script_error_count": "error_count",
+}
+def __getattr__(name: str):
+    if name in INTERPRETER_ATTRIBUTE_NAMES:
+        return getattr(get_interpreter(), INTERPRETER_ATTRIBUTE_NAMES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+BATCH_BLOCK_SIZE = 1024 # Expressions sent to a batch worker process at a time
+BATCH_BLOCKS_PER_WORKER = 4 # Blocks waiting for each worker, bounding the memory of --jobs
+
+def get_batch_output_line(expression: str, scope_variables: SymbolTable) -> (str, bool):
+    '''
+    Evaluates one line of a batch, with its own copy of scope_variables.
+    Returns (the value or the errors separated by '; ', True if there were errors).
+    A blank line gives a blank line, and an exception from evaluating the line
+    is its error, so later lines are still output.
+    '''
+    if expression.strip() == "":
+        return ("", False)
+    # Only an assignment can change the variables, so the rest share them
+    get_interpreter().variables = scope_variables.copy() if expression_assigns_variable(expression) else scope_variables
+    try:
+        value, errors = eval_expression(expression)
+    except Exception as e:
+        value, errors = (None, [f"EVALUATE ERROR: {type(e).__name__}: {e}"])
+    if value == None:
+        return ("; ".join(errors), True)
+    return (str(value), False)
+
+def eval_batch_block(expressions: list[str], scope_variables: SymbolTable, decimal_context: decimal.Context) -> (str, int):
+    '''
+    Evaluates a block of batch expressions, in this or a worker process.
+    Returns (the output lines, the number of expressions with errors)
+    '''
+    interpreter = get_interpreter()
+    interpreter_variables = interpreter.variables
+    output_lines = []
+    error_count = 0
+    try:
+        with decimal.localcontext(decimal_context):
+            for expression in expressions:
+                output_line, had_errors = get_batch_output_line(expression, scope_variables)
+                output_lines.append(output_line)
+                error_count += had_errors
+    finally:
+        interpreter.variables = interpreter_variables
+    return ("".join([f"{line}\n" for line in output_lines]), error_count)
+
+def run_batch(input_file: typing.TextIO, output_file: typing.TextIO, job_count: int) -> int:
+    '''
+    Evaluates each line of input_file as an independent expression, starting
+    from the current variables and default decimal context, and writes its
+    value or errors to output_file as a line, in the order of the input.
+    With a job_count above 1, blocks of lines are evaluated in that many
+    worker processes.
+    Returns the number of expressions with errors
+    '''
+    interpreter = get_interpreter()
+    scope_variables = interpreter.variables.copy()
+    decimal_context = decimal.Context(prec=g_default_decimal_precision, rounding=g_default_decimal_rounding)
+    lines = (line.rstrip("\r\n") for line in input_file)
+    error_count = 0
+    if job_count <= 1:
+        interpreter_variables = interpreter.variables
+        try:
+            with decimal.localcontext(decimal_context):
+                for line in lines:
+                    output_line, had_errors = get_batch_output_line(line, scope_variables)
+                    output_file.write(f"{output_line}\n")
+                    error_count += had_errors
+        finally:
+            interpreter.variables = interpreter_variables
+        return error_count
+    executor = get_parallel_executor(job_count)
+    pending_blocks = collections.deque()
+    def write_oldest_block() -> int:
+        block_output, block_error_count = pending_blocks.popleft().result()
+        output_file.write(block_output)
+        return block_error_count
+    while True:
+        block = list(itertools.islice(lines, BATCH_BLOCK_SIZE))
+        if len(block) == 0:
+            break
+        pending_blocks.append(executor.submit(eval_batch_block, block, scope_variables, decimal_context))
+        if len(pending_blocks) >= job_count*BATCH_BLOCKS_PER_WORKER:
+            error_count += write_oldest_block()
+    while len(pending_blocks) > 0:
+        error_count += write_oldest_block()
+    return error_count
+
+EVALUATE_MANY_BLOCK_SIZE = 1024 # Expressions evaluated, or sent to a worker process, at a time
+EVALUATE_MANY_BLOCKS_PER_WORKER = 4
+
+def evaluate_many_items(items: list[tuple]) -> list[tuple]:
+    '''
+    Evaluates each (expression, bindings or None) of items, from the current
+    interpreter's variables with the bindings assigned, which are left as they were.
+    Returns a list of (value or None, errors), as returned by eval_expression()
+    '''
+    interpreter = get_interpreter()
+    variables = interpreter.variables
+    compiled_expressions = {} # {str: (CompiledExpression, bool)}
+    # Bindings are assigned over those of the item before, and only undone
+    # once an item binds other variables, as items usually bind the same ones
+    unbound_values = {} # {str: value or None}, of every variable bound since last undone
+    bound_names = None
+    def undo_bindings() -> None:
+        for name, value in unbound_values.items():
+            if value != None:
+                variables[name] = value
+            elif name in variables:
+                del variables[name]
+        unbound_values.clear()
+    results = []
+    for expression, bindings in items:
+        compiled_entry = compiled_expressions.get(expression)
+        if compiled_entry == None:
+            compiled_entry = (compile_expression(expression), expression_assigns_variable(expression))
+            compiled_expressions[expression] = compiled_entry
+        compiled_expression, assigns_variable = compiled_entry
+        if bindings == None or assigns_variable:
+            undo_bindings()
+            bound_names = None
+            item_variables = variables.copy() if assigns_variable else variables
+        else:
+            if bindings.keys() != bound_names:
+                undo_bindings()
+                bound_names = bindings.keys()
+            item_variables = variables
+        if bindings != None:
+            if item_variables is variables:
+                for name in bindings:
+                    if name not in unbound_values:
+                        unbound_values[name] = variables.get(name)
+            try:
+                for name, value in bindings.items():
+                    item_variables[name] = to_number(value)
+            except (ArithmeticError, ValueError, TypeError):
+                results.append((None, [f"Variable '{name}' value {value!r} is not a number"]))
+                bound_names = None # The variables after name were not bound
+                continue
+        interpreter.variables = item_variables
+        try:
+            # An expression given bindings is usually evaluated many times, so its Python function is worth compiling
+            results.append(eval_compiled_expression(compiled_expression, True if bindings != None else None))
+        except Exception as e:
+            # Only this item's value is lost, the rest are still evaluated
+            results.append((None, [f"EVALUATE ERROR: {type(e).__name__}: {e}"]))
+        finally:
+            interpreter.variables = variables
+    undo_bindings()
+    return results
+
+def evaluate_many_block(items: list[tuple], scope_variables: SymbolTable, decimal_context: decimal.Context, previous_answer) -> list[tuple]:
+    '''
+    Evaluates a block of evaluate_many_items() items in a new interpreter, in
+    this or a worker process
+    '''
+    interpreter = SccalcInterpreter()
+    interpreter.variables = scope_variables.copy()
+    interpreter.decimal_context = decimal_context.copy()
+    interpreter.previous_answer = previous_answer
+    return interpreter.run(evaluate_many_items, items)
+
+def iter_evaluate_many(expressions: str or typing.Iterable[str], bindings: typing.Iterable[dict] or None = None, job_count: int = 1):
+    '''
+    Evaluates either each expression of a sequence, or one expression with
+    each dict of variable values in bindings, every time from the current
+    interpreter's variables and decimal context, which are never changed.
+    Each distinct expression is compiled once. With a job_count above 1,
+    blocks of expressions are evaluated in that many worker processes.
+    Returns a generator of (value or None, errors), as returned by
+    eval_expression(), in order. Expressions are evaluated
+    EVALUATE_MANY_BLOCK_SIZE at a time, as the results are used.
+    '''
+    if bindings == None:
+        if isinstance(expressions, str):
+            raise TypeError("expressions must be a sequence of expressions, or an expression with bindings")
+        items = ((expression, None) for expression in expressions)
+    else:
+        if not isinstance(expressions, str):
+            raise TypeError("expressions must be a single expression when bindings are given")
+        items = ((expressions, variable_values) for variable_values in bindings)
+    if not isinstance(job_count, int):
+        raise TypeError("job_count must be of type int")
+    if job_count < 1:
+        raise ValueError("job_count must be at least 1")
+    interpreter = get_interpreter()
+    # Taken now, rather than when the generator is first used
+    block_args = (interpreter.variables.copy(), decimal.getcontext().copy(), interpreter.previous_answer)
+    def generate_results():
+        blocks = iter(lambda: list(itertools.islice(items, EVALUATE_MANY_BLOCK_SIZE)), [])
+        if job_count <= 1:
+            for block in blocks:
+                yield from evaluate_many_block(block, *block_args)
+            return None
+        executor = get_parallel_executor(job_count)
+        pending_blocks = collections.deque()
+        for block in blocks:
+            pending_blocks.append(executor.submit(evaluate_many_block, block, *block_args))
+            if len(pending_blocks) >= job_count*EVALUATE_MANY_BLOCKS_PER_WORKER:
+                yield from pending_blocks.popleft().result()
+        while len(pending_blocks) > 0:
+            yield from pending_blocks.popleft().result()
+    return generate_results()
+
+def evaluate_many(expressions: str or typing.Iterable[str], bindings: typing.Iterable[dict] or None = None, job_count: int = 1) -> (list, list[list[str]]):
+    '''
+    Same as iter_evaluate_many(), returning (values, errors) as parallel
+    lists, with None as the value of each expression that had errors
+    '''
+    values = []
+    errors = []
+    for value, value_errors in iter_evaluate_many(expressions, bindings, job_count):
+        values.append(value)
+        errors.append(value_errors)
+    return (values, errors)
+
+'''
+Increase whenever the pickled form of CompiledScript changes
+'''
+SCRIPT_CACHE_FORMAT_VERSION = 3
+SCRIPT_CACHE_FILE_EXTENSION = ".sccache"
+DEFAULT_SCRIPT_CACHE_MAX_SIZE = 64*1024*1024
+
+def get_default_script_cache_dir() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME")
+    if cache_home == None or len(cache_home) == 0:
+        cache_home = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "sccalc")
+
+class ScriptCache:
+    '''
+    On disk cache of CompiledScript objects, keyed by the hash of the script
+    text, the interpreter and script versions and the options that change the
+    compiled form. Once the files exceed max_size bytes, the least recently
+    used are removed. Failing to read or write the cache is never an error,
+    the script is compiled as normal.
+    Loading an entry can run code, so entries are only loaded when they and
+    the directory are owned by this user and only writable by them.
+    '''
+    def __init__(self, directory: str, max_size: int):
+        if not isinstance(max_size, int):
+            raise TypeError("max_size must be of type int")
+        if max_size < 0:
+            raise ValueError("max_size cannot be negative")
+        self.directory = directory
+        self.max_size = max_size
+    def get_version_str(self) -> str:
+        return f"{SCRIPT_CACHE_FORMAT_VERSION}:{APP_VERSION_MAJOR}.{APP_VERSION_MINOR}:{APP_SCRIPT_VERSION}:{CUSTOM_SCRIPT_VERSION}:{g_optimize_expressions}:{g_numeric_mode}:{g_default_decimal_precision}:{g_default_decimal_rounding}"
+    def get_path(self, script_text: str) -> str:
+        import hashlib
+        key_hash = hashlib.sha256(self.get_version_str().encode() + b"\0" + script_text.encode("utf-8", "surrogatepass"))
+        return os.path.join(self.directory, key_hash.hexdigest() + SCRIPT_CACHE_FILE_EXTENSION)
+    def get(self, script_text: str) -> CompiledScript or None:
+        import pickle
+        path = self.get_path(script_text)
+        gc_was_enabled = gc.isenabled()
+        try:
+            with open(path, "rb") as file_handle:
+                if not self.is_private(os.stat(self.directory)) or not self.is_private(os.fstat(file_handle.fileno())):
+                    trace(TRACE_PARSER, TRACE_LEVEL_DEBUG, lambda: f"script cache not loading '{path}', it or its directory can be written by another user")
+                    return None
+                # Loading only creates objects, so the collector would run many times for nothing
+                gc.disable()
+                version_str, compiled_script = pickle.load(file_handle)
+        except FileNotFoundError:
+            trace(TRACE_PARSER, TRACE_LEVEL_DEBUG, lambda: f"script cache miss '{path}'")
+            return None
+        except Exception as e:
+            trace(TRACE_PARSER, TRACE_LEVEL_DEBUG, lambda: f"script cache could not load '{path}', {e}")
+            self.remove_file(path)
+            return None
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        if version_str != self.get_version_str() or not isinstance(compiled_script, CompiledScript):
+            trace(TRACE_PARSER, TRACE_LEVEL_DEBUG, lambda: f"script cache entry '{path}' is from another version")
+            self.remove_file(path)
+            return None
+        try:
+            os.utime(path) # Marks the entry as recently used
+        except OSError:
+            pass
+        trace(TRACE_PARSER, TRACE_LEVEL_DEBUG, lambda: f"script cache hit '{path}'")
+        return compiled_script
+    def put(self, script_text: str, compiled_script: CompiledScript) -> None:
+        if self.max_size == 0:
+            return None
+        import pickle
+        import tempfile
+        path = self.get_path(script_text)
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(file_descriptor, "wb") as file_handle:
+                    pickle.dump((self.get_version_str(), compiled_script), file_handle, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, path)
+            except BaseException:
+                self.remove_file(temp_path)
+                raise
+        except Exception as e:
+            trace(TRACE_PARSER, TRACE_LEVEL_DEBUG, lambda: f"script cache could not write '{path}', {e}")
+            return None
+        self.evict()
+    def evict(self) -> None:
+        try:
+            entries = []
+            with os.scandir(self.directory) as directory_entries:
+                for entry in directory_entries:
+                    if entry.is_file() and entry.name.endswith(SCRIPT_CACHE_FILE_EXTENSION):
+                        entry_stat = entry.stat()
+                        entries.append((entry_stat.st_mtime, entry_stat.st_size, entry.path))
+        except OSError:
+            return None
+        total_size = sum([entry[1] for entry in entries])
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            trace(TRACE_PARSER, TRACE_LEVEL_DEBUG, lambda: f"script cache evicting '{path}'")
+            self.remove_file(path)
+            total_size -= size
+    def clear(self) -> None:
+        try:
+            with os.scandir(self.directory) as directory_entries:
+                for entry in directory_entries:
+                    if entry.is_file() and entry.name.endswith(SCRIPT_CACHE_FILE_EXTENSION):
+                        self.remove_file(entry.path)
+        except OSError:
+            pass
+    def is_private(self, file_stat: os.stat_result) -> bool:
+        '''
+        Returns True if the file is owned by this user and can not be written
+        by the group or others. Always True where there are no user ids
+        '''
+        if not hasattr(os, "getuid"):
+            return True
+        return file_stat.st_uid == os.getuid() and (file_stat.st_mode & 0o022) == 0
+    def remove_file(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def load_compiled_script(script_text: str, script_cache: ScriptCache or None) -> CompiledScript:
+    '''
+    Returns the compiled form of script_text, from script_cache when possible
+    '''
+    if script_cache != None:
+        compiled_script = script_cache.get(script_text)
+        if compiled_script != None:
+            return compiled_script
+    compiled_script = compile_script(script_text.split("\n"))
+    if script_cache != None:
+        script_cache.put(script_text, compiled_script)
+    return compiled_script
+
+SERVER_FRAME_HEADER = struct.Struct(">I") # Length of the JSON message that follows
+MAX_SERVER_MESSAGE_SIZE = 64*1024*1024
+DEFAULT_SERVER_SCRIPT_CACHE_SIZE = 256
+DEFAULT_SERVER_REQUEST_TIMEOUT = 10 # Seconds
+
+class ServerState:
+    '''
+    What --serve keeps between requests: the variables each request starts
+    with, the compiled scripts and the seconds a script may run for (0 for no
+    limit). Compiled expressions are shared through g_expression_cache.
+    '''
+    def __init__(self, initial_variables: SymbolTable, script_cache: ScriptCache or None, request_timeout: float = DEFAULT_SERVER_REQUEST_TIMEOUT):
+        self.initial_variables = initial_variables
+        self.script_cache = script_cache
+        self.request_timeout = request_timeout
+        # Scripts are compiled with the default decimal context, which does not change while serving
+        self.compiled_scripts: collections.OrderedDict[str, CompiledScript] = collections.OrderedDict()
+    def get_compiled_script(self, script_text: str) -> CompiledScript:
+        compiled_script = self.compiled_scripts.get(script_text)
+        if compiled_script == None:
+            set_decimal_context(g_default_decimal_precision, g_default_decimal_rounding)
+            compiled_script = load_compiled_script(script_text, self.script_cache)
+            self.compiled_scripts[script_text] = compiled_script
+            if len(self.compiled_scripts) > DEFAULT_SERVER_SCRIPT_CACHE_SIZE:
+                self.compiled_scripts.popitem(last=False)
+        self.compiled_scripts.move_to_end(script_text)
+        return compiled_script
+
+def run_server_request(request: dict, server_state: ServerState) -> dict:
+    '''
+    Runs a --serve request in a new interpreter.
+    {"script": TEXT, "input": TEXT} -> {"stdout": TEXT, "stderr": TEXT, "exit_code": INT}
+        input is optional, given to !input and !inputf. A script still running
+        after server_state.request_timeout seconds is exited with exit code 1
+    {"expression": TEXT} -> {"value": TEXT or null, "errors": [TEXT], "exit_code": INT}
+    '''
+    import io
+    import traceback
+    if isinstance(request.get("expression"), str):
+        interpreter = SccalcInterpreter()
+        interpreter.variables = server_state.initial_variables.copy()
+        try:
+            value, errors = interpreter.eval_expression(request["expression"])
+        except Exception as e:
+            value, errors = (None, [f"EVALUATE ERROR: {type(e).__name__}: {e}"])
+        return {"value": None if value == None else str(value), "errors": errors, "exit_code": int(value == None)}
+    if not isinstance(request.get("script"), str) or not isinstance(request.get("input", ""), str):
+        return {"stdout": "", "stderr": "Request must be an object with a script or expression string\n", "exit_code": 2}
+    interpreter = SccalcInterpreter(io.StringIO(), io.StringIO(), io.StringIO(request.get("input", "")))
+    interpreter.variables = server_state.initial_variables.copy()
+    if server_state.request_timeout > 0:
+        interpreter.deadline = time.monotonic() + server_state.request_timeout
+    trace_levels = g_trace_levels.copy()
+    try:
+        interpreter.run_compiled_script(server_state.get_compiled_script(request["script"]))
+        exit_code = interpreter.get_exit_code()
+    except Exception:
+        traceback.print_exc(file=interpreter.error_file)
+        exit_code = 1
+    finally:
+        g_trace_levels[:] = trace_levels
+    return {"stdout": interpreter.output_file.getvalue(), "stderr": interpreter.error_file.getvalue(), "exit_code": exit_code}
+
+async def handle_server_connection(reader, writer, server_state: ServerState, request_executor) -> None:
+    '''
+    Answers each request of a connection in turn, until the client closes it.
+    Every message is a SERVER_FRAME_HEADER then that many bytes of UTF-8 JSON.
+    Scripts are run by request_executor, so other connections are still
+    answered while one runs.
+    '''
+    import asyncio
+    import json
+    try:
+        while True:
+            message_size = SERVER_FRAME_HEADER.unpack(await reader.readexactly(SERVER_FRAME_HEADER.size))[0]
+            if message_size > MAX_SERVER_MESSAGE_SIZE:
+                trace(TRACE_COMMANDS, TRACE_LEVEL_DEBUG, lambda: f"--serve: Closing connection sending a {message_size} byte message")
+                break
+            message = await reader.readexactly(message_size)
+            try:
+                request = json.loads(message.decode("utf-8"))
+            except (UnicodeDecodeError, ValueError):
+                request = None
+            if not isinstance(request, dict):
+                response = {"stdout": "", "stderr": "Request is not a JSON object\n", "exit_code": 2}
+            elif isinstance(request.get("expression"), str):
+                # An expression can not loop, so is answered at once
+                response = run_server_request(request, server_state)
+            else:
+                # Scripts only use the CPU, so request_executor runs them one at a time
+                response = await asyncio.get_running_loop().run_in_executor(request_executor, run_server_request, request, server_state)
+            response_message = json.dumps(response).encode("utf-8")
+            writer.write(SERVER_FRAME_HEADER.pack(len(response_message)) + response_message)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+def run_server(address: str, script_cache: ScriptCache or None, request_timeout: float = DEFAULT_SERVER_REQUEST_TIMEOUT) -> None:
+    '''
+    Serves requests until interrupted or terminated, on localhost TCP port
+    address when it is a number, otherwise on a Unix domain socket at path address
+    '''
+    import asyncio
+    import signal
+    import stat
+    import concurrent.futures
+    server_state = ServerState(get_interpreter().variables.copy(), script_cache, request_timeout)
+    request_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    async def serve() -> None:
+        handle_connection = lambda reader, writer: handle_server_connection(reader, writer, server_state, request_executor)
+        if address.isdigit():
+            server = await asyncio.start_server(handle_connection, "127.0.0.1", int(address))
+        else:
+            if os.path.exists(address) and stat.S_ISSOCK(os.stat(address).st_mode):
+                os.remove(address) # Left by a server that did not exit cleanly
+            server = await asyncio.start_unix_server(handle_connection, address)
+        stop_event = asyncio.Event()
+        for signal_number in [signal.SIGINT, signal.SIGTERM]:
+            try:
+                asyncio.get_running_loop().add_signal_handler(signal_number, stop_event.set)
+            except NotImplementedError:
+                pass # Not on Windows, where KeyboardInterrupt still stops the server
+        print(f"Serving on {address}", flush=True)
+        async with server:
+            await stop_event.wait()
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        request_executor.shutdown(wait=False, cancel_futures=True)
+        if not address.isdigit() and os.path.exists(address) and stat.S_ISSOCK(os.stat(address).st_mode):
+            os.remove(address)
+
+def print_interactive_interpreter_start_text() -> None:
+    print(f"sccalc.py  v{APP_VERSION_MAJOR}.{APP_VERSION_MINOR}")
+    print("End script with a EOF character (Ctrl-D on Unix, Ctrl-Z on Windows)")
+    print(f"WARNING: v{APP_VERSION_MAJOR}.{APP_VERSION_MINOR}  is an unstable release. This release WILL contain major bugs and WILL have its interface changed significantly")
+
+if __name__ == "__main__":
+    is_interactive = False
+    g_output_expression_cache_stats = False
+    g_dump_compiled_script = False
+    use_script_cache = True
+    script_cache_dir = None
+    script_cache_size = DEFAULT_SCRIPT_CACHE_MAX_SIZE
+    trace_option_given = False
+    batch_input_path = None
+    batch_job_count = 1
+    server_address = None
+    server_request_timeout = DEFAULT_SERVER_REQUEST_TIMEOUT
+    debug_option_given = False
+    if (len(sys.argv) == 1):
+        is_interactive = True
+    if len(sys.argv) > 1:
+        for argi, arg in enumerate(sys.argv[1:]):
+            if argi == len(sys.argv[1:])-1 and os.path.isfile(sys.argv[-1]):
+                break
+            if (arg == "--help" or arg == "-h"):
+                print(f"python3 {sys.argv[0]} [EXPRESSION]")
+                print(f"python3 {sys.argv[0]} [OPTIONS]... [FILE]")
+                print( "  -v, --version                 print program version and exit")
+                print( "      __VERSION__               output version in specific format")
+                print( "      --license                 print program license")
+                print(f"      --gen-script-std-file     output the script standard to a file")
+                print( "      --debug                   Enable debugging information from program start (default)")
+                print( "      --no-debug                Disable debugging information from program start")
+                print( "      --trace=<CATEGORY>[,<CATEGORY>]...[:<LEVEL>]")
+                print(f"                                Only output debugging information for the given categories, up to LEVEL (default verbose)")
+                print(f"                                  categories: all {' '.join(TRACE_CATEGORY_NAMES)}")
+                print(f"                                  levels: {' '.join(TRACE_LEVEL_NAMES)}")
+                print( "      --trace-file=<PATH>       Write debugging information to a file, rather than stderr")
+                print(f"      --expr-cache-size=<SIZE>  Number of compiled expressions to keep cached (default {DEFAULT_EXPRESSION_CACHE_SIZE}, 0 disables)")
+                print( "      --expr-cache-stats        Output the expression cache counters when the program ends")
+                print( "      --compile-expressions     Compile expressions into python functions before evaluating them")
+                print( "      --no-optimize-expressions Do not fold constants or remove identities from expressions")
+                print( "      --no-vectorize-iterators  Evaluate !map and !filter for one iterator value at a time")
+                print( "      --lazy-iterators          Record !map and !filter, applying them together only when the iterator's values are used")
+                print( "      --parallel-threshold=<SIZE> Run !map and !filter over iterators of at least SIZE values on every core (default 0, never)")
+                print( "      --dump-compiled-script    Output the compiled instructions of FILE, instead of running it")
+                print( "      --batch[=<PATH>]          Evaluate each line of PATH (default stdin) as an expression with its own variables,")
+                print( "                                outputting a line of its value or errors, in order.")
+                print( "                                Debugging information is off, unless --debug or --trace is given")
+                print( "      --jobs=<N>                Number of worker processes evaluating --batch expressions (default 1)")
+                print( "      --serve=<PATH|PORT>       Run scripts and expressions sent to a Unix domain socket at PATH, or localhost TCP PORT,")
+                print( "                                each as a 4 byte big endian length then a JSON object, until interrupted.")
+                print( "                                Debugging information is off, unless --debug or --trace is given")
+                print(f"      --serve-timeout=<SECONDS> Time a --serve script can run for before it is exited (default {DEFAULT_SERVER_REQUEST_TIMEOUT}, 0 for no limit)")
+                print( "      --script-cache-dir=<PATH> Directory to cache compiled scripts in (default $XDG_CACHE_HOME/sccalc)")
+                print(f"      --script-cache-size=<SIZE> Number of bytes the compiled script cache can use (default {DEFAULT_SCRIPT_CACHE_MAX_SIZE})")
+                print( "      --no-script-cache         Always compile FILE, without reading or writing the compiled script cache")
+                print(f"      --numeric=<MODE>          Type of every number, {' or '.join(NUMERIC_MODE_NUMBER_TYPES.keys())} (default {NUMERIC_MODE_DECIMAL})")
+                print(f"      --precision=<DIGITS>      Significant digits of decimal numbers, scripts can change it with !precision (default {DEFAULT_DECIMAL_PRECISION})")
+                print(f"      --rounding=<MODE>         Rounding of decimal numbers, scripts can change it with !rounding (default half-even)")
+                print(f"                                  modes: {' '.join(DECIMAL_ROUNDING_MODES.keys())}")
+                print( "  -h, --help       print this help page and exit")
+                sys.exit()
+            if (arg == "--version" or arg == "-v"):
+                print(f"VERSION: {APP_VERSION_MAJOR}.{APP_VERSION_MINOR}")
+                print(f"SCRIPT_VERSION: {APP_SCRIPT_VERSION}")
+                sys.exit()
+            if (arg == "__VERSION__"):
+                print(f"{APP_VERSION_MAJOR}.{APP_VERSION_MINOR}")
+                sys.exit()
+            if arg == "--license":
+                print_program_license()
+                sys.exit()
+            if arg == "--gen-script-std-file":
+                standards_output_path = f"script-{APP_SCRIPT_VERSION}-standard"
+                if CUSTOM_SCRIPT_VERSION:
+                    standards_output_path += "-custom"
+                output_script_standard_file(standards_output_path)
+                print(f"Written script standard output to '{standards_output_path}'")
+                sys.exit()
+            if arg == "--debug":
+                set_trace_level(TRACE_LEVEL_VERBOSE)
+                debug_option_given = True
+            if arg == "--no-debug":
+                set_trace_level(TRACE_LEVEL_OFF)
+                debug_option_given = True
+            if arg[:len("--trace=")] == "--trace=":
+                debug_option_given = True
+                if not trace_option_given:
+                    # Only output the given categories
+                    set_trace_level(TRACE_LEVEL_OFF)
+                    trace_option_given = True
+                trace_error = parse_trace_option(arg[len("--trace="):])
+                if trace_error != None:
+                    print(f"--trace {trace_error}")
+                    sys.exit()
+            if arg[:len("--trace-file=")] == "--trace-file=":
+                try:
+                    g_trace_sink = open(arg[len("--trace-file="):], "w")
+                except OSError as e:
+                    print(f"--trace-file could not open file, {e}")
+                    sys.exit()
+            if arg[:len("--expr-cache-size=")] == "--expr-cache-size=":
+                cache_size = arg[len("--expr-cache-size="):]
+                if not cache_size.isdigit():
+                    print("--expr-cache-size size must be a non-negative whole number")
+                    sys.exit()
+                g_expression_cache.set_max_size(int(cache_size))
+            if arg == "--expr-cache-stats":
+                g_output_expression_cache_stats = True
+            if arg == "--compile-expressions":
+                g_compile_expressions = True
+            if arg == "--no-optimize-expressions":
+                g_optimize_expressions = False
+            if arg == "--no-vectorize-iterators":
+                g_vectorize_iterators = False
+            if arg == "--lazy-iterators":
+                g_lazy_iterators = True
+            if arg[:len("--parallel-threshold=")] == "--parallel-threshold=":
+                parallel_threshold = arg[len("--parallel-threshold="):]
+                if not parallel_threshold.isdigit():
+                    print("--parallel-threshold size must be a non-negative whole number")
+                    sys.exit()
+                g_parallel_threshold = int(parallel_threshold)
+            if arg == "--dump-compiled-script":
+                g_dump_compiled_script = True
+            if arg == "--batch":
+                batch_input_path = "-"
+            if arg[:len("--batch=")] == "--batch=":
+                batch_input_path = arg[len("--batch="):]
+            if arg[:len("--serve=")] == "--serve=":
+                server_address = arg[len("--serve="):]
+            if arg[:len("--serve-timeout=")] == "--serve-timeout=":
+                server_request_timeout = convert_to_number_or_none(arg[len("--serve-timeout="):])
+                if server_request_timeout == None or not math.isfinite(server_request_timeout) or server_request_timeout < 0:
+                    print("--serve-timeout must be a non-negative number of seconds")
+                    sys.exit()
+                server_request_timeout = float(server_request_timeout)
+            if arg[:len("--jobs=")] == "--jobs=":
+                job_count = arg[len("--jobs="):]
+                if not job_count.isdigit() or int(job_count) < 1 or int(job_count) > MAX_PARALLEL_WORKERS:
+                    print(f"--jobs must be a whole number between 1 and {MAX_PARALLEL_WORKERS}")
+                    sys.exit()
+                batch_job_count = int(job_count)
+            if arg[:len("--script-cache-dir=")] == "--script-cache-dir=":
+                script_cache_dir = arg[len("--script-cache-dir="):]
+            if arg[:len("--script-cache-size=")] == "--script-cache-size=":
+                cache_size = arg[len("--script-cache-size="):]
+                if not cache_size.isdigit():
+                    print("--script-cache-size size must be a non-negative whole number")
+                    sys.exit()
+                script_cache_size = int(cache_size)
+            if arg == "--no-script-cache":
+                use_script_cache = False
+            if arg[:len("--numeric=")] == "--numeric=":
+                numeric_mode = arg[len("--numeric="):]
+                if numeric_mode not in NUMERIC_MODE_NUMBER_TYPES.keys():
+                    print(f"--numeric mode must be one of {', '.join(NUMERIC_MODE_NUMBER_TYPES.keys())}")
+                    sys.exit()
+                set_numeric_mode(numeric_mode)
+            if arg[:len("--precision=")] == "--precision=":
+                precision = arg[len("--precision="):]
+                if not precision.isdigit() or int(precision) < 1 or int(precision) > decimal.MAX_PREC:
+                    print(f"--precision must be a whole number between 1 and {decimal.MAX_PREC}")
+                    sys.exit()
+                set_default_decimal_context(int(precision), g_default_decimal_rounding)
+            if arg[:len("--rounding=")] == "--rounding=":
+                rounding = arg[len("--rounding="):]
+                if rounding not in DECIMAL_ROUNDING_MODES.keys():
+                    print(f"--rounding mode must be one of {' '.join(DECIMAL_ROUNDING_MODES.keys())}")
+                    sys.exit()
+                set_default_decimal_context(g_default_decimal_precision, DECIMAL_ROUNDING_MODES[rounding])
+            if arg[:len("--new-var=")] == "--new-var=":
+                split_arg = arg[len("--new-var="):].split(":")
+                if len(split_arg) != 2:
+                    print(f"--new-var format invalid, expected '--new-var=<VAR>:<NUMBER>'")
+                    sys.exit()
+                var, num = split_arg
+                if not is_valid_var(var):
+                    print("--new-var variable is an invalid variable")
+                    sys.exit()
+                num = convert_to_number_or_none(num)
+                if num == None:
+                    print("--new-var number is an invalid number")
+                    sys.exit()
+                g_interpreter.variables[var] = num
+        if server_address != None:
+            if not debug_option_given:
+                # Nothing reads the server's own stderr, and tracing every request slows it down
+                set_trace_level(TRACE_LEVEL_OFF)
+            script_cache = None
+            if use_script_cache:
+                script_cache = ScriptCache(script_cache_dir if script_cache_dir != None else get_default_script_cache_dir(), script_cache_size)
+            try:
+                run_server(server_address, script_cache, server_request_timeout)
+            except OSError as e:
+                print(f"--serve could not listen on {server_address}, {e}")
+                sys.exit(1)
+            sys.exit()
+        if batch_input_path != None:
+            if not debug_option_given:
+                # Tracing every expression slows the batch down, and is rarely read
+                set_trace_level(TRACE_LEVEL_OFF)
+            # Each expression is usually evaluated once, so folding its constants first only adds work
+            g_optimize_expressions = False
+            try:
+                batch_input_file = sys.stdin if batch_input_path == "-" else open(batch_input_path)
+            except OSError as e:
+                print(f"--batch could not open file, {e}")
+                sys.exit(1)
+            with batch_input_file:
+                batch_error_count = run_batch(batch_input_file, sys.stdout, batch_job_count)
+            sys.exit(batch_error_count != 0)
+        if (len(sys.argv) > 1 and os.path.isfile(sys.argv[-1])):
+            # NOTE: This scope is the scripting system. Everything here is only for the scripting part
+            fh = open(sys.argv[-1])
+            contents = fh.read()
+            fh.close()
+            script_cache = None
+            if use_script_cache:
+                script_cache = ScriptCache(script_cache_dir if script_cache_dir != None else get_default_script_cache_dir(), script_cache_size)
+            compiled_script = load_compiled_script(contents, script_cache)
+            if g_dump_compiled_script:
+                print(compiled_script.get_str())
+                sys.exit()
+            run_compiled_script(compiled_script)
+            if g_output_expression_cache_stats:
+                print(g_expression_cache.get_stats_str())
+            sys.exit(g_interpreter.error_count != 0)
+
+    if is_interactive:
+        G_IS_EMBEDDED = True
+        print_interactive_interpreter_start_text()
+        while True:
+            def get_user_input_script(prompt: str) -> list[str]:
+                script_has_ended = False
+                user_input: list[str] = []
+                while not script_has_ended:
+                    try:
+                        user_input.append(input(prompt))
+                    except EOFError:
+                        script_has_ended = True
+                return user_input
+
+            user_input = get_user_input_script(">> ")
+            if len(user_input) == 0:
+                break;
+            try:
+                run_interpreter(user_input)
+            except SccalcEmbeddedExit as e:
+                print( "Interpreter exited ...")
+                print(f" Error {e.get_code_or_msg()} occured")
+    else:
+        run_interpreter([sys.argv[1]])